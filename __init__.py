@@ -1 +1,7 @@
 from .hm_duration import *
+from . import hm_duration as _hm_duration
+
+
+def __getattr__(name):
+	# Delegates the lazy attributes to package hm_duration.
+	return getattr(_hm_duration, name)
@@ -1 +1,29 @@
-from .src import HM_Duration, DURATION_STR_PATTERN, str_repr_duration
+from . import src
+from .src import HM_Duration, DURATION_STR_PATTERN, DurationFormat,\
+	EvictionPolicy, InvalidDuration, InvalidPolicy, TimedeltaRounding,\
+	bytes_repr_duration, disable_interning, enable_interning,\
+	interning_cache, minutes_from_timedelta, minutes_from_timedeltas,\
+	parse_duration, str_repr_duration, timedeltas_from_minutes
+
+
+_LAZY_ATTRS = frozenset(src._LAZY_ATTRS)
+"""
+The attributes that package src imports on first access. HM_DurationArray
+requires NumPy, and HM_DurationDtype and HM_DurationExtensionArray require
+pandas.
+"""
+
+
+def __dir__():
+	return sorted(set(globals()) | _LAZY_ATTRS)
+
+
+def __getattr__(name):
+	# Delegates the lazy attributes to package src.
+	if name not in _LAZY_ATTRS:
+		raise AttributeError(
+			"module '" + __name__ + "' has no attribute '" + name + "'")
+
+	value = getattr(src, name)
+	globals()[name] = value
+	return value
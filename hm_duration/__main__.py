@@ -0,0 +1,17 @@
+"""
+This module runs the command-line tool of package hm_duration, which sums and
+aggregates a column of durations in CSV or TSV files:
+
+	python -m hm_duration [FILE ...] [--column COLUMN] [--group-by COLUMN]
+
+Run python -m hm_duration --help for the other options.
+"""
+
+
+from sys import exit
+
+from .src.duration_cli import main
+
+
+if __name__ == "__main__":
+	exit(main())
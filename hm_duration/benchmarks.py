@@ -0,0 +1,536 @@
+"""
+This script benchmarks the hot paths of package hm_duration with the standard
+library only. Run it from this directory:
+
+	python benchmarks.py [--size N] [--baseline FILE] [--save-baseline FILE]
+
+It reports the operations per second and the bytes allocated per operation of
+each benchmark, and the time that a new interpreter takes to import the
+package. The script exits with status 1 if that import loads a heavy module
+such as asyncio or NumPy. If a baseline saved by an earlier run is given, the
+script also exits with status 1 when a benchmark is slower than the baseline by
+more than the tolerance. Baselines are only comparable on the same machine.
+"""
+
+
+from argparse import ArgumentParser
+from json import dump, load
+from os import cpu_count, remove
+from os.path import abspath, dirname
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from operator import add, eq, ge, gt, le, lt, mul, neg, sub, truediv
+from random import Random
+from re import fullmatch
+from src import DURATION_STR_PATTERN, HM_Duration, disable_instrumentation,\
+	duration_to_str, enable_instrumentation, parse_duration,\
+	parse_file_parallel, str_repr_duration
+from src.duration_string import duration_from_str
+from subprocess import run
+from sys import executable, exit
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from timeit import timeit
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+
+
+ALLOCATION_SAMPLE_SIZE = 10000
+DEFAULT_SIZE = 100000
+DEFAULT_TOLERANCE = 0.2
+HEAVY_MODULES = ("asyncio", "concurrent.futures", "multiprocessing", "numpy",
+	"pandas")
+"""
+Importing package hm_duration must not load these modules.
+"""
+IMPORT_REPEAT = 5
+INSTANCE_COUNT = 100000
+INSTRUMENTED_BENCHMARKS = ("HM_Duration.__init__", "HM_Duration.from_str",
+	"HM_Duration.__add__", "HM_Duration.__mul__")
+PICKLE_COUNT = 1000000
+PARSING_CALL_COUNT = 200000
+PARSING_INPUTS = {
+	"valid": "07:19",
+	"invalid": "x7:19",
+	"long hours": "-1234567890:05"
+}
+FORMAT_INPUTS = {
+	"units": "1h30m",
+	"minutes": "-90",
+	"ISO 8601": "PT1H30M"
+}
+
+
+class LegacyDuration:
+	"""
+	This class reproduces the memory layout of HM_Duration before it stored
+	a single signed number of minutes in a slot: a __dict__ with three
+	attributes.
+	"""
+
+	def __init__(self, hours, minutes):
+		self._sign = 1 if hours > 0 or minutes > 0 else 0
+		self._hours = abs(hours) + abs(minutes) // 60
+		self._minutes = abs(minutes) % 60
+
+
+def legacy_duration_from_str(dur_str):
+	# duration_from_str before the single-pass scanner replaced the regular
+	# expression and the slicing
+	if fullmatch(DURATION_STR_PATTERN, dur_str) is None:
+		raise ValueError("Argument '" + dur_str\
+			+ "' does not match regex '" + DURATION_STR_PATTERN + "'.")
+
+	if dur_str[0] == "-":
+		postive = False
+		hour_index = 1
+	else:
+		postive = True
+		hour_index = 0
+
+	colon_index = dur_str.index(":")
+
+	hour_str = dur_str[hour_index: colon_index]
+	if len(hour_str) == 2 and hour_str[0] == "0":
+		hour_str = hour_str[1]
+	hours = int(hour_str)
+
+	min_str = dur_str[colon_index+1:]
+	if min_str[0] == "0":
+		min_str = min_str[1]
+	minutes = int(min_str)
+
+	if not postive:
+		hours *= -1
+		minutes *= -1
+
+	return hours, minutes
+
+
+def bytes_per_instance(make_instance, count):
+	start()
+	instances = [make_instance(i) for i in range(count)]
+	allocated = get_traced_memory()[0]
+	stop()
+
+	# The list holding the instances is not part of their cost.
+	list_size = instances.__sizeof__()
+	return (allocated - list_size) / count
+
+
+def ops_per_second(function, argument, count):
+	def call_catching_value_error():
+		try:
+			function(argument)
+		except ValueError:
+			pass
+
+	return count / timeit(call_catching_value_error, number=count)
+
+
+def print_result(label, value, unit):
+	print(label.ljust(32) + format(value, ".1f").rjust(12) + " " + unit)
+
+
+class BenchmarkData:
+	"""
+	This class holds the random inputs of the benchmarks. The same seed
+	always generates the same inputs.
+	"""
+
+	def __init__(self, size, seed=0):
+		rng = Random(seed)
+		minute_seq = [rng.randint(-6000, 6000) for _ in range(size)]
+		self.hm_pairs = [(-(-minutes // 60), -(-minutes % 60))
+			if minutes < 0 else divmod(minutes, 60) for minutes in minute_seq]
+		self.durations = [HM_Duration(hours, minutes)
+			for hours, minutes in self.hm_pairs]
+		self.others = self.durations[1:] + self.durations[:1]
+		self.dur_strs = [str(duration) for duration in self.durations]
+		self.numbers = [rng.uniform(0.5, 4.0) for _ in range(size)]
+
+	def sample(self, size):
+		"""
+		Makes a copy of these inputs that contains only the first ones.
+
+		Args:
+			size (int): the number of inputs in the copy
+
+		Returns:
+			BenchmarkData: the copy
+		"""
+		sample = object.__new__(BenchmarkData)
+
+		for name, values in vars(self).items():
+			setattr(sample, name, values[:size])
+
+		return sample
+
+
+def _make_instances(data):
+	return [HM_Duration(hours, minutes) for hours, minutes in data.hm_pairs]
+
+
+def _format_pairs(data):
+	return [duration_to_str(hours, minutes)
+		for hours, minutes in data.hm_pairs]
+
+
+BENCHMARKS = {
+	"HM_Duration.__init__": _make_instances,
+	"HM_Duration.from_str":
+		lambda data: list(map(HM_Duration.from_str, data.dur_strs)),
+	"parse_duration": lambda data: list(map(parse_duration, data.dur_strs)),
+	"str_repr_duration":
+		lambda data: list(map(str_repr_duration, data.dur_strs)),
+	"duration_to_str": _format_pairs,
+	"HM_Duration.__str__": lambda data: list(map(str, data.durations)),
+	"HM_Duration.__repr__": lambda data: list(map(repr, data.durations)),
+	"HM_Duration.__abs__": lambda data: list(map(abs, data.durations)),
+	"HM_Duration.__neg__": lambda data: list(map(neg, data.durations)),
+	"HM_Duration.__add__":
+		lambda data: list(map(add, data.durations, data.others)),
+	"HM_Duration.__sub__":
+		lambda data: list(map(sub, data.durations, data.others)),
+	"HM_Duration.__mul__":
+		lambda data: list(map(mul, data.durations, data.numbers)),
+	"HM_Duration.__rmul__":
+		lambda data: list(map(mul, data.numbers, data.durations)),
+	"HM_Duration.__truediv__":
+		lambda data: list(map(truediv, data.durations, data.numbers)),
+	"HM_Duration.__eq__":
+		lambda data: list(map(eq, data.durations, data.others)),
+	"HM_Duration.__ge__":
+		lambda data: list(map(ge, data.durations, data.others)),
+	"HM_Duration.__gt__":
+		lambda data: list(map(gt, data.durations, data.others)),
+	"HM_Duration.__le__":
+		lambda data: list(map(le, data.durations, data.others)),
+	"HM_Duration.__lt__":
+		lambda data: list(map(lt, data.durations, data.others)),
+	"HM_Duration.to_hours":
+		lambda data: list(map(HM_Duration.to_hours, data.durations)),
+	"HM_Duration.to_minutes":
+		lambda data: list(map(HM_Duration.to_minutes, data.durations))
+}
+"""
+Each benchmark applies an operation to every input and returns the results.
+"""
+
+
+def measure_allocations(benchmark, data):
+	"""
+	Measures the peak number of bytes that a benchmark allocates per
+	operation, including its results.
+
+	Args:
+		benchmark: a function from BENCHMARKS
+		data (BenchmarkData): the inputs
+
+	Returns:
+		float: the number of bytes allocated per operation
+	"""
+	start()
+	reset_peak()
+	benchmark(data)
+	peak = get_traced_memory()[1]
+	stop()
+	return peak / len(data.durations)
+
+
+def measure_speed(benchmark, data, repeat=3):
+	"""
+	Measures the best number of operations per second of a benchmark over
+	several runs.
+
+	Args:
+		benchmark: a function from BENCHMARKS
+		data (BenchmarkData): the inputs
+		repeat (int): the number of runs. Defaults to 3.
+
+	Returns:
+		float: the number of operations per second of the fastest run
+	"""
+	best_time = None
+
+	for _ in range(repeat):
+		start_time = perf_counter()
+		benchmark(data)
+		run_time = perf_counter() - start_time
+
+		if best_time is None or run_time < best_time:
+			best_time = run_time
+
+	return len(data.durations) / best_time
+
+
+def measure_import_time():
+	"""
+	Measures the cold-start cost of importing package hm_duration in a new
+	interpreter with option -X importtime, and checks that no module in
+	HEAVY_MODULES is imported.
+
+	Returns:
+		tuple:
+			[0]: (float) the least cumulative import time in microseconds
+			[1]: (list) the heavy modules that were imported
+	"""
+	package_parent = dirname(dirname(abspath(__file__)))
+	best_time = None
+	heavy_modules = set()
+
+	for _ in range(IMPORT_REPEAT):
+		process = run([executable, "-X", "importtime", "-c",
+			"import hm_duration"], cwd=package_parent,
+			capture_output=True, text=True, check=True)
+
+		for line in process.stderr.splitlines():
+			fields = line.split("|")
+
+			if len(fields) != 3 or not fields[1].strip().isdecimal():
+				continue
+
+			module_name = fields[2].strip()
+
+			if module_name.split(".")[0] in HEAVY_MODULES\
+					or module_name in HEAVY_MODULES:
+				heavy_modules.add(module_name)
+
+			if module_name == "hm_duration":
+				import_time = int(fields[1])
+
+				if best_time is None or import_time < best_time:
+					best_time = import_time
+
+	return best_time, sorted(heavy_modules)
+
+
+def run_suite(size):
+	"""
+	Runs every benchmark in BENCHMARKS and the import time benchmark, and
+	prints their results.
+
+	Args:
+		size (int): the number of inputs of each benchmark
+
+	Returns:
+		tuple:
+			[0]: (dict) the number of operations per second of each
+				benchmark. Imports per second measure the import time.
+			[1]: (list) the heavy modules loaded by the package's import
+	"""
+	data = BenchmarkData(size)
+	alloc_data = data.sample(min(size, ALLOCATION_SAMPLE_SIZE))
+	speeds = dict()
+	print("Benchmark suite (" + str(size) + " inputs)")
+
+	for name, benchmark in BENCHMARKS.items():
+		speeds[name] = measure_speed(benchmark, data)
+		bytes_per_op = measure_allocations(benchmark, alloc_data)
+		print(name.ljust(32) + format(speeds[name], ".1f").rjust(12)
+			+ " ops/s" + format(bytes_per_op, ".1f").rjust(10) + " bytes/op")
+
+	import_time, heavy_modules = measure_import_time()
+	speeds["import hm_duration"] = 1e6 / import_time
+	print("import hm_duration".ljust(32) + format(import_time, ".1f").rjust(12)
+		+ " us (" + format(speeds["import hm_duration"], ".1f") + " imports/s)")
+
+	if heavy_modules:
+		print("Import of heavy modules: " + ", ".join(heavy_modules))
+
+	print()
+	return speeds, heavy_modules
+
+
+def find_regressions(speeds, baseline, tolerance):
+	"""
+	Compares benchmark results to a baseline.
+
+	Args:
+		speeds (dict): the number of operations per second of each benchmark
+		baseline (dict): the results of an earlier run, saved by this script
+		tolerance (float): the accepted relative slowdown
+
+	Returns:
+		list: the names of the benchmarks slower than the baseline by more
+			than the tolerance
+	"""
+	regressions = list()
+
+	for name, speed in speeds.items():
+		baseline_speed = baseline["results"].get(name)
+
+		if baseline_speed is not None\
+				and speed < baseline_speed * (1 - tolerance):
+			regressions.append(name)
+			print("Regression: " + name + " runs at "
+				+ format(speed / baseline_speed, ".0%") + " of the baseline.")
+
+	return regressions
+
+
+def bench_instrumentation(size):
+	print("Instrumentation overhead (" + str(size) + " inputs)")
+	data = BenchmarkData(size)
+
+	for name in INSTRUMENTED_BENCHMARKS:
+		benchmark = BENCHMARKS[name]
+		never_enabled = measure_speed(benchmark, data)
+		enable_instrumentation()
+		enabled = measure_speed(benchmark, data)
+		disable_instrumentation()
+		disabled = measure_speed(benchmark, data)
+		print_result(name + " (never)", never_enabled, "ops/s")
+		print_result(name + " (enabled)", enabled, "ops/s")
+		print_result(name + " (disabled)", disabled, "ops/s ("
+			+ format(disabled / never_enabled - 1, "+.1%") + ")")
+
+	print()
+
+
+def bench_memory():
+	print("Memory per instance (" + str(INSTANCE_COUNT) + " instances)")
+	legacy_bytes = bytes_per_instance(
+		lambda i: LegacyDuration(i, i % 60), INSTANCE_COUNT)
+	slot_bytes = bytes_per_instance(
+		lambda i: HM_Duration(i, i % 60), INSTANCE_COUNT)
+	print_result("Before (__dict__)", legacy_bytes, "bytes")
+	print_result("After (__slots__)", slot_bytes, "bytes")
+	print()
+
+
+def bench_pickling():
+	print("Pickling (" + str(PICKLE_COUNT) + " durations)")
+	instance_lists = {
+		"Before (__dict__)":
+			[LegacyDuration(0, i % 6000) for i in range(PICKLE_COUNT)],
+		"After (__reduce__)":
+			[HM_Duration(0, i % 6000) for i in range(PICKLE_COUNT)]
+	}
+
+	for label, instances in instance_lists.items():
+		start_time = perf_counter()
+		pickled = dumps(instances, HIGHEST_PROTOCOL)
+		loads(pickled)
+		run_time = perf_counter() - start_time
+		print_result(label + ", size", len(pickled) / 1e6, "MB")
+		print_result(label + ", round trip", run_time, "s")
+
+	print()
+
+
+def bench_parsing():
+	print("duration_from_str (" + str(PARSING_CALL_COUNT) + " calls)")
+
+	for input_name, dur_str in PARSING_INPUTS.items():
+		legacy_ops = ops_per_second(
+			legacy_duration_from_str, dur_str, PARSING_CALL_COUNT)
+		scanner_ops = ops_per_second(
+			duration_from_str, dur_str, PARSING_CALL_COUNT)
+		print_result("Regex, " + input_name, legacy_ops, "ops/s")
+		print_result("Scanner, " + input_name, scanner_ops, "ops/s")
+
+	print()
+
+
+def bench_formats():
+	print("parse_duration (" + str(PARSING_CALL_COUNT) + " calls)")
+
+	for input_name, dur_str in PARSING_INPUTS.items():
+		scanner_ops = ops_per_second(
+			duration_from_str, dur_str, PARSING_CALL_COUNT)
+		multi_format_ops = ops_per_second(
+			parse_duration, dur_str, PARSING_CALL_COUNT)
+		print_result("duration_from_str, " + input_name, scanner_ops, "ops/s")
+		print_result("parse_duration, " + input_name, multi_format_ops,
+			"ops/s (" + format(multi_format_ops / scanner_ops, ".2f") + "x)")
+
+	for input_name, dur_str in FORMAT_INPUTS.items():
+		print_result("parse_duration, " + input_name,
+			ops_per_second(parse_duration, dur_str, PARSING_CALL_COUNT),
+			"ops/s")
+
+	print()
+
+
+def bench_parallel_parsing(size):
+	print("File parsing (" + str(size) + " lines)")
+	data = BenchmarkData(size)
+
+	with NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+		file.write("\n".join(data.dur_strs) + "\n")
+
+	try:
+		start_time = perf_counter()
+		with open(file.name) as lines:
+			[HM_Duration.from_str(line.rstrip("\n")) for line in lines]
+		serial_time = perf_counter() - start_time
+		print_result("Serial from_str loop", size / serial_time, "lines/s")
+
+		job_counts = sorted({1, 2, 4, cpu_count() or 1})
+
+		for jobs in job_counts:
+			start_time = perf_counter()
+			parse_file_parallel(file.name, jobs, min_range_size=1 << 16)
+			run_time = perf_counter() - start_time
+			print_result("parse_file_parallel, " + str(jobs) + " jobs",
+				size / run_time, "lines/s ("
+				+ format(serial_time / run_time, ".1f") + "x)")
+	finally:
+		remove(file.name)
+
+	print()
+
+
+def main():
+	parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+		help="the number of inputs of each benchmark, from 1e3 to 1e7")
+	parser.add_argument("--baseline",
+		help="a JSON file saved by an earlier run to compare against")
+	parser.add_argument("--save-baseline",
+		help="a JSON file where the results are saved")
+	parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+		help="the accepted relative slowdown compared to the baseline")
+	parser.add_argument("--legacy", action="store_true",
+		help="also compare with the implementations that were replaced")
+	parser.add_argument("--parallel", action="store_true",
+		help="also compare parallel and serial file parsing")
+	parser.add_argument("--formats", action="store_true",
+		help="also compare parse_duration with duration_from_str")
+	parser.add_argument("--instrumentation", action="store_true",
+		help="also measure the overhead of instrumentation")
+	args = parser.parse_args()
+
+	if args.legacy:
+		bench_memory()
+		bench_parsing()
+		bench_pickling()
+
+	if args.formats:
+		bench_formats()
+
+	if args.parallel:
+		bench_parallel_parsing(args.size)
+
+	if args.instrumentation:
+		bench_instrumentation(args.size)
+
+	speeds, heavy_modules = run_suite(args.size)
+
+	if args.save_baseline is not None:
+		with open(args.save_baseline, "w") as baseline_file:
+			dump({"size": args.size, "results": speeds},
+				baseline_file, indent=1)
+
+	if args.baseline is not None:
+		with open(args.baseline) as baseline_file:
+			baseline = load(baseline_file)
+
+		if find_regressions(speeds, baseline, args.tolerance):
+			exit(1)
+
+	if heavy_modules:
+		exit(1)
+
+
+if __name__ == "__main__":
+	main()
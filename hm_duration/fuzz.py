@@ -0,0 +1,810 @@
+"""
+This script fuzzes the accelerated implementations of package hm_duration
+against its pure-Python reference with the standard library only. Run it from
+this directory:
+
+	python fuzz.py [--size N] [--seed SEED] [--backend NAME ...]
+
+The reference oracle is the scalar path of class HM_Duration: its constructor,
+HM_Duration.from_str, duration_to_str and its arithmetic operators. Each
+backend registered in BACKENDS reimplements one of these categories for
+batches of inputs, and it must return the same results as the oracle for
+random and edge-case inputs, including the same rejections. The script reports
+the mismatches and the throughput of each backend, and it exits with status 1
+if a backend disagrees with the oracle. The NumPy and pandas backends are
+registered only if these packages are installed.
+"""
+
+
+from argparse import ArgumentParser
+from asyncio import run
+from collections import namedtuple
+from datetime import timedelta
+from io import StringIO
+from math import inf, isfinite, nan
+from operator import add, iadd, imul, isub, itruediv, mul, neg, sub, truediv
+from os import remove
+from random import Random
+from src import DurationBuilder, DurationFormat, HM_Duration, InvalidDuration,\
+	InvalidPolicy, TimedeltaRounding, disable_interning, duration_to_str,\
+	duration_to_str_many, enable_interning, minutes_from_str_many,\
+	parse_duration, parse_duration_stream, parse_file_parallel
+from src.duration_bytes import duration_to_bytes
+from src.duration_string import duration_from_str_many
+from sys import exit
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+
+try:
+	import numpy as np
+	from src import HM_DurationArray
+except ImportError: # NumPy is not installed.
+	np = None
+
+try:
+	from pandas import array as pandas_array
+	from src import HM_DurationDtype
+except ImportError: # pandas is not installed.
+	pandas_array = None
+
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_MAX_REPORTS = 5
+DEFAULT_SIZE = 1000000
+EXPECTED_ERRORS = (ArithmeticError, ValueError)
+"""
+The exceptions that are results rather than failures of the harness. A
+rejected input yields the class of the raised exception.
+"""
+INTERNING_CACHE_SIZE = 64
+"""
+A small cache, so that the interned backends also evict and recreate
+instances
+"""
+
+DIGIT_SETS = ("0123456789", "0123456789", "0123456789",
+	"٠١٢٣٤٥٦٧٨٩",
+	"０１２３４５６７８９")
+"""
+ASCII digits and other Unicode decimal digits (Arabic-Indic and full-width),
+which regular expressions and int accept in strings
+"""
+NOISE_CHARS = "0123456789:-+ \t\n\r._hmHMPTx\x00²½٣５"
+"""
+The characters inserted in duration strings to make them invalid or
+differently valid. Superscript two and one half are numeric but not decimal.
+"""
+
+EDGE_MINUTES = tuple(sign * minutes for minutes in (0, 1, 59, 60, 61, 599,
+	600, 5999, 6000, 6001, 2 ** 31, 2 ** 53, 2 ** 53 + 1, 2 ** 62, 10 ** 20)
+	for sign in (1, -1))
+EDGE_NUMBERS = (0, 1, -1, 2, 0.5, -0.5, 1.5, 2.5, 0.1, 1 / 3, 1e-9, 1e15,
+	1e300, 2 ** 53, -7, 0.0, inf, -inf, nan)
+EDGE_PAIRS = tuple((hours, minutes) for hours in (0, 1, -1, 99, 100, -100)
+	for minutes in (0, 1, -1, 59, 60, -60, 61, 6000))
+EDGE_STRS = ("", ":", "-", "--1:00", "-:00", "0:0", "0:000", "00:00", "-0:00",
+	"+1:00", " 1:00", "1:00 ", "1:00\n", "\n1:00", "1:00\r", "1_0:00", "1:0_",
+	"²:00", "1:½0", "١:٠٠", "０:００",
+	"007:07", "-07:67", "99:99", "123456789012345678901234:59", "1:30:00",
+	"1h30m", "90", "PT1H30M")
+
+ARITHMETIC_OPERATORS = {"+": add, "-": sub, "*": mul, "/": truediv,
+	"neg": neg, "abs": abs}
+IN_PLACE_OPERATORS = {"+": iadd, "-": isub, "*": imul, "/": itruediv}
+MINUTE_SCALES = (100, 100, 10 ** 4, 10 ** 4, 10 ** 6, 10 ** 12, 10 ** 20)
+STREAM_CHUNK_SIZE = 4096
+
+FLOAT_EXACT_BOUND = 2 ** 53
+"""
+NumPy converts the minute counts to float64 in products and quotients, which
+is exact only up to this bound
+"""
+INT64_BOUND = 2 ** 62
+"""
+The bound of the results stored in int64 arrays, with a margin for rounding
+"""
+MINUTE_ARRAY_STR_LENGTH = 16
+"""
+The length under which a duration string cannot overflow an array('q') of
+minutes
+"""
+TIMEDELTA_BOUND = 10 ** 12
+"""
+A bound on the minutes of datetime.timedelta, which cannot exceed 999999999
+days
+"""
+
+
+Backend = namedtuple("Backend", ("category", "function", "on_invalid",
+	"domain"), defaults=(InvalidPolicy.SENTINEL, None))
+"""
+An accelerated implementation of a category. Its function takes a list of
+inputs and returns a list of results. Attribute on_invalid tells how it
+handles the inputs that the oracle rejects: InvalidPolicy.SENTINEL if it
+returns the class of the raised exception in their place, InvalidPolicy.SKIP
+if it leaves them out of the results and InvalidPolicy.RAISE if it cannot
+process them, in which case they are not given to it. Attribute domain is
+None or a predicate that selects the inputs the backend is meant to support.
+"""
+
+BackendResult = namedtuple("BackendResult",
+	("checked", "mismatch_count", "mismatches", "seconds"))
+"""
+The outcome of fuzzing a backend: the number of checked inputs, the number of
+mismatches, the first mismatches as tuples (input, expected, actual) and the
+time spent in the backend
+"""
+
+
+def outcome(function, argument):
+	try:
+		return function(argument)
+	except EXPECTED_ERRORS as error:
+		return error.__class__
+
+
+def print_result(label, value, unit, comment=""):
+	print(label.ljust(40) + format(value, ".1f").rjust(12) + " " + unit
+		+ comment)
+
+
+# The reference oracle of each category
+
+def reference_arithmetic(item):
+	operator, minutes, operand = item
+	duration = HM_Duration(0, minutes)
+
+	if operator in ("+", "-"):
+		operand = HM_Duration(0, operand)
+	elif operator not in ("*", "/"):
+		return ARITHMETIC_OPERATORS[operator](duration).to_minutes()
+
+	return ARITHMETIC_OPERATORS[operator](duration, operand).to_minutes()
+
+
+def reference_construction(item):
+	duration = HM_Duration(*item)
+	return duration.hours, duration.minutes
+
+
+def reference_formatting(minutes):
+	duration = HM_Duration(0, minutes)
+	return duration_to_str(duration.hours, duration.minutes)
+
+
+def reference_parsing(dur_str):
+	return HM_Duration.from_str(dur_str).to_minutes()
+
+
+REFERENCES = {
+	"construction": reference_construction,
+	"parsing": reference_parsing,
+	"formatting": reference_formatting,
+	"arithmetic": reference_arithmetic
+}
+
+
+# The input generators. Each batch starts with the edge cases.
+
+def random_minutes(rng):
+	scale = rng.choice(MINUTE_SCALES)
+	return rng.randint(-scale, scale)
+
+
+def random_number(rng):
+	kind = rng.randrange(5)
+
+	if kind == 0:
+		return rng.randint(-5, 5)
+
+	if kind == 1:
+		return rng.uniform(-10, 10)
+
+	if kind == 2:
+		# Halves make products and quotients that end with .5.
+		return rng.randint(-20, 20) / 2
+
+	if kind == 3:
+		return rng.randint(-64, 64) / rng.choice((3, 4, 7, 8, 10))
+
+	return rng.choice(EDGE_NUMBERS)
+
+
+def random_dur_str(rng):
+	digits = rng.choice(DIGIT_SETS)
+	hour_length = rng.choice((1, 1, 2, 2, 2, 3, 4, 6, 10, 20))
+	chars = list("-" if rng.random() < 0.3 else "")
+	chars.extend(rng.choice(digits) for _ in range(hour_length))
+	chars.append(":")
+	chars.append(rng.choice(digits))
+	chars.append(rng.choice(digits))
+
+	# Half of the strings are mutated once or twice.
+	for _ in range(rng.choice((0, 0, 1, 2))):
+		position = rng.randrange(len(chars) + 1)
+		mutation = rng.randrange(3)
+
+		if mutation == 0:
+			chars.insert(position, rng.choice(NOISE_CHARS))
+		elif position < len(chars):
+			if mutation == 1:
+				del chars[position]
+			else:
+				chars[position] = rng.choice(NOISE_CHARS)
+
+	return "".join(chars)
+
+
+def generate_arithmetic(rng, size):
+	items = [(operator, minutes, operand)
+		for operator, operand in (("+", 1), ("-", -1), ("*", 0.5), ("/", 2),
+			("/", 0), ("*", 1e300), ("*", nan), ("/", inf), ("neg", None),
+			("abs", None))
+		for minutes in EDGE_MINUTES]
+
+	while len(items) < size:
+		operator = rng.choice(tuple(ARITHMETIC_OPERATORS))
+
+		if operator in ("+", "-"):
+			operand = random_minutes(rng)
+		elif operator in ("*", "/"):
+			operand = random_number(rng)
+		else:
+			operand = None
+
+		items.append((operator, random_minutes(rng), operand))
+
+	return items[:size]
+
+
+def generate_construction(rng, size):
+	items = list(EDGE_PAIRS)
+
+	while len(items) < size:
+		hours = random_minutes(rng) // 60
+		minutes = rng.randint(0, 180)
+
+		if hours < 0 or (hours == 0 and rng.random() < 0.5):
+			minutes = -minutes
+
+		# The constructor rejects arguments of opposite signs.
+		if rng.random() < 0.1:
+			minutes = -minutes
+
+		items.append((hours, minutes))
+
+	return items[:size]
+
+
+def generate_formatting(rng, size):
+	items = list(EDGE_MINUTES)
+
+	while len(items) < size:
+		items.append(random_minutes(rng))
+
+	return items[:size]
+
+
+def generate_parsing(rng, size):
+	items = list(EDGE_STRS)
+
+	while len(items) < size:
+		items.append(random_dur_str(rng))
+
+	return items[:size]
+
+
+GENERATORS = {
+	"construction": generate_construction,
+	"parsing": generate_parsing,
+	"formatting": generate_formatting,
+	"arithmetic": generate_arithmetic
+}
+
+
+# The domains of the backends
+
+def fits_float_arrays(item):
+	operator, minutes, operand = item
+
+	if abs(minutes) > FLOAT_EXACT_BOUND:
+		return False
+
+	if operator in ("+", "-"):
+		return abs(operand) <= FLOAT_EXACT_BOUND
+
+	# Zero divisors and non-finite operands must yield the oracle's result or
+	# exception.
+	if operator == "*":
+		return not isfinite(operand) or abs(operand) <= FLOAT_EXACT_BOUND\
+			and abs(minutes * float(operand)) < INT64_BOUND
+
+	if operator == "/":
+		return not isfinite(operand) or operand == 0\
+			or abs(minutes / operand) < INT64_BOUND
+
+	return True
+
+
+def fits_minute_array(dur_str):
+	return len(dur_str) < MINUTE_ARRAY_STR_LENGTH
+
+
+def fits_int64(minutes):
+	return abs(minutes) < INT64_BOUND
+
+
+def fits_lines(dur_str):
+	return fits_minute_array(dur_str)\
+		and "\n" not in dur_str and "\r" not in dur_str
+
+
+def fits_timedelta(item):
+	hours, minutes = item
+	return hours * minutes >= 0\
+		and abs(hours * 60 + minutes) < TIMEDELTA_BOUND
+
+
+def fits_timedelta_sum(item):
+	operator, minutes, operand = item
+	return operator in ("+", "-")\
+		and abs(minutes) + abs(operand) < TIMEDELTA_BOUND
+
+
+# The backends
+
+def interned(function):
+	# Runs a backend with interning enabled.
+	def run_interned(items):
+		enable_interning(INTERNING_CACHE_SIZE)
+
+		try:
+			return function(items)
+		finally:
+			disable_interning()
+
+	return run_interned
+
+
+def arithmetic_with_builder(items):
+	results = list()
+
+	for operator, minutes, operand in items:
+		builder = DurationBuilder(minutes)
+
+		try:
+			IN_PLACE_OPERATORS[operator](builder, operand)
+		except EXPECTED_ERRORS as error:
+			results.append(error.__class__)
+		else:
+			results.append(builder.to_minutes())
+
+	return results
+
+
+def arithmetic_with_timedelta(items):
+	results = list()
+
+	for operator, minutes, operand in items:
+		delta = ARITHMETIC_OPERATORS[operator](
+			HM_Duration(0, minutes), HM_Duration(0, operand).to_timedelta())
+		results.append(HM_Duration.from_timedelta(
+			delta, TimedeltaRounding.EXACT).to_minutes())
+
+	return results
+
+
+def construct_from_timedelta(items):
+	return [reference_construction((0, HM_Duration.from_timedelta(timedelta(
+		hours=hours, minutes=minutes), TimedeltaRounding.EXACT).to_minutes()))
+		for hours, minutes in items]
+
+
+def construct_interned(items):
+	return [outcome(reference_construction, item) for item in items]
+
+
+def construct_with_numpy(items):
+	durations = HM_DurationArray.from_minutes(
+		[hours * 60 + minutes for hours, minutes in items])
+	return list(zip(durations.hours.tolist(), durations.minutes.tolist()))
+
+
+def format_with_builder(minute_seq):
+	return [str(DurationBuilder(minutes)) for minutes in minute_seq]
+
+
+def format_with_pandas(minute_seq):
+	durations = pandas_array(minute_seq, dtype=HM_DurationDtype())
+	return durations.astype(str).tolist()
+
+
+def format_with_str(minute_seq):
+	return [str(HM_Duration(0, minutes)) for minutes in minute_seq]
+
+
+def format_to_bytes(minute_seq):
+	# Appends all the representations to one buffer.
+	buffer = bytearray()
+	lengths = list()
+
+	for minutes in minute_seq:
+		duration = HM_Duration(0, minutes)
+		lengths.append(
+			duration_to_bytes(duration.hours, duration.minutes, buffer))
+
+	dur_strs = list()
+	start = 0
+
+	for length in lengths:
+		dur_strs.append(buffer[start:start + length].decode())
+		start += length
+
+	return dur_strs
+
+
+def format_to_stream(minute_seq):
+	stream = StringIO()
+	duration_to_str_many(minute_seq, stream)
+	return stream.getvalue().split("\n")[:-1]
+
+
+def is_all_formats_domain(dur_str):
+	# With a colon, parse_duration accepts only the classic format.
+	return ":" in dur_str
+
+
+def is_in_place_operation(item):
+	return item[0] in IN_PLACE_OPERATORS
+
+
+def operate_interned(items):
+	return [outcome(reference_arithmetic, item) for item in items]
+
+
+def operate_with_numpy(items):
+	return operate_with_arrays(items, HM_DurationArray.from_minutes,
+		lambda durations: durations.to_minutes().tolist())
+
+
+def operate_with_pandas(items):
+	return operate_with_arrays(items,
+		lambda minute_seq: pandas_array(minute_seq, dtype=HM_DurationDtype()),
+		lambda durations: durations.astype("int64").tolist())
+
+
+def operate_with_arrays(items, make_array, to_minute_list):
+	# Applies each operator once, to the arrays of its operands.
+	results = [None] * len(items)
+
+	for operator in ARITHMETIC_OPERATORS:
+		indices = [index for index, item in enumerate(items)
+			if item[0] == operator]
+
+		if not indices:
+			continue
+
+		operated = operate_on_arrays(operator,
+			[items[index] for index in indices], make_array, to_minute_list)
+
+		for index, result in zip(indices, operated):
+			results[index] = result
+
+	return results
+
+
+def operate_on_arrays(operator, items, make_array, to_minute_list):
+	# An array operation rejects all its items if one of them is invalid, so
+	# the rejected arrays are halved until the invalid items are isolated.
+	function = ARITHMETIC_OPERATORS[operator]
+	durations = make_array([item[1] for item in items])
+	operands = [item[2] for item in items]
+
+	try:
+		if operator in ("+", "-"):
+			computed = function(durations, make_array(operands))
+		elif operator in ("*", "/"):
+			computed = function(durations, np.array(operands))
+		else:
+			computed = function(durations)
+	except EXPECTED_ERRORS as error:
+		if len(items) == 1:
+			return [error.__class__]
+
+		middle = len(items) // 2
+		return operate_on_arrays(operator, items[:middle], make_array,
+			to_minute_list) + operate_on_arrays(operator, items[middle:],
+			make_array, to_minute_list)
+
+	return to_minute_list(computed)
+
+
+def parse_all_formats(dur_strs):
+	return [outcome(lambda dur_str: _total_minutes(parse_duration(dur_str)),
+		dur_str) for dur_str in dur_strs]
+
+
+def parse_bytes(dur_strs):
+	return [outcome(lambda dur_str: HM_Duration.from_bytes(
+		dur_str.encode()).to_minutes(), dur_str) for dur_str in dur_strs]
+
+
+def parse_classic(dur_strs):
+	return [outcome(lambda dur_str: HM_Duration.parse(
+		dur_str, DurationFormat.CLASSIC).to_minutes(), dur_str)
+		for dur_str in dur_strs]
+
+
+def parse_file(dur_strs):
+	with NamedTemporaryFile("w", encoding="utf-8", delete=False) as file:
+		file.write("\n".join(dur_strs))
+
+	try:
+		return parse_file_parallel(file.name, 1, InvalidPolicy.SKIP).tolist()
+	finally:
+		remove(file.name)
+
+
+def parse_many(dur_strs):
+	return [ValueError if isinstance(result, InvalidDuration)
+		else _total_minutes(result) for result
+		in duration_from_str_many(dur_strs, InvalidPolicy.SENTINEL)]
+
+
+def parse_many_instances(dur_strs):
+	return [ValueError if isinstance(result, InvalidDuration)
+		else result.to_minutes() for result
+		in HM_Duration.from_str_many(dur_strs, InvalidPolicy.SENTINEL)]
+
+
+def parse_minutes(dur_strs):
+	return minutes_from_str_many(dur_strs, InvalidPolicy.SKIP).tolist()
+
+
+def parse_stream(dur_strs):
+	data = "\n".join(dur_strs).encode()
+
+	async def generate_chunks():
+		for start in range(0, len(data), STREAM_CHUNK_SIZE):
+			yield data[start:start + STREAM_CHUNK_SIZE]
+
+	async def parse_chunks():
+		return [duration.to_minutes() async for batch in parse_duration_stream(
+			generate_chunks(), on_invalid=InvalidPolicy.SKIP,
+			executor_threshold=0) for duration in batch]
+
+	return run(parse_chunks())
+
+
+def parse_with_builder(dur_strs):
+	return [outcome(lambda dur_str: DurationBuilder(dur_str).to_minutes(),
+		dur_str) for dur_str in dur_strs]
+
+
+def parse_with_pandas(dur_strs):
+	durations = pandas_array(dur_strs, dtype=HM_DurationDtype())
+	return durations.astype("int64").tolist()
+
+
+def _total_minutes(duration):
+	return duration[0] * 60 + duration[1]
+
+
+BACKENDS = {
+	"interned HM_Duration.__init__":
+		Backend("construction", interned(construct_interned)),
+	"HM_Duration.from_timedelta": Backend("construction",
+		construct_from_timedelta, domain=fits_timedelta),
+	"HM_Duration.parse": Backend("parsing", parse_classic),
+	"parse_duration (all formats)":
+		Backend("parsing", parse_all_formats, domain=is_all_formats_domain),
+	"duration_from_str_many": Backend("parsing", parse_many),
+	"HM_Duration.from_str_many": Backend("parsing", parse_many_instances),
+	"HM_Duration.from_bytes": Backend("parsing", parse_bytes,
+		domain=str.isascii),
+	"DurationBuilder": Backend("parsing", parse_with_builder),
+	"minutes_from_str_many": Backend("parsing", parse_minutes,
+		InvalidPolicy.SKIP, fits_minute_array),
+	"parse_file_parallel":
+		Backend("parsing", parse_file, InvalidPolicy.SKIP, fits_lines),
+	"parse_duration_stream":
+		Backend("parsing", parse_stream, InvalidPolicy.SKIP, fits_lines),
+	"HM_Duration.__str__": Backend("formatting", format_with_str),
+	"duration_to_str_many": Backend("formatting", duration_to_str_many),
+	"duration_to_str_many (stream)": Backend("formatting", format_to_stream),
+	"duration_to_bytes": Backend("formatting", format_to_bytes),
+	"DurationBuilder.__str__": Backend("formatting", format_with_builder),
+	"interned HM_Duration operators":
+		Backend("arithmetic", interned(operate_interned)),
+	"DurationBuilder operators": Backend("arithmetic",
+		arithmetic_with_builder, domain=is_in_place_operation),
+	"timedelta operators": Backend("arithmetic", arithmetic_with_timedelta,
+		domain=fits_timedelta_sum)
+}
+"""
+The accelerated backends, keyed by name. The NumPy and pandas backends are
+added below if these packages are installed.
+"""
+
+if np is not None:
+	BACKENDS["HM_DurationArray.hours and .minutes"] = Backend("construction",
+		construct_with_numpy, domain=fits_timedelta)
+	BACKENDS["HM_DurationArray operators"] = Backend("arithmetic",
+		operate_with_numpy, domain=fits_float_arrays)
+
+if pandas_array is not None:
+	BACKENDS["HM_DurationExtensionArray from strings"] = Backend("parsing",
+		parse_with_pandas, InvalidPolicy.RAISE, fits_minute_array)
+	BACKENDS["HM_DurationExtensionArray.astype(str)"] = Backend("formatting",
+		format_with_pandas, domain=fits_int64)
+	BACKENDS["HM_DurationExtensionArray operators"] = Backend("arithmetic",
+		operate_with_pandas, domain=fits_float_arrays)
+
+
+# The harness
+
+def check_backend(backend, items, expected, max_reports):
+	"""
+	Runs a backend on a batch of inputs and compares its results with the
+	oracle's.
+
+	Args:
+		backend (Backend): the backend
+		items (list): the inputs of the batch
+		expected (list): the oracle's results for items
+		max_reports (int): the maximum number of mismatches returned
+
+	Returns:
+		BackendResult: the outcome of the batch
+	"""
+	indices = range(len(items)) if backend.domain is None\
+		else [index for index, item in enumerate(items) if backend.domain(item)]
+
+	if backend.on_invalid is not InvalidPolicy.SENTINEL:
+		valid_indices = [index for index in indices
+			if not isinstance(expected[index], type)]
+
+		if backend.on_invalid is InvalidPolicy.RAISE:
+			indices = valid_indices
+
+	inputs = [items[index] for index in indices]
+	start = perf_counter()
+
+	try:
+		actual = list(backend.function(inputs))
+	except Exception as error:
+		# The whole batch failed.
+		return BackendResult(len(inputs), 1,
+			[("batch of " + str(len(inputs)) + " inputs", "results",
+			repr(error))], perf_counter() - start)
+
+	seconds = perf_counter() - start
+
+	if backend.on_invalid is InvalidPolicy.SKIP:
+		indices = valid_indices
+
+	mismatches = list()
+	mismatch_count = 0
+
+	if len(actual) != len(indices):
+		mismatch_count += 1
+		mismatches.append(("batch of " + str(len(inputs)) + " inputs",
+			str(len(indices)) + " results", str(len(actual)) + " results"))
+
+	for index, result in zip(indices, actual):
+		if result != expected[index]:
+			mismatch_count += 1
+
+			if len(mismatches) < max_reports:
+				mismatches.append((items[index], expected[index], result))
+
+	return BackendResult(len(inputs), mismatch_count, mismatches, seconds)
+
+
+def fuzz_backends(size=DEFAULT_SIZE, seed=0, batch_size=DEFAULT_BATCH_SIZE,
+		backend_names=None, max_reports=DEFAULT_MAX_REPORTS):
+	"""
+	Compares backends with the oracle on random and edge-case inputs. The
+	same seed always generates the same inputs.
+
+	Args:
+		size (int): the number of inputs of each category
+		seed (int): the seed of the random inputs. Defaults to 0.
+		batch_size (int): the number of inputs given to a backend at once.
+			Each batch starts with the edge cases of its category.
+		backend_names: the names of the fuzzed backends. If it is None, all
+			the backends are fuzzed. Defaults to None.
+		max_reports (int): the maximum number of mismatches kept for each
+			backend
+
+	Returns:
+		tuple:
+			[0]: (dict) the number of inputs and the time spent by the
+				oracle, keyed by category
+			[1]: (dict) the BackendResult of each fuzzed backend, keyed by
+				name
+	"""
+	if backend_names is None:
+		backend_names = list(BACKENDS)
+
+	rng = Random(seed)
+	reference_results = dict()
+	backend_results = {name: BackendResult(0, 0, [], 0.0)
+		for name in backend_names}
+
+	for category, generate in GENERATORS.items():
+		names = [name for name in backend_names
+			if BACKENDS[name].category == category]
+
+		if not names:
+			continue
+
+		reference = REFERENCES[category]
+		reference_seconds = 0.0
+
+		for batch_start in range(0, size, batch_size):
+			items = generate(rng, min(batch_size, size - batch_start))
+			start = perf_counter()
+			expected = [outcome(reference, item) for item in items]
+			reference_seconds += perf_counter() - start
+
+			for name in names:
+				result = check_backend(BACKENDS[name], items, expected,
+					max_reports)
+				total = backend_results[name]
+				backend_results[name] = BackendResult(
+					total.checked + result.checked,
+					total.mismatch_count + result.mismatch_count,
+					(total.mismatches + result.mismatches)[:max_reports],
+					total.seconds + result.seconds)
+
+		reference_results[category] = size, reference_seconds
+
+	return reference_results, backend_results
+
+
+def main():
+	parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+		help="the number of inputs of each category")
+	parser.add_argument("--seed", type=int, default=0,
+		help="the seed of the random inputs")
+	parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+		help="the number of inputs given to a backend at once")
+	parser.add_argument("--backend", action="append", choices=list(BACKENDS),
+		metavar="NAME", help="fuzz only this backend. Can be repeated.")
+	parser.add_argument("--max-reports", type=int,
+		default=DEFAULT_MAX_REPORTS,
+		help="the maximum number of mismatches printed for each backend")
+	args = parser.parse_args()
+
+	reference_results, backend_results = fuzz_backends(args.size, args.seed,
+		args.batch_size, args.backend, args.max_reports)
+	mismatch_found = False
+
+	for category, (count, seconds) in reference_results.items():
+		print(category)
+		print_result("oracle", count / seconds, "inputs/s")
+
+		for name, result in backend_results.items():
+			if BACKENDS[name].category != category:
+				continue
+
+			print_result(name, result.checked / max(result.seconds, 1e-9),
+				"inputs/s", ", " + str(result.checked) + " checked, "
+				+ str(result.mismatch_count) + " mismatches")
+
+			for item, expected, actual in result.mismatches:
+				print("\tInput " + repr(item) + ": expected " + repr(expected)
+					+ ", actual " + repr(actual))
+
+			mismatch_found = mismatch_found or result.mismatch_count > 0
+
+		print()
+
+	if mismatch_found:
+		exit(1)
+
+
+if __name__ == "__main__":
+	main()
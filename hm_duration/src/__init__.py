@@ -1,3 +1,79 @@
+from importlib import import_module
+
+from .duration_bytes import\
+    bytes_repr_duration, duration_from_bytes, duration_to_bytes
+from .duration_cache import DurationCache, EvictionPolicy
 from .duration_string import\
-    DURATION_STR_PATTERN, duration_to_str, str_repr_duration
-from .hm_duration import HM_Duration
+    DURATION_STR_PATTERN, DurationFormat, InvalidDuration, InvalidPolicy,\
+    duration_to_str, duration_to_str_many, duration_from_str_many,\
+    minutes_from_str_many, parse_duration, str_repr_duration
+from .duration_timedelta import TimedeltaRounding, minutes_from_timedelta,\
+    minutes_from_timedeltas, timedeltas_from_minutes
+from .hm_duration import HM_Duration,\
+    disable_interning, enable_interning, interning_cache
+
+
+_LAZY_ATTRS = {
+	"DurationAccumulator": ".duration_aggregation",
+	"count_by_key": ".duration_aggregation",
+	"sum_by_key": ".duration_aggregation",
+	"HM_DurationArray": ".duration_array",
+	"HM_DurationDtype": ".duration_pandas",
+	"HM_DurationExtensionArray": ".duration_pandas",
+	"DurationBuilder": ".duration_builder",
+	"Instrumentation": ".duration_instrumentation",
+	"disable_instrumentation": ".duration_instrumentation",
+	"enable_instrumentation": ".duration_instrumentation",
+	"instrumentation": ".duration_instrumentation",
+	"parse_duration_stream": ".duration_async",
+	"MappedDurations": ".duration_binary",
+	"read_durations": ".duration_binary",
+	"write_durations": ".duration_binary",
+	"IndexedDurations": ".duration_index",
+	"DurationSketch": ".duration_sketch",
+	"SortMethod": ".duration_order",
+	"median": ".duration_order",
+	"percentile": ".duration_order",
+	"sort_durations": ".duration_order",
+	"sort_key": ".duration_order",
+	"sorted_durations": ".duration_order",
+	"top_k": ".duration_order",
+	"parse_file_parallel": ".duration_parallel"
+}
+"""
+The attributes that are imported from their module on first access, so that
+importing the package does not load heavy or optional dependencies such as
+asyncio, multiprocessing, NumPy or pandas
+"""
+
+
+def __dir__():
+	return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+def __getattr__(name):
+	"""
+	Imports a lazy attribute from its module on first access. Later accesses
+	find the attribute in the package's namespace.
+
+	Args:
+		name (str): the attribute's name
+
+	Returns:
+		the attribute
+
+	Raises:
+		AttributeError: if the package does not have the attribute
+		ImportError: if the attribute's module needs a dependency that is not
+			installed, such as NumPy for HM_DurationArray or pandas for
+			HM_DurationDtype
+	"""
+	module_name = _LAZY_ATTRS.get(name)
+
+	if module_name is None:
+		raise AttributeError(
+			"module '" + __name__ + "' has no attribute '" + name + "'")
+
+	value = getattr(import_module(module_name, __name__), name)
+	globals()[name] = value
+	return value
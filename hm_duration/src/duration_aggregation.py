@@ -0,0 +1,276 @@
+"""
+This module aggregates durations, possibly grouped by a key. The partial
+results are kept as integral numbers of minutes, and HM_Duration instances are
+created only for the final results.
+"""
+
+
+from .duration_string import duration_from_str
+from .hm_duration import HM_Duration, _MINS_IN_HOUR, _round_half_up
+
+
+class DurationAccumulator:
+	"""
+	This class consumes durations one by one or from a stream and keeps their
+	count, sum, minimum and maximum as integral numbers of minutes. It accepts
+	HM_Duration instances, their string representations and signed integral
+	numbers of minutes. The results are converted to HM_Duration on request.
+	"""
+
+	__slots__ = ("_count", "_sum", "_min", "_max")
+
+	def __init__(self, durations=()):
+		"""
+		The constructor can consume initial durations.
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or integral numbers of minutes. Defaults to an empty tuple.
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		self._count = 0
+		self._sum = 0
+		self._min = None
+		self._max = None
+		self.update(durations)
+
+	def __len__(self):
+		return self._count
+
+	def add(self, duration):
+		"""
+		Consumes one duration.
+
+		Args:
+			duration (HM_Duration, str or int): a duration, its string
+				representation or its signed integral number of minutes
+
+		Raises:
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		self.add_minutes(_to_minutes(duration))
+
+	def add_minutes(self, minutes):
+		"""
+		Consumes one duration expressed as a number of minutes.
+
+		Args:
+			minutes (int): a signed integral number of minutes
+		"""
+		self._count += 1
+		self._sum += minutes
+
+		if self._min is None or minutes < self._min:
+			self._min = minutes
+
+		if self._max is None or minutes > self._max:
+			self._max = minutes
+
+	@property
+	def count(self):
+		"""
+		This read-only property returns the number of consumed durations.
+		"""
+		return self._count
+
+	def max(self):
+		"""
+		Gets the greatest consumed duration.
+
+		Returns:
+			HM_Duration: the maximum
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		self._raise_except_if_empty()
+		return HM_Duration._from_minutes(self._max)
+
+	def mean(self):
+		"""
+		Computes the mean of the consumed durations. Like HM_Duration division,
+		the result is rounded half up to the nearest minute.
+
+		Returns:
+			HM_Duration: the mean
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		self._raise_except_if_empty()
+		mean_as_mins = int(_round_half_up(self._sum / self._count))
+		return HM_Duration._from_minutes(mean_as_mins)
+
+	def merge(self, other):
+		"""
+		Adds the durations consumed by another accumulator to this one, for
+		example to combine the results of several workers.
+
+		Args:
+			other (DurationAccumulator): another accumulator
+		"""
+		if other._count == 0:
+			return
+
+		self._count += other._count
+		self._sum += other._sum
+
+		if self._min is None or other._min < self._min:
+			self._min = other._min
+
+		if self._max is None or other._max > self._max:
+			self._max = other._max
+
+	def min(self):
+		"""
+		Gets the least consumed duration.
+
+		Returns:
+			HM_Duration: the minimum
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		self._raise_except_if_empty()
+		return HM_Duration._from_minutes(self._min)
+
+	def _raise_except_if_empty(self):
+		"""
+		Raises a ValueError if this accumulator has not consumed any duration.
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		if self._count == 0:
+			raise ValueError("No duration was accumulated.")
+
+	def sum(self):
+		"""
+		Computes the sum of the consumed durations. The sum of no durations is
+		null.
+
+		Returns:
+			HM_Duration: the sum
+		"""
+		return HM_Duration._from_minutes(self._sum)
+
+	@property
+	def sum_minutes(self):
+		"""
+		This read-only property returns the sum of the consumed durations as a
+		signed integral number of minutes.
+		"""
+		return self._sum
+
+	def update(self, durations):
+		"""
+		Consumes durations from an iterable.
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or integral numbers of minutes
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		self._update_minutes(map(_to_minutes, durations))
+
+	def _update_minutes(self, minute_seq):
+		"""
+		Consumes durations expressed as numbers of minutes from an iterable.
+		If the iterable raises an exception, the durations consumed before it
+		are kept.
+
+		Args:
+			minute_seq: an iterable of signed integral numbers of minutes
+		"""
+		count = self._count
+		total = self._sum
+		minimum = self._min
+		maximum = self._max
+
+		try:
+			for minutes in minute_seq:
+				count += 1
+				total += minutes
+
+				if minimum is None or minutes < minimum:
+					minimum = minutes
+
+				if maximum is None or minutes > maximum:
+					maximum = minutes
+		finally:
+			# Keep the durations consumed before an invalid string.
+			self._count = count
+			self._sum = total
+			self._min = minimum
+			self._max = maximum
+
+
+def count_by_key(pairs):
+	"""
+	Counts the durations associated with each key in a single pass.
+
+	Args:
+		pairs: an iterable of tuples (key, HM_Duration), where each key is
+			hashable
+
+	Returns:
+		dict: the number of durations associated with each key
+	"""
+	counts = dict()
+	get = counts.get
+
+	for key, _ in pairs:
+		counts[key] = get(key, 0) + 1
+
+	return counts
+
+
+def sum_by_key(pairs):
+	"""
+	Sums the durations associated with each key in a single pass.
+
+	Args:
+		pairs: an iterable of tuples (key, HM_Duration), where each key is
+			hashable
+
+	Returns:
+		dict: the sum of the durations associated with each key, as an
+			HM_Duration
+	"""
+	totals = dict()
+	get = totals.get
+
+	for key, duration in pairs:
+		totals[key] = get(key, 0) + duration.to_minutes()
+
+	from_minutes = HM_Duration._from_minutes
+	return {key: from_minutes(total) for key, total in totals.items()}
+
+
+def _to_minutes(duration):
+	"""
+	Converts a duration to a signed integral number of minutes.
+
+	Args:
+		duration (HM_Duration, str or int): a duration, its string
+			representation or its number of minutes
+
+	Returns:
+		int: the duration's number of minutes
+
+	Raises:
+		ValueError: if duration is a string that does not represent a duration
+	"""
+	if duration.__class__ is int:
+		return duration
+
+	if isinstance(duration, str):
+		hours, minutes = duration_from_str(duration)
+		return hours * _MINS_IN_HOUR + minutes
+
+	return duration.to_minutes()
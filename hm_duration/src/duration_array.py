@@ -0,0 +1,352 @@
+"""
+This module provides a column of durations stored as a NumPy array of signed
+minute counts. Its operations apply to whole arrays and follow the semantics
+of class HM_Duration. NumPy is required by this module only.
+"""
+
+
+import numpy as np
+
+from .hm_duration import HM_Duration, _MINS_IN_HOUR
+
+
+_MINUTE_DTYPE = np.int64
+
+
+class HM_DurationArray:
+	"""
+	This class represents a sequence of durations in hours and minutes. The
+	durations are stored as an int64 array of signed minute counts, and the
+	arithmetic operations and the comparisons apply to the whole array at
+	once. Indexing with an integer yields an HM_Duration.
+	"""
+
+	__slots__ = ("_mins",)
+
+	def __init__(self, durations=()):
+		"""
+		The constructor needs the durations that the array will contain.
+
+		Args:
+			durations: an iterable of HM_Duration instances
+		"""
+		self._mins = np.fromiter(
+			(duration.to_minutes() for duration in durations),
+			dtype=_MINUTE_DTYPE)
+
+	def __abs__(self):
+		return HM_DurationArray._from_minute_array(np.abs(self._mins))
+
+	def __add__(self, other):
+		"""
+		Creates an array that contains the element-wise sum of self and other.
+
+		Args:
+			other (HM_DurationArray or HM_Duration): durations to add
+
+		Returns:
+			HM_DurationArray: the sum of self and other
+		"""
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return HM_DurationArray._from_minute_array(self._mins + other_mins)
+
+	def __eq__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins == other_mins
+
+	def __ge__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins >= other_mins
+
+	def __getitem__(self, index):
+		"""
+		Indexes this array like a NumPy array.
+
+		Args:
+			index: an integer, a slice, an integer array or a boolean mask
+
+		Returns:
+			HM_Duration: the duration at the index if it is an integer
+			HM_DurationArray: the selected durations otherwise
+		"""
+		selection = self._mins[index]
+
+		if isinstance(selection, np.ndarray):
+			return HM_DurationArray._from_minute_array(selection)
+
+		return HM_Duration._from_minutes(int(selection))
+
+	def __gt__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins > other_mins
+
+	__hash__ = None
+
+	def __iter__(self):
+		from_minutes = HM_Duration._from_minutes
+		return (from_minutes(mins) for mins in self._mins.tolist())
+
+	def __le__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins <= other_mins
+
+	def __len__(self):
+		return len(self._mins)
+
+	def __lt__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins < other_mins
+
+	def __mul__(self, number):
+		"""
+		Creates an array that contains the element-wise product of self by a
+		number or by an array of numbers. Like HM_Duration.__mul__, the
+		results are rounded half up to the nearest minute.
+
+		Args:
+			number: an integral or real number or an array of numbers
+
+		Returns:
+			HM_DurationArray: the product of self by number
+
+		Raises:
+			OverflowError: if a product is infinite
+			ValueError: if a product is NaN
+		"""
+		return HM_DurationArray._from_minute_array(
+			_round_half_up(_multiply(self._mins, number)))
+
+	def __ne__(self, other):
+		other_mins = _other_minutes(other)
+		return NotImplemented if other_mins is NotImplemented\
+			else self._mins != other_mins
+
+	def __neg__(self):
+		return HM_DurationArray._from_minute_array(-self._mins)
+
+	def __radd__(self, other):
+		return self.__add__(other)
+
+	def __repr__(self):
+		return self.__class__.__name__ + "(["\
+			+ ", ".join(repr(duration) for duration in self) + "])"
+
+	def __rmul__(self, number):
+		return self.__mul__(number)
+
+	def __rsub__(self, other):
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return HM_DurationArray._from_minute_array(other_mins - self._mins)
+
+	def __str__(self):
+		return "[" + ", ".join(str(duration) for duration in self) + "]"
+
+	def __sub__(self, other):
+		"""
+		Creates an array that contains the element-wise difference of self
+		and other.
+
+		Args:
+			other (HM_DurationArray or HM_Duration): durations to subtract
+
+		Returns:
+			HM_DurationArray: the difference of self and other
+		"""
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return HM_DurationArray._from_minute_array(self._mins - other_mins)
+
+	def __truediv__(self, number):
+		"""
+		Creates an array that contains the element-wise quotient of self by a
+		number or by an array of numbers. Like HM_Duration.__truediv__, the
+		results are rounded half up to the nearest minute.
+
+		Args:
+			number: an integral or real number or an array of numbers
+
+		Returns:
+			HM_DurationArray: the quotient of self by number
+
+		Raises:
+			ValueError: if a number is NaN
+			ZeroDivisionError: if a number is null
+		"""
+		return HM_DurationArray._from_minute_array(
+			_round_half_up(self._mins / _divisor_array(number)))
+
+	@staticmethod
+	def from_minutes(minutes):
+		"""
+		Creates an array from signed minute counts.
+
+		Args:
+			minutes: an array-like object of integral numbers of minutes
+
+		Returns:
+			HM_DurationArray: the durations that last the given minutes
+		"""
+		return HM_DurationArray._from_minute_array(
+			np.array(minutes, dtype=_MINUTE_DTYPE))
+
+	@classmethod
+	def _from_minute_array(cls, minutes):
+		"""
+		Wraps an int64 array of minutes without copying or validating it.
+
+		Args:
+			minutes (numpy.ndarray): an int64 array of signed minute counts
+
+		Returns:
+			HM_DurationArray: an array that uses minutes as its storage
+		"""
+		duration_array = object.__new__(cls)
+		duration_array._mins = minutes
+		return duration_array
+
+	@property
+	def hours(self):
+		"""
+		This read-only property returns an array that contains the number of
+		hours of each duration.
+		"""
+		return np.sign(self._mins) * (np.abs(self._mins) // _MINS_IN_HOUR)
+
+	@property
+	def minutes(self):
+		"""
+		This read-only property returns an array that contains the number of
+		minutes of each duration.
+		"""
+		return np.sign(self._mins) * (np.abs(self._mins) % _MINS_IN_HOUR)
+
+	@property
+	def sign(self):
+		"""
+		This read-only property returns an array that contains the sign of
+		each duration: -1 if negative, 0 if null or 1 if positive.
+		"""
+		return np.sign(self._mins)
+
+	def to_hours(self):
+		"""
+		Converts the durations to real numbers of hours.
+
+		Returns:
+			numpy.ndarray: a float64 array of numbers of hours
+		"""
+		hours, minutes = np.divmod(np.abs(self._mins), _MINS_IN_HOUR)
+		return np.sign(self._mins) * (hours + minutes / _MINS_IN_HOUR)
+
+	def to_list(self):
+		"""
+		Converts this array to a list of HM_Duration instances.
+
+		Returns:
+			list: the durations in this array
+		"""
+		return list(self)
+
+	def to_minutes(self):
+		"""
+		Converts the durations to integral numbers of minutes.
+
+		Returns:
+			numpy.ndarray: a copy of the int64 array of minute counts
+		"""
+		return self._mins.copy()
+
+
+def _other_minutes(other):
+	"""
+	Gets the minute counts of the other operand of an arithmetic operation or
+	a comparison.
+
+	Args:
+		other: an operand
+
+	Returns:
+		the minute array of other if it is an HM_DurationArray, its integral
+		number of minutes if it is an HM_Duration, NotImplemented otherwise
+	"""
+	if isinstance(other, HM_DurationArray):
+		return other._mins
+
+	if isinstance(other, HM_Duration):
+		return other.to_minutes()
+
+	return NotImplemented
+
+
+def _divisor_array(number):
+	"""
+	Converts the divisors of an array of durations to an array. Like
+	HM_Duration.__truediv__, it rejects null divisors, which NumPy would turn
+	into invalid minute counts.
+
+	Args:
+		number: an integral or real number or an array of numbers
+
+	Returns:
+		numpy.ndarray: number as an array
+
+	Raises:
+		ZeroDivisionError: if a value is null
+	"""
+	divisor = np.asarray(number)
+
+	if (divisor == 0).any():
+		raise ZeroDivisionError("division by zero")
+
+	return divisor
+
+
+def _multiply(minutes, number):
+	# Multiplies minute counts like HM_Duration.__mul__. A null count times an
+	# infinite factor is NaN, which _round_half_up rejects without a warning.
+	with np.errstate(invalid="ignore"):
+		return minutes * np.asarray(number)
+
+
+def _round_half_up(minutes):
+	"""
+	Vectorized counterpart of hm_duration._round_half_up. Like math.floor, it
+	rejects the minute counts that are not finite, and the first of them
+	determines the exception, like an element-wise loop over the scalars.
+
+	Args:
+		minutes (numpy.ndarray): real numbers of minutes
+
+	Returns:
+		numpy.ndarray: the int64 minute counts rounded half up
+
+	Raises:
+		OverflowError: if a minute count is infinite
+		ValueError: if a minute count is NaN
+	"""
+	if minutes.dtype.kind == "f":
+		not_finite = ~np.isfinite(minutes)
+
+		if not_finite.any():
+			if np.isnan(minutes[not_finite.argmax()]):
+				raise ValueError("cannot convert float NaN to integer")
+
+			raise OverflowError("cannot convert float infinity to integer")
+
+	return np.floor(minutes + 0.5).astype(_MINUTE_DTYPE)
@@ -0,0 +1,135 @@
+"""
+This module parses newline-delimited duration strings that arrive through
+asyncio streams. Each line must match DURATION_STR_PATTERN, and empty lines are
+ignored. Large chunks are parsed in an executor so that the event loop stays
+responsive.
+"""
+
+
+from asyncio import get_running_loop
+
+from .duration_string import InvalidPolicy, _split_lines
+from .hm_duration import HM_Duration
+
+
+_DEFAULT_BATCH_SIZE = 1024
+_DEFAULT_CHUNK_SIZE = 65536
+_DEFAULT_EXECUTOR_THRESHOLD = 65536
+_NEWLINE = b"\n"
+
+
+async def parse_duration_stream(source, batch_size=_DEFAULT_BATCH_SIZE,
+		on_invalid=InvalidPolicy.RAISE, chunk_size=_DEFAULT_CHUNK_SIZE,
+		executor_threshold=_DEFAULT_EXECUTOR_THRESHOLD, executor=None):
+	"""
+	Parses newline-delimited duration strings from an asyncio stream and
+	yields the durations in batches. The source is read only when the
+	consumer requests the next batch, which applies backpressure to the
+	producer. Chunks of at least executor_threshold bytes are parsed in an
+	executor rather than in the event loop.
+
+	Args:
+		source: an asyncio.StreamReader or an asynchronous iterable of bytes
+		batch_size (int): the maximum number of results per batch. Defaults
+			to 1024.
+		on_invalid (InvalidPolicy): what to do with the lines that do not
+			match DURATION_STR_PATTERN. Defaults to InvalidPolicy.RAISE.
+		chunk_size (int): the number of bytes read from a StreamReader at
+			once. Defaults to 65536.
+		executor_threshold (int): the size in bytes from which a chunk is
+			parsed in an executor. Defaults to 65536.
+		executor (concurrent.futures.Executor): the executor that parses
+			large chunks. If it is None, the event loop's default executor is
+			used. Defaults to None.
+
+	Yields:
+		list: HM_Duration instances, and InvalidDuration sentinels whose index
+			is the line's index among the non-empty lines if on_invalid is
+			InvalidPolicy.SENTINEL
+
+	Raises:
+		ValueError: if batch_size or chunk_size is less than 1, if a line is
+			invalid and on_invalid is InvalidPolicy.RAISE, or if the bytes are
+			not valid UTF-8
+	"""
+	if batch_size < 1:
+		raise ValueError("Argument batch_size must be at least 1.")
+
+	if chunk_size < 1:
+		raise ValueError("Argument chunk_size must be at least 1.")
+
+	loop = get_running_loop()
+	line_count = 0
+	leftover = b""
+	pending = list()
+
+	async for chunk in _read_chunks(source, chunk_size):
+		last_newline = chunk.rfind(_NEWLINE)
+
+		if last_newline < 0:
+			leftover += chunk
+			continue
+
+		data = leftover + chunk[:last_newline]
+		leftover = chunk[last_newline+1:]
+		lines = _split_lines(data)
+
+		if len(data) >= executor_threshold:
+			results = await loop.run_in_executor(executor,
+				_parse_lines, lines, on_invalid, line_count)
+		else:
+			results = _parse_lines(lines, on_invalid, line_count)
+
+		line_count += len(lines)
+		pending.extend(results)
+
+		while len(pending) >= batch_size:
+			yield pending[:batch_size]
+			del pending[:batch_size]
+
+	pending.extend(_parse_lines(_split_lines(leftover), on_invalid, line_count))
+
+	while len(pending) > 0:
+		yield pending[:batch_size]
+		del pending[:batch_size]
+
+
+def _parse_lines(lines, on_invalid, start):
+	"""
+	Creates a duration from each line. This function is module-level so that
+	process pool executors can pickle it.
+
+	Args:
+		lines (list): duration strings
+		on_invalid (InvalidPolicy): what to do with the invalid lines
+		start (int): the index of the first line
+
+	Returns:
+		list: HM_Duration instances and possibly InvalidDuration sentinels
+	"""
+	return list(HM_Duration.from_str_many(lines, on_invalid, start))
+
+
+async def _read_chunks(source, chunk_size):
+	"""
+	Reads chunks of bytes from a StreamReader or an asynchronous iterable.
+
+	Args:
+		source: an asyncio.StreamReader or an asynchronous iterable of bytes
+		chunk_size (int): the number of bytes read from a StreamReader at
+			once
+
+	Yields:
+		bytes: the chunks
+	"""
+	if hasattr(source, "read"):
+		while True:
+			chunk = await source.read(chunk_size)
+
+			if not chunk:
+				return
+
+			yield chunk
+	else:
+		async for chunk in source:
+			yield bytes(chunk)
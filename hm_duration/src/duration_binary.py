@@ -0,0 +1,257 @@
+"""
+This module stores durations in a compact binary file format and reads them
+through a memory map. A file consists of a 16-byte header followed by the
+signed numbers of minutes of the durations as little-endian 64-bit integers.
+
+The header contains, in this order, the magic number b"HMDU", the format
+version on one byte, three reserved null bytes and the number of durations as
+a little-endian unsigned 64-bit integer.
+"""
+
+
+from array import array
+from collections.abc import Sequence
+from mmap import ACCESS_READ, mmap
+from struct import Struct
+from sys import byteorder
+
+from .duration_string import _MINUTE_TYPECODE
+from .hm_duration import HM_Duration
+
+
+_FORMAT_VERSION = 1
+_HEADER = Struct("<4sB3xQ")
+_LITTLE_ENDIAN = byteorder == "little"
+_MAGIC = b"HMDU"
+_WRITE_CHUNK_SIZE = 65536
+
+
+class MappedDurations(Sequence):
+	"""
+	This class is a read-only sequence of the durations stored in a binary
+	file. The file is memory-mapped, and an HM_Duration is created only when
+	an index is accessed. Close the sequence, or use it as a context manager,
+	to release the file.
+	"""
+
+	def __init__(self, path):
+		"""
+		The constructor maps a file written by function write_durations.
+
+		Args:
+			path (str or os.PathLike): the path to the file
+
+		Raises:
+			ValueError: if the file does not have the format of this module
+		"""
+		with open(path, "rb") as file:
+			self._map = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+		try:
+			self._count = _read_header(self._map)
+		except ValueError:
+			self._map.close()
+			raise
+
+		self._minutes = self._view_minutes()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def __getitem__(self, index):
+		"""
+		Creates the duration at an index or the durations in a slice.
+
+		Args:
+			index (int or slice): an index or a slice
+
+		Returns:
+			HM_Duration: the duration at index if it is an integer
+			list: the durations in the slice otherwise
+		"""
+		if isinstance(index, slice):
+			from_minutes = HM_Duration._from_minutes
+			return [from_minutes(minutes)
+				for minutes in self._minutes[index].tolist()]
+
+		return HM_Duration._from_minutes(self._minutes[index])
+
+	def __len__(self):
+		return self._count
+
+	def close(self):
+		"""
+		Releases the memory map and the file. The views returned by method
+		minutes must be released and the arrays returned by method to_numpy
+		must be dropped first. Otherwise, this sequence stays open and usable.
+
+		Raises:
+			BufferError: if a view or an array of the minutes still exists
+		"""
+		self._minutes.release()
+
+		try:
+			self._map.close()
+		except BufferError:
+			# A view or an array of the minutes still exports the map. View
+			# the minutes again so that this sequence stays usable.
+			self._minutes = self._view_minutes()
+			raise
+
+	def minutes(self):
+		"""
+		Gets the numbers of minutes of the durations without copying them.
+		The view must be released before this sequence is closed.
+
+		Returns:
+			memoryview: a view of signed 64-bit integers, with format "q"
+		"""
+		return self._minutes[:]
+
+	def to_array(self):
+		"""
+		Copies the numbers of minutes of the durations to an array.
+
+		Returns:
+			array.array: the numbers of minutes, with typecode "q"
+		"""
+		return array(_MINUTE_TYPECODE, self._minutes)
+
+	def to_numpy(self):
+		"""
+		Gets the numbers of minutes of the durations as a NumPy array that
+		shares the memory map, without copying them. NumPy must be installed.
+		The array must be dropped before this sequence is closed.
+
+		Returns:
+			numpy.ndarray: a read-only int64 array
+		"""
+		from numpy import frombuffer
+		return frombuffer(self._minutes, dtype=_MINUTE_TYPECODE)
+
+	def _view_minutes(self):
+		"""
+		Makes a view of the numbers of minutes in the memory map. On a
+		big-endian platform, the view's memory is a byteswapped copy.
+
+		Returns:
+			memoryview: a view of signed 64-bit integers, with format "q"
+		"""
+		data = memoryview(self._map)[_HEADER.size:]
+
+		if _LITTLE_ENDIAN:
+			return data.cast(_MINUTE_TYPECODE)
+
+		minutes = array(_MINUTE_TYPECODE, data)
+		minutes.byteswap()
+		data.release()
+		return memoryview(minutes)
+
+
+def read_durations(path):
+	"""
+	Maps a binary file of durations written by function write_durations.
+
+	Args:
+		path (str or os.PathLike): the path to the file
+
+	Returns:
+		MappedDurations: a lazy sequence of the durations in the file
+
+	Raises:
+		ValueError: if the file does not have the format of this module
+	"""
+	return MappedDurations(path)
+
+
+def _read_header(buffer):
+	"""
+	Reads and checks the header of a binary file of durations.
+
+	Args:
+		buffer: the file's content
+
+	Returns:
+		int: the number of durations in the file
+
+	Raises:
+		ValueError: if the header is invalid or does not match the file's
+			size
+	"""
+	if len(buffer) < _HEADER.size:
+		raise ValueError("The file is too short to contain a header.")
+
+	magic, version, count = _HEADER.unpack_from(buffer)
+
+	if magic != _MAGIC:
+		raise ValueError("The file is not a binary file of durations.")
+
+	if version != _FORMAT_VERSION:
+		raise ValueError("Format version " + str(version)
+			+ " is not supported.")
+
+	if len(buffer) != _HEADER.size + count * 8:
+		raise ValueError("The file's size does not match its header.")
+
+	return count
+
+
+def write_durations(path, durations):
+	"""
+	Writes durations to a binary file. An array with typecode "q", such as
+	the one returned by parse_file_parallel, is written without conversion.
+
+	Args:
+		path (str or os.PathLike): the path to the file
+		durations: an iterable of HM_Duration instances or of signed integral
+			numbers of minutes
+
+	Returns:
+		int: the number of durations written
+	"""
+	count = 0
+
+	with open(path, "wb") as file:
+		file.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0))
+
+		if isinstance(durations, array)\
+				and durations.typecode == _MINUTE_TYPECODE:
+			_write_minutes(file, durations)
+			count = len(durations)
+		else:
+			chunk = array(_MINUTE_TYPECODE)
+
+			for duration in durations:
+				chunk.append(duration if duration.__class__ is int
+					else duration.to_minutes())
+
+				if len(chunk) == _WRITE_CHUNK_SIZE:
+					_write_minutes(file, chunk)
+					count += len(chunk)
+					chunk = array(_MINUTE_TYPECODE)
+
+			_write_minutes(file, chunk)
+			count += len(chunk)
+
+		file.seek(0)
+		file.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, count))
+
+	return count
+
+
+def _write_minutes(file, minutes):
+	"""
+	Writes numbers of minutes to a file as little-endian 64-bit integers.
+
+	Args:
+		file: a binary file open for writing
+		minutes (array.array): numbers of minutes, with typecode "q"
+	"""
+	if not _LITTLE_ENDIAN:
+		minutes = array(_MINUTE_TYPECODE, minutes)
+		minutes.byteswap()
+
+	file.write(minutes)
@@ -0,0 +1,142 @@
+"""
+This module provides a mutable counterpart of HM_Duration for accumulation
+loops. Its in-place operators update a number of minutes instead of creating
+an instance at each iteration.
+"""
+
+
+from .duration_aggregation import _to_minutes
+from .duration_string import _minutes_to_str
+from .hm_duration import HM_Duration, _round_half_up
+
+
+class DurationBuilder:
+	"""
+	This class represents a mutable duration stored as a signed number of
+	minutes. Its in-place operators (+=, -=, *= and /=) modify it, and method
+	freeze makes an immutable HM_Duration from it. Instances are not
+	hashable.
+	"""
+
+	__slots__ = ("_mins",)
+
+	def __init__(self, duration=0):
+		"""
+		The constructor needs the initial duration.
+
+		Args:
+			duration (HM_Duration, str, int or DurationBuilder): a duration,
+				its string representation or its signed integral number of
+				minutes. Defaults to 0.
+
+		Raises:
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		self._mins = _to_minutes(duration)
+
+	__hash__ = None
+
+	def __iadd__(self, other):
+		"""
+		Adds a duration to this one.
+
+		Args:
+			other (HM_Duration, str, int or DurationBuilder): a duration, its
+				string representation or its number of minutes
+
+		Returns:
+			DurationBuilder: self
+
+		Raises:
+			ValueError: if other is a string that does not represent a
+				duration
+		"""
+		self._mins += _to_minutes(other)
+		return self
+
+	def __imul__(self, number):
+		"""
+		Multiplies this duration by a number. The result is approximated to
+		the nearest minute like HM_Duration.__mul__.
+
+		Args:
+			number (int or float): any integral or real number
+
+		Returns:
+			DurationBuilder: self
+		"""
+		self._mins = int(_round_half_up(self._mins * number))
+		return self
+
+	def __isub__(self, other):
+		"""
+		Subtracts a duration from this one.
+
+		Args:
+			other (HM_Duration, str, int or DurationBuilder): a duration, its
+				string representation or its number of minutes
+
+		Returns:
+			DurationBuilder: self
+
+		Raises:
+			ValueError: if other is a string that does not represent a
+				duration
+		"""
+		self._mins -= _to_minutes(other)
+		return self
+
+	def __itruediv__(self, number):
+		"""
+		Divides this duration by a number. The result is approximated to the
+		nearest minute like HM_Duration.__truediv__.
+
+		Args:
+			number (int or float): any integral or real number
+
+		Returns:
+			DurationBuilder: self
+		"""
+		self._mins = int(_round_half_up(self._mins / number))
+		return self
+
+	def __repr__(self):
+		return self.__class__.__name__ + "(" + str(self._mins) + ")"
+
+	def __str__(self):
+		return _minutes_to_str(self._mins)
+
+	def freeze(self):
+		"""
+		Makes an immutable duration equal to this one. Later modifications of
+		this builder do not affect it.
+
+		Returns:
+			HM_Duration: the current value of this builder
+		"""
+		return HM_Duration._from_minutes(self._mins)
+
+	def reset(self, duration=0):
+		"""
+		Sets this builder's value.
+
+		Args:
+			duration (HM_Duration, str, int or DurationBuilder): a duration,
+				its string representation or its number of minutes. Defaults
+				to 0.
+
+		Raises:
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		self._mins = _to_minutes(duration)
+
+	def to_minutes(self):
+		"""
+		Converts this duration to an integral number of minutes.
+
+		Returns:
+			int: an integral number of minutes equal to this duration
+		"""
+		return self._mins
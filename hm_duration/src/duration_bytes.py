@@ -0,0 +1,185 @@
+"""
+This module deals with the representation of durations in bytes-like objects
+such as bytes, bytearray and memoryview. The grammar is DURATION_STR_PATTERN
+applied to bytes: like a bytes regular expression, it accepts only the ASCII
+digits. Durations are parsed from a slice of a buffer and formatted into a
+caller-supplied bytearray, without decoding or encoding strings.
+"""
+
+
+from re import compile as _compile_regex
+
+from .duration_string import DURATION_STR_PATTERN
+
+
+_COLON = ord(":")
+_HYPHEN = ord("-")
+_ZERO = ord("0")
+
+_DURATION_BYTES_REGEX = _compile_regex(DURATION_STR_PATTERN.encode("ascii"))
+"""
+The bytes equivalent of DURATION_STR_PATTERN
+"""
+
+_TWO_DIGIT_FIELDS = tuple(
+	str(an_int).zfill(2).encode("ascii") for an_int in range(100))
+"""
+The formatted hour and minute fields from 00 to 99
+"""
+
+
+def bytes_repr_duration(buffer, start=0, end=None):
+	"""
+	Determines whether a slice of a bytes-like object represents a duration
+	in hours and minutes. The slice is not copied.
+
+	Args:
+		buffer: a bytes, bytearray or memoryview object
+		start (int): the index of the slice's first byte. Defaults to 0.
+		end (int): the index that follows the slice's last byte. If it is
+			None or greater than the buffer's length, the slice ends with
+			the buffer. Defaults to None.
+
+	Returns:
+		bool: True if the slice represents a duration, False otherwise
+	"""
+	if end is None:
+		end = len(buffer)
+
+	return _DURATION_BYTES_REGEX.fullmatch(buffer, start, end) is not None
+
+
+def duration_from_bytes(buffer, start=0, end=None):
+	"""
+	Extracts the number of hours and the number of minutes from a duration's
+	representation in a slice of a bytes-like object. The digits are read
+	one by one, so no intermediate object is created.
+
+	Args:
+		buffer: a bytes, bytearray or memoryview object
+		start (int): the index of the slice's first byte. Defaults to 0.
+		end (int): the index that follows the slice's last byte. If it is
+			None or greater than the buffer's length, the slice ends with
+			the buffer. Defaults to None.
+
+	Returns:
+		tuple:
+			[0]: (int) the number of hours
+			[1]: (int) the number of minutes
+
+	Raises:
+		ValueError: if bytes_repr_duration(buffer, start, end) returns False
+	"""
+	# Bound the slice like bytes_repr_duration's regular expression does.
+	if end is None or end > len(buffer):
+		end = len(buffer)
+
+	if start < 0:
+		start = 0
+
+	index = start
+	negative = index < end and buffer[index] == _HYPHEN
+
+	if negative:
+		index += 1
+
+	colon_index = end - 3
+
+	if colon_index <= index or buffer[colon_index] != _COLON:
+		_raise_invalid_bytes(buffer, start, end)
+
+	hours = 0
+
+	for hour_index in range(index, colon_index):
+		digit = buffer[hour_index] - _ZERO
+
+		if digit < 0 or digit > 9:
+			_raise_invalid_bytes(buffer, start, end)
+
+		hours = hours * 10 + digit
+
+	tens = buffer[end-2] - _ZERO
+	units = buffer[end-1] - _ZERO
+
+	if tens < 0 or tens > 9 or units < 0 or units > 9:
+		_raise_invalid_bytes(buffer, start, end)
+
+	if negative:
+		return -hours, -(tens * 10 + units)
+
+	return hours, tens * 10 + units
+
+
+def duration_to_bytes(hours, minutes, buffer=None):
+	"""
+	Makes the formatted representation of a duration in hours and minutes in
+	bytes. It is the ASCII encoding of duration_to_str(hours, minutes).
+
+	Args:
+		hours (int): the number of hours
+		minutes (int): the number of minutes
+		buffer (bytearray): the buffer to which the representation is
+			appended. If it is None, a bytes object is returned. Defaults to
+			None.
+
+	Returns:
+		bytes: the representation if buffer is None
+		int: the number of bytes appended to buffer otherwise
+	"""
+	if buffer is None:
+		dur_bytes = bytearray()
+		_append_duration(hours, minutes, dur_bytes)
+		return bytes(dur_bytes)
+
+	initial_length = len(buffer)
+	_append_duration(hours, minutes, buffer)
+	return len(buffer) - initial_length
+
+
+def _append_duration(hours, minutes, buffer):
+	"""
+	Appends the formatted representation of a duration to a bytearray.
+
+	Args:
+		hours (int): the number of hours
+		minutes (int): the number of minutes
+		buffer (bytearray): the buffer to which the representation is
+			appended
+	"""
+	if hours < 0 or minutes < 0:
+		buffer.append(_HYPHEN)
+
+	_append_field(abs(hours), buffer)
+	buffer.append(_COLON)
+	_append_field(abs(minutes), buffer)
+
+
+def _append_field(an_int, buffer):
+	"""
+	Appends a non-negative integer to a bytearray with at least two digits.
+
+	Args:
+		an_int (int): a non-negative integral number
+		buffer (bytearray): the buffer to which the integer is appended
+	"""
+	if an_int < 100:
+		buffer += _TWO_DIGIT_FIELDS[an_int]
+	else:
+		buffer += b"%d" % an_int
+
+
+def _raise_invalid_bytes(buffer, start, end):
+	"""
+	Raises a ValueError about a slice of a buffer that does not represent a
+	duration.
+
+	Args:
+		buffer: a bytes, bytearray or memoryview object
+		start (int): the index of the slice's first byte
+		end (int): the index that follows the slice's last byte
+
+	Raises:
+		ValueError: always
+	"""
+	raise ValueError("Argument " + repr(bytes(buffer[start:end]))\
+		+ " does not match regex '" + DURATION_STR_PATTERN + "'.")
@@ -0,0 +1,146 @@
+"""
+This module provides a bounded cache that lets equal durations share one
+immutable instance. The cache is keyed by signed total numbers of minutes.
+"""
+
+
+from collections import OrderedDict
+from enum import Enum
+from threading import Lock
+
+
+class EvictionPolicy(Enum):
+	"""
+	This enumeration tells a full DurationCache which entry to discard.
+	"""
+	LRU = 0
+	"""Discard the least recently used entry."""
+	FIFO = 1
+	"""Discard the oldest entry."""
+
+
+class DurationCache:
+	"""
+	This class stores up to a maximum number of durations keyed by their
+	signed total number of minutes. It counts the lookups that find an entry
+	(hits), those that do not (misses) and the discarded entries (evictions).
+	Its methods are thread-safe, since interned durations are also created by
+	the executor threads of parse_duration_stream.
+	"""
+
+	def __init__(self, max_size=1024, eviction=EvictionPolicy.LRU):
+		"""
+		The constructor needs the cache's capacity and eviction policy.
+
+		Args:
+			max_size (int): the maximum number of entries. Defaults to 1024.
+			eviction (EvictionPolicy): which entry to discard when the cache
+				is full. Defaults to EvictionPolicy.LRU.
+
+		Raises:
+			ValueError: if max_size is not positive
+			TypeError: if eviction is not an EvictionPolicy
+		"""
+		if max_size <= 0:
+			raise ValueError("Argument max_size must be positive.")
+
+		if not isinstance(eviction, EvictionPolicy):
+			raise TypeError("The given object is not of type "
+				+ EvictionPolicy.__name__ + ".")
+
+		self._entries = OrderedDict()
+		self._lock = Lock()
+		self._eviction = eviction
+		self._max_size = max_size
+		self._hits = 0
+		self._misses = 0
+		self._evictions = 0
+
+	def __len__(self):
+		return len(self._entries)
+
+	def clear(self):
+		"""
+		Removes all the entries and resets the statistics.
+		"""
+		with self._lock:
+			self._entries.clear()
+			self._hits = 0
+			self._misses = 0
+			self._evictions = 0
+
+	@property
+	def eviction(self):
+		"""
+		This read-only property returns this cache's eviction policy.
+		"""
+		return self._eviction
+
+	def intern(self, minutes, factory):
+		"""
+		Gets the duration cached under a number of minutes. If there is none,
+		factory creates it and this cache stores it, discarding an entry if
+		the cache is full.
+
+		Args:
+			minutes (int): a signed total number of minutes
+			factory: a callable that creates a duration from minutes
+
+		Returns:
+			the duration that lasts the given number of minutes
+		"""
+		entries = self._entries
+
+		# Another thread could evict the entry between the lookup and
+		# move_to_end.
+		with self._lock:
+			duration = entries.get(minutes)
+
+			if duration is not None:
+				self._hits += 1
+
+				if self._eviction is EvictionPolicy.LRU:
+					entries.move_to_end(minutes)
+
+				return duration
+
+			self._misses += 1
+			duration = factory(minutes)
+			entries[minutes] = duration
+
+			if len(entries) > self._max_size:
+				entries.popitem(last=False)
+				self._evictions += 1
+
+			return duration
+
+	@property
+	def max_size(self):
+		"""
+		This read-only property returns the maximum number of entries.
+		"""
+		return self._max_size
+
+	def stats(self):
+		"""
+		Makes a snapshot of this cache's statistics.
+
+		Returns:
+			dict: the number of hits, misses and evictions, the current size,
+				the maximum size and the ratio of hits to lookups
+		"""
+		with self._lock:
+			hits = self._hits
+			misses = self._misses
+			evictions = self._evictions
+			size = len(self._entries)
+
+		lookups = hits + misses
+		return {
+			"hits": hits,
+			"misses": misses,
+			"evictions": evictions,
+			"size": size,
+			"max_size": self._max_size,
+			"hit_ratio": hits / lookups if lookups > 0 else 0.0
+		}
@@ -0,0 +1,479 @@
+"""
+This module implements the command-line tool run by python -m hm_duration. It
+streams CSV or TSV files, extracts a column of durations and prints their
+count, total, mean, extremes and percentiles, possibly for each value of
+another column. The durations of each group are counted in a DurationSketch
+rather than stored, so the memory used depends on the number of groups but not
+on the number of rows.
+"""
+
+
+import sys
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from csv import reader
+from io import StringIO
+from os.path import getsize, isfile
+
+from .duration_parallel import _DEFAULT_MIN_RANGE_SIZE, _RANGES_PER_JOB,\
+	_find_range_bounds
+from .duration_sketch import DurationSketch
+from .duration_string import duration_to_str, parse_duration
+from .hm_duration import _MINS_IN_HOUR
+
+
+_CHUNK_SIZE = 1 << 20
+_DEFAULT_PERCENTILES = "50,90,99"
+_ENCODING = "utf-8-sig"
+"""
+UTF-8 that ignores the byte order mark written by some spreadsheet exports
+"""
+
+_FIELD_SEPARATOR = "\t"
+_NEWLINE = b"\n"
+_STDIN_PATH = "-"
+_TSV_EXTENSION = ".tsv"
+
+
+def main(args=None):
+	"""
+	Runs the command-line tool. The summary is written to the standard output
+	as tab-separated values, and the errors are written to the standard error.
+
+	Args:
+		args (list): the command-line arguments. If it is None, sys.argv is
+			used. Defaults to None.
+
+	Returns:
+		int: the exit status, 0 on success or 1 if an input is invalid
+	"""
+	parser = _make_parser()
+	args = parser.parse_args(args)
+
+	try:
+		percents = [float(percent)
+			for percent in args.percentiles.split(",") if percent]
+	except ValueError:
+		parser.error("argument --percentiles: invalid list of numbers")
+
+	if not all(0 <= percent <= 100 for percent in percents):
+		parser.error("argument --percentiles: numbers must range from 0 to 100")
+
+	if args.exact_bound < 0:
+		parser.error("argument --exact-bound: must be positive or null")
+
+	if args.jobs < 1:
+		parser.error("argument -j/--jobs: must be at least 1")
+
+	sketches = dict()
+	invalid_count = 0
+
+	try:
+		for path in args.files or [_STDIN_PATH]:
+			invalid_count += _summarize_file(path, args, sketches)
+	except (OSError, ValueError) as error:
+		print(parser.prog + ": error: " + str(error), file=sys.stderr)
+		return 1
+
+	if invalid_count > 0:
+		print(parser.prog + ": skipped " + str(invalid_count)
+			+ " invalid rows", file=sys.stderr)
+
+	_write_summary(sketches, args.group_by is not None, percents)
+	return 0
+
+
+def _format_duration(duration):
+	"""
+	Formats a duration with function duration_to_str.
+
+	Args:
+		duration (HM_Duration): a duration
+
+	Returns:
+		str: the duration's string representation
+	"""
+	return duration_to_str(duration.hours, duration.minutes)
+
+
+def _make_parser():
+	"""
+	Makes the parser of the command-line arguments.
+
+	Returns:
+		argparse.ArgumentParser: the parser
+	"""
+	parser = ArgumentParser(prog="python -m hm_duration",
+		description="Sums and aggregates a column of durations in CSV or TSV "
+		+ "files. The durations can be in any format accepted by "
+		+ "parse_duration, such as 1:30, 1h30m, 90 or PT1H30M, and empty "
+		+ "cells are ignored.")
+	parser.add_argument("files", nargs="*",
+		help="the files to read, or - for the standard input, which is read "
+		+ "if no file is given")
+	parser.add_argument("-c", "--column", default="1",
+		help="the name or the 1-based index of the column of durations. "
+		+ "Defaults to 1.")
+	parser.add_argument("-g", "--group-by",
+		help="the name or the 1-based index of a column whose values group "
+		+ "the durations")
+	parser.add_argument("-d", "--delimiter",
+		help="the field delimiter. Defaults to a tab for .tsv files and to a "
+		+ "comma otherwise.")
+	parser.add_argument("--no-header", action="store_true",
+		help="the first line holds data rather than column names")
+	parser.add_argument("-p", "--percentiles", default=_DEFAULT_PERCENTILES,
+		help="the comma-separated percentiles to compute, from 0 to 100. "
+		+ "Defaults to " + _DEFAULT_PERCENTILES + ".")
+	parser.add_argument("--exact-bound", type=int, default=1440,
+		help="the greatest absolute number of minutes whose percentiles are "
+		+ "exact. Larger durations have a relative error under 1%%. "
+		+ "Defaults to 1440.")
+	parser.add_argument("--skip-invalid", action="store_true",
+		help="skip the rows whose duration is invalid instead of failing")
+	parser.add_argument("-j", "--jobs", type=int, default=1,
+		help="the number of worker processes for the files that can be "
+		+ "split, not for the standard input. Records must not contain "
+		+ "quoted line breaks. Defaults to 1.")
+	return parser
+
+
+def _read_lines(path, start, end):
+	"""
+	Reads the lines in a byte range of a file. The range is read in chunks
+	that end at a line's end, so the memory used is bounded by the chunk size
+	and the length of a line.
+
+	Args:
+		path (str): the file's path
+		start (int): the offset of the range's first byte, at a line's start
+		end (int): the offset that follows the range's last byte, at a line's
+			start or at the end of the file
+
+	Yields:
+		str: the decoded lines, with their line breaks
+	"""
+	with open(path, "rb") as file:
+		file.seek(start)
+		offset = start
+
+		while offset < end:
+			chunk = file.read(min(_CHUNK_SIZE, end - offset))
+
+			if not chunk:
+				break
+
+			if not chunk.endswith(_NEWLINE):
+				chunk += file.readline()
+
+			offset += len(chunk)
+			# Like a file opened with newline="", as module csv expects,
+			# StringIO splits the lines without translating the line breaks.
+			yield from StringIO(chunk.decode(_ENCODING), newline="")
+
+
+def _resolve_column(column, header):
+	"""
+	Finds the index of a column in the rows.
+
+	Args:
+		column (str): the column's name or 1-based index
+		header (list): the column names, or None if the input has no header
+
+	Returns:
+		int: the column's 0-based index
+
+	Raises:
+		ValueError: if the column is not found
+	"""
+	if column.isdecimal():
+		if int(column) < 1:
+			raise ValueError("Column indices start at 1.")
+
+		return int(column) - 1
+
+	if header is None:
+		raise ValueError("Column " + repr(column)
+			+ " must be an index since the input has no header.")
+
+	try:
+		return header.index(column)
+	except ValueError:
+		raise ValueError("Column " + repr(column)
+			+ " is not in the header.") from None
+
+
+def _resolve_columns(args, header):
+	"""
+	Finds the indices of the column of durations and of the grouping column.
+
+	Args:
+		args (argparse.Namespace): the parsed command-line arguments
+		header (list): the column names, or None if the input has no header
+
+	Returns:
+		tuple:
+			[0]: (int) the 0-based index of the column of durations
+			[1]: (int) the 0-based index of the grouping column, or None if
+				the durations are not grouped
+
+	Raises:
+		ValueError: if a column is not found
+	"""
+	value_index = _resolve_column(args.column, header)
+	group_index = None if args.group_by is None\
+		else _resolve_column(args.group_by, header)
+	return value_index, group_index
+
+
+def _summarize_file(path, args, sketches):
+	"""
+	Counts the durations of a file or of the standard input in the sketches
+	of their groups. A regular file is split into byte ranges summarized by
+	worker processes if several jobs are requested and the file is large
+	enough.
+
+	Args:
+		path (str): the file's path, or "-" for the standard input
+		args (argparse.Namespace): the parsed command-line arguments
+		sketches (dict): the sketches of the groups, which are updated
+
+	Returns:
+		int: the number of skipped invalid rows
+
+	Raises:
+		OSError: if the file cannot be read
+		ValueError: if a duration is invalid and invalid rows are not
+			skipped, or if a column is not found
+	"""
+	delimiter = args.delimiter
+	if delimiter is None:
+		delimiter = _FIELD_SEPARATOR if path.lower().endswith(_TSV_EXTENSION)\
+			else ","
+
+	if args.jobs > 1 and path != _STDIN_PATH and isfile(path):
+		file_size = getsize(path)
+		range_count = min(args.jobs * _RANGES_PER_JOB,
+			file_size // _DEFAULT_MIN_RANGE_SIZE)
+
+		if range_count > 1:
+			return _summarize_file_parallel(path, args, delimiter, args.jobs,
+				file_size, range_count, sketches)
+
+	if path == _STDIN_PATH:
+		file = open(sys.stdin.fileno(), encoding=_ENCODING, newline="",
+			closefd=False)
+	else:
+		file = open(path, encoding=_ENCODING, newline="")
+
+	with file:
+		rows = reader(file, delimiter=delimiter)
+		header = None if args.no_header else next(rows, None)
+		value_index, group_index = _resolve_columns(args, header)
+
+		try:
+			return _summarize_rows(rows, value_index, group_index,
+				args.exact_bound, args.skip_invalid, sketches)
+		except ValueError as error:
+			raise ValueError(path + ", line " + str(rows.line_num) + ": "
+				+ str(error)) from error
+
+
+def _summarize_file_parallel(path, args, delimiter, jobs, file_size,
+		range_count, sketches):
+	"""
+	Splits a file into byte ranges on line boundaries, summarizes each range
+	with a pool of worker processes and merges their sketches.
+
+	Args:
+		path (str): the file's path
+		args (argparse.Namespace): the parsed command-line arguments
+		delimiter (str): the field delimiter
+		jobs (int): the number of worker processes
+		file_size (int): the file's size in bytes
+		range_count (int): the desired number of ranges
+		sketches (dict): the sketches of the groups, which are updated
+
+	Returns:
+		int: the number of skipped invalid rows
+
+	Raises:
+		OSError: if the file cannot be read
+		ValueError: if a duration is invalid and invalid rows are not
+			skipped, or if a column is not found
+	"""
+	with open(path, "rb") as file:
+		header_line = b"" if args.no_header else file.readline()
+		data_start = file.tell()
+
+	header = next(reader([header_line.decode(_ENCODING)],
+		delimiter=delimiter), None) if header_line else None
+	value_index, group_index = _resolve_columns(args, header)
+	# The first range starts after the header.
+	bounds = [max(bound, data_start)
+		for bound in _find_range_bounds(path, file_size, range_count)]
+	range_count = len(bounds) - 1
+	invalid_count = 0
+
+	with ProcessPoolExecutor(jobs) as executor:
+		results = executor.map(_summarize_range, [path] * range_count,
+			bounds[:-1], bounds[1:], [delimiter] * range_count,
+			[value_index] * range_count, [group_index] * range_count,
+			[args.exact_bound] * range_count,
+			[args.skip_invalid] * range_count)
+
+		for range_sketches, range_invalid_count in results:
+			invalid_count += range_invalid_count
+
+			for key, sketch in range_sketches.items():
+				if key in sketches:
+					sketches[key].merge(sketch)
+				else:
+					sketches[key] = sketch
+
+	return invalid_count
+
+
+def _summarize_range(path, start, end, delimiter, value_index, group_index,
+		exact_bound, skip_invalid):
+	"""
+	Summarizes the rows in a byte range of a file. The worker processes run
+	this function. The range is read line by line to bound the memory used.
+
+	Args:
+		path (str): the file's path
+		start (int): the offset of the range's first byte, at a line's start
+		end (int): the offset that follows the range's last byte
+		delimiter (str): the field delimiter
+		value_index (int): the 0-based index of the column of durations
+		group_index (int): the 0-based index of the grouping column, or None
+		exact_bound (int): the exact bound of the sketches
+		skip_invalid (bool): whether invalid rows are skipped
+
+	Returns:
+		tuple:
+			[0]: (dict) the sketches of the groups found in the range
+			[1]: (int) the number of skipped invalid rows
+
+	Raises:
+		ValueError: if a duration is invalid and skip_invalid is False
+	"""
+	sketches = dict()
+	rows = reader(_read_lines(path, start, end), delimiter=delimiter)
+
+	try:
+		invalid_count = _summarize_rows(rows, value_index, group_index,
+			exact_bound, skip_invalid, sketches)
+	except ValueError as error:
+		raise ValueError(path + ", line " + str(rows.line_num)
+			+ " after byte " + str(start) + ": " + str(error)) from error
+
+	return sketches, invalid_count
+
+
+def _summarize_rows(rows, value_index, group_index, exact_bound,
+		skip_invalid, sketches):
+	"""
+	Counts the durations in rows in the sketches of their groups. Empty rows
+	and empty duration cells are ignored.
+
+	Args:
+		rows: an iterable of lists of fields
+		value_index (int): the 0-based index of the column of durations
+		group_index (int): the 0-based index of the grouping column, or None
+			if the durations are not grouped
+		exact_bound (int): the exact bound of the new sketches
+		skip_invalid (bool): whether invalid rows are skipped
+		sketches (dict): the sketches of the groups, keyed by the values of
+			the grouping column or by None if the durations are not grouped.
+			The new groups are added.
+
+	Returns:
+		int: the number of skipped invalid rows
+
+	Raises:
+		ValueError: if a row is invalid and skip_invalid is False
+	"""
+	invalid_count = 0
+	key = None
+
+	for row in rows:
+		try:
+			value = row[value_index].strip()
+
+			if group_index is not None:
+				key = row[group_index]
+		except IndexError:
+			if not row:
+				continue
+
+			if skip_invalid:
+				invalid_count += 1
+				continue
+
+			raise ValueError("The row has only " + str(len(row))
+				+ " fields.") from None
+
+		if not value:
+			continue
+
+		try:
+			hours, minutes = parse_duration(value)
+		except ValueError:
+			if skip_invalid:
+				invalid_count += 1
+				continue
+
+			raise
+
+		sketch = sketches.get(key)
+
+		if sketch is None:
+			sketch = DurationSketch(exact_bound=exact_bound)
+			sketches[key] = sketch
+
+		sketch.add_minutes(hours * _MINS_IN_HOUR + minutes)
+
+	return invalid_count
+
+
+def _write_summary(sketches, grouped, percents, stream=None):
+	"""
+	Writes the statistics of each group as tab-separated values, preceded by
+	a header line. The groups are sorted by their key. If the durations are
+	not grouped, a single line is written even if there is no duration.
+
+	Args:
+		sketches (dict): the sketches of the groups
+		grouped (bool): whether the durations are grouped
+		percents (list): the percentiles to write
+		stream: the text stream where the summary is written. If it is None,
+			the summary is written to the standard output. Defaults to None.
+	"""
+	header = ["count", "total", "mean", "min", "max"]
+	header.extend("p" + format(percent, "g") for percent in percents)
+
+	if grouped:
+		header.insert(0, "group")
+
+	print(_FIELD_SEPARATOR.join(header), file=stream)
+
+	if not grouped and None not in sketches:
+		sketches = {None: DurationSketch(exact_bound=0)}
+
+	for key in sorted(sketches):
+		sketch = sketches[key]
+		fields = [str(sketch.count), _format_duration(sketch.sum())]
+
+		if sketch.count > 0:
+			durations = [sketch.mean(), sketch.min(), sketch.max()]
+			durations.extend(sketch.percentiles(percents))
+			fields.extend(map(_format_duration, durations))
+		else:
+			fields.extend([""] * (len(header) - len(fields)))
+
+		if grouped:
+			fields.insert(0, key)
+
+		print(_FIELD_SEPARATOR.join(fields), file=stream)
@@ -0,0 +1,181 @@
+"""
+This module provides a sequence of durations indexed by a Fenwick tree of
+minute counts. It answers range-sum queries and applies point updates in
+logarithmic time.
+"""
+
+
+from .duration_aggregation import _to_minutes
+from .hm_duration import HM_Duration
+
+
+class IndexedDurations:
+	"""
+	This class represents a mutable sequence of durations that can sum any
+	range of consecutive durations in O(log n). It stores the durations as
+	numbers of minutes and keeps a Fenwick tree (binary indexed tree) of their
+	partial sums. Setting or appending a duration takes O(log n).
+	"""
+
+	__slots__ = ("_mins", "_tree")
+
+	def __init__(self, durations=()):
+		"""
+		The constructor builds the tree in O(n).
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or signed integral numbers of minutes. Defaults to an empty
+				tuple.
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		self._mins = [_to_minutes(duration) for duration in durations]
+		tree = [0] + self._mins
+		length = len(tree)
+
+		for i in range(1, length):
+			parent = i + (i & -i)
+
+			if parent < length:
+				tree[parent] += tree[i]
+
+		self._tree = tree
+
+	def __getitem__(self, index):
+		"""
+		Gets the duration at an index.
+
+		Args:
+			index (int): an index, possibly negative like in lists
+
+		Returns:
+			HM_Duration: the duration at index
+
+		Raises:
+			IndexError: if index is out of range
+		"""
+		return HM_Duration._from_minutes(self._mins[index])
+
+	def __len__(self):
+		return len(self._mins)
+
+	def __setitem__(self, index, duration):
+		"""
+		Replaces the duration at an index in O(log n).
+
+		Args:
+			index (int): an index, possibly negative like in lists
+			duration (HM_Duration, str or int): a duration, its string
+				representation or its number of minutes
+
+		Raises:
+			IndexError: if index is out of range
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		minutes = _to_minutes(duration)
+		index = range(len(self._mins))[index]
+		delta = minutes - self._mins[index]
+		self._mins[index] = minutes
+		self._add_to_tree(index, delta)
+
+	def _add_to_tree(self, index, delta):
+		"""
+		Adds a number of minutes to the tree nodes that cover an index.
+
+		Args:
+			index (int): a non-negative index in the sequence
+			delta (int): a signed number of minutes
+		"""
+		tree = self._tree
+		length = len(tree)
+		i = index + 1
+
+		while i < length:
+			tree[i] += delta
+			i += i & -i
+
+	def append(self, duration):
+		"""
+		Adds a duration at the end of the sequence in O(log n).
+
+		Args:
+			duration (HM_Duration, str or int): a duration, its string
+				representation or its number of minutes
+
+		Raises:
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		minutes = _to_minutes(duration)
+		self._mins.append(minutes)
+		i = len(self._mins)
+		# The new node covers the elements from i - lowbit(i) + 1 to i.
+		node_sum = minutes + self._prefix_minutes(i - 1)\
+			- self._prefix_minutes(i - (i & -i))
+		self._tree.append(node_sum)
+
+	def prefix_sum(self, stop):
+		"""
+		Sums the durations before an index in O(log n).
+
+		Args:
+			stop (int): the index that follows the last summed duration,
+				clamped to the sequence's bounds like a slice's end
+
+		Returns:
+			HM_Duration: the sum of the durations at indices [0, stop)
+		"""
+		stop = slice(stop).indices(len(self._mins))[1]
+		return HM_Duration._from_minutes(self._prefix_minutes(stop))
+
+	def _prefix_minutes(self, stop):
+		"""
+		Sums the numbers of minutes of the first durations.
+
+		Args:
+			stop (int): the number of summed durations, from 0 to the length
+
+		Returns:
+			int: the sum of the numbers of minutes at indices [0, stop)
+		"""
+		tree = self._tree
+		total = 0
+
+		while stop > 0:
+			total += tree[stop]
+			stop -= stop & -stop
+
+		return total
+
+	def range_sum(self, start, stop):
+		"""
+		Sums the durations in a range of indices in O(log n). The bounds are
+		interpreted like those of a slice.
+
+		Args:
+			start (int): the index of the first summed duration
+			stop (int): the index that follows the last summed duration
+
+		Returns:
+			HM_Duration: the sum of the durations at indices [start, stop),
+				null if the range is empty
+		"""
+		start, stop, _ = slice(start, stop).indices(len(self._mins))
+
+		if stop <= start:
+			return HM_Duration._from_minutes(0)
+
+		return HM_Duration._from_minutes(
+			self._prefix_minutes(stop) - self._prefix_minutes(start))
+
+	def total(self):
+		"""
+		Sums all the durations in O(log n).
+
+		Returns:
+			HM_Duration: the sum of the durations
+		"""
+		return HM_Duration._from_minutes(self._prefix_minutes(len(self._mins)))
@@ -0,0 +1,242 @@
+"""
+This module offers opt-in instrumentation of the hot paths of the package. It
+counts the calls, the rejections and the time of each instrumented operation,
+and it can call a hook after each one. Instrumentation replaces the
+instrumented functions and methods with wrappers while it is enabled and
+restores the originals wherever it finds a wrapper when it is disabled, so it
+costs nothing otherwise.
+"""
+
+
+from sys import modules
+from time import perf_counter
+
+from . import duration_string
+from .hm_duration import HM_Duration
+
+
+_PACKAGE_NAME = __name__.rpartition(".")[0]
+
+_INSTRUMENTED_FUNCTIONS = (
+	(duration_string, "duration_from_str"),
+	(duration_string, "duration_to_str")
+)
+"""
+The instrumented module-level functions, identified by their module and name
+"""
+
+_INSTRUMENTED_METHODS = ("__new__", "from_str", "__abs__", "__add__",
+	"__mul__", "__neg__", "__rmul__", "__str__", "__sub__", "__truediv__")
+"""
+The instrumented methods of HM_Duration
+"""
+
+_instrumentation = None
+_originals = list()
+"""
+The replaced methods of HM_Duration as tuples (name, original value)
+"""
+
+_wrappers = dict()
+"""
+The wrappers of the instrumented functions by identity
+"""
+
+
+class Instrumentation:
+	"""
+	This class stores, for each instrumented operation, the number of calls,
+	the number of calls that raised a ValueError and the cumulative time in
+	seconds. An optional hook is called after each operation with the
+	operation's name, its duration in seconds and whether it raised a
+	ValueError.
+	"""
+
+	def __init__(self, hook=None):
+		"""
+		The constructor needs the hook.
+
+		Args:
+			hook: a callable that takes the arguments (operation, elapsed,
+				rejected), or None. Defaults to None.
+		"""
+		self._counters = dict()
+		self._hook = hook
+
+	def _counter(self, operation):
+		"""
+		Gets the counters of an operation: a list that contains the number of
+		calls, the number of rejections and the cumulative time.
+
+		Args:
+			operation (str): the operation's name
+
+		Returns:
+			list: the operation's counters, which the wrappers update
+		"""
+		return self._counters.setdefault(operation, [0, 0, 0.0])
+
+	@property
+	def hook(self):
+		"""
+		This read-only property returns the hook called after each operation
+		or None.
+		"""
+		return self._hook
+
+	def reset(self):
+		"""
+		Sets all the counters to 0.
+		"""
+		for counter in self._counters.values():
+			counter[:] = [0, 0, 0.0]
+
+	def snapshot(self):
+		"""
+		Makes a copy of the counters.
+
+		Returns:
+			dict: for each operation's name, a dictionary that contains the
+				number of calls ("count"), the number of ValueError rejections
+				("errors") and the cumulative time in seconds ("time")
+		"""
+		return {operation: {"count": count, "errors": errors, "time": time}
+			for operation, (count, errors, time) in self._counters.items()}
+
+
+def disable_instrumentation():
+	"""
+	Restores the original functions and methods. The wrapped functions are
+	restored in every module that refers to them, including the modules
+	imported while instrumentation was enabled. The Instrumentation returned
+	by enable_instrumentation keeps its counters.
+	"""
+	global _instrumentation
+
+	for name, original in reversed(_originals):
+		setattr(HM_Duration, name, original)
+
+	if _wrappers:
+		for module in list(modules.values()):
+			namespace = getattr(module, "__dict__", None)
+
+			if namespace is None:
+				continue
+
+			for name, value in list(namespace.items()):
+				if id(value) in _wrappers and _wrappers[id(value)] is value:
+					setattr(module, name, value.__wrapped__)
+
+	_originals.clear()
+	_wrappers.clear()
+	_instrumentation = None
+
+
+def enable_instrumentation(hook=None):
+	"""
+	Replaces the constructor of HM_Duration, HM_Duration.from_str, its
+	arithmetic operators, its conversion to str, duration_from_str and duration_to_str with wrappers
+	that update the counters of a new Instrumentation. The functions are
+	replaced in every module of the package that has already been imported.
+	References to them imported from outside the package beforehand are not
+	instrumented. Enabling instrumentation again replaces the Instrumentation.
+
+	Args:
+		hook: a callable that takes the arguments (operation, elapsed,
+			rejected) and is called after each instrumented operation, or
+			None. Defaults to None.
+
+	Returns:
+		Instrumentation: the counters of the instrumented operations
+	"""
+	global _instrumentation
+	disable_instrumentation()
+	_instrumentation = Instrumentation(hook)
+
+	for module, name in _INSTRUMENTED_FUNCTIONS:
+		original = getattr(module, name)
+		wrapper = _make_wrapper(name, original, _instrumentation)
+		_wrappers[id(wrapper)] = wrapper
+
+		for namespace in _package_modules():
+			if namespace.__dict__.get(name) is original:
+				setattr(namespace, name, wrapper)
+
+	for name in _INSTRUMENTED_METHODS:
+		original = HM_Duration.__dict__[name]
+		function = original.__func__ if isinstance(original, staticmethod)\
+			else original
+		wrapper = _make_wrapper(
+			HM_Duration.__name__ + "." + name, function, _instrumentation)
+
+		if isinstance(original, staticmethod) or name == "__new__":
+			wrapper = staticmethod(wrapper)
+
+		_originals.append((name, original))
+		setattr(HM_Duration, name, wrapper)
+
+	return _instrumentation
+
+
+def instrumentation():
+	"""
+	Gets the counters of the instrumented operations.
+
+	Returns:
+		Instrumentation: the counters if instrumentation is enabled, None
+			otherwise
+	"""
+	return _instrumentation
+
+
+def _make_wrapper(operation, function, instrumentation):
+	"""
+	Makes a function that calls another and updates the counters of an
+	operation.
+
+	Args:
+		operation (str): the operation's name
+		function: the instrumented function
+		instrumentation (Instrumentation): the counters
+
+	Returns:
+		the wrapper
+	"""
+	counter = instrumentation._counter(operation)
+	hook = instrumentation.hook
+
+	def wrapper(*args, **kwargs):
+		rejected = False
+		start = perf_counter()
+
+		try:
+			return function(*args, **kwargs)
+		except ValueError:
+			rejected = True
+			raise
+		finally:
+			elapsed = perf_counter() - start
+			counter[0] += 1
+			counter[1] += rejected
+			counter[2] += elapsed
+
+			if hook is not None:
+				hook(operation, elapsed, rejected)
+
+	wrapper.__doc__ = function.__doc__
+	wrapper.__name__ = function.__name__
+	wrapper.__wrapped__ = function
+	return wrapper
+
+
+def _package_modules():
+	"""
+	Lists the modules of this package that have been imported.
+
+	Returns:
+		list: the modules
+	"""
+	return [module for name, module in list(modules.items())
+		if module is not None and (name == _PACKAGE_NAME
+			or name.startswith(_PACKAGE_NAME + "."))]
+
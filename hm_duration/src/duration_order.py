@@ -0,0 +1,187 @@
+"""
+This module sorts durations and computes order statistics. The integral
+numbers of minutes of the durations are extracted once and used as sort keys,
+so the comparison operators of HM_Duration are never called.
+"""
+
+
+from enum import Enum
+from heapq import nlargest, nsmallest
+from math import ceil
+
+from .hm_duration import HM_Duration, _round_half_up
+
+
+class SortMethod(Enum):
+	"""
+	This enumeration tells function sorted_durations which algorithm to use.
+	"""
+	AUTO = 0
+	"""Use COUNTING if the range of minutes is small, COMPARISON otherwise."""
+	COMPARISON = 1
+	"""Use the built-in sort on the minute keys."""
+	COUNTING = 2
+	"""Distribute the durations into one bucket per minute."""
+
+
+sort_key = HM_Duration.to_minutes
+"""
+The key function that sorts durations by their number of minutes. Give it to
+the built-in functions and methods that accept a key.
+"""
+
+
+def median(durations):
+	"""
+	Computes the median of durations. If their number is even, the median is
+	the mean of the two middle durations, rounded half up to the nearest
+	minute like HM_Duration division.
+
+	Args:
+		durations: an iterable of HM_Duration instances
+
+	Returns:
+		HM_Duration: the median
+
+	Raises:
+		ValueError: if durations is empty
+	"""
+	keys = _sorted_keys(durations)
+	middle = len(keys) // 2
+
+	if len(keys) % 2 == 1:
+		return HM_Duration._from_minutes(keys[middle])
+
+	mean_as_mins = int(_round_half_up((keys[middle-1] + keys[middle]) / 2))
+	return HM_Duration._from_minutes(mean_as_mins)
+
+
+def percentile(durations, percent):
+	"""
+	Computes a percentile of durations with the nearest-rank method. The
+	result is always one of the durations.
+
+	Args:
+		durations: an iterable of HM_Duration instances
+		percent (int or float): a number from 0 to 100
+
+	Returns:
+		HM_Duration: the least duration such that at least the given percent
+			of the durations are lesser than or equal to it
+
+	Raises:
+		ValueError: if durations is empty or percent is not in [0, 100]
+	"""
+	if not 0 <= percent <= 100:
+		raise ValueError("Argument percent must range from 0 to 100.")
+
+	keys = _sorted_keys(durations)
+	rank = max(ceil(percent / 100 * len(keys)), 1)
+	return HM_Duration._from_minutes(keys[rank-1])
+
+
+def sort_durations(durations, reverse=False):
+	"""
+	Sorts a list of durations in place. The sort is stable.
+
+	Args:
+		durations (list): HM_Duration instances
+		reverse (bool): True to sort in descending order. Defaults to False.
+	"""
+	durations.sort(key=sort_key, reverse=reverse)
+
+
+def sorted_durations(durations, reverse=False, method=SortMethod.AUTO):
+	"""
+	Makes a sorted list of durations. The sort is stable. Since durations
+	are integral numbers of minutes, a counting sort in linear time is
+	available when their range is not much larger than their number.
+
+	Args:
+		durations: an iterable of HM_Duration instances
+		reverse (bool): True to sort in descending order. Defaults to False.
+		method (SortMethod): the algorithm. Defaults to SortMethod.AUTO.
+
+	Returns:
+		list: the sorted durations
+	"""
+	if method is SortMethod.COMPARISON:
+		return sorted(durations, key=sort_key, reverse=reverse)
+
+	durations = list(durations)
+	keys = list(map(sort_key, durations))
+
+	if len(keys) == 0:
+		return durations
+
+	min_key = min(keys)
+	key_range = max(keys) - min_key + 1
+
+	if method is SortMethod.AUTO and key_range > len(keys):
+		# Sort the indices by the keys already computed. Unlike pairs
+		# (key, index), it keeps the sort stable when reverse is True.
+		order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+		return [durations[index] for index in order]
+
+	buckets = [None] * key_range
+
+	for duration, key in zip(durations, keys):
+		bucket = buckets[key - min_key]
+
+		if bucket is None:
+			buckets[key - min_key] = [duration]
+		else:
+			bucket.append(duration)
+
+	if reverse:
+		buckets.reverse()
+
+	result = list()
+	extend = result.extend
+
+	for bucket in buckets:
+		if bucket is not None:
+			extend(bucket)
+
+	return result
+
+
+def _sorted_keys(durations):
+	"""
+	Extracts the numbers of minutes of durations and sorts them.
+
+	Args:
+		durations: an iterable of HM_Duration instances
+
+	Returns:
+		list: the sorted numbers of minutes
+
+	Raises:
+		ValueError: if durations is empty
+	"""
+	keys = sorted(map(sort_key, durations))
+
+	if len(keys) == 0:
+		raise ValueError("At least one duration is required.")
+
+	return keys
+
+
+def top_k(durations, k, largest=True):
+	"""
+	Finds the k greatest or least durations without sorting all of them.
+
+	Args:
+		durations: an iterable of HM_Duration instances
+		k (int): the number of durations to find
+		largest (bool): True to find the greatest durations, False to find
+			the least ones. Defaults to True.
+
+	Returns:
+		list: the k greatest durations in descending order or the k least
+			durations in ascending order
+	"""
+	if largest:
+		return nlargest(k, durations, key=sort_key)
+
+	return nsmallest(k, durations, key=sort_key)
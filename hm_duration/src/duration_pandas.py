@@ -0,0 +1,675 @@
+"""
+This module provides a pandas extension dtype for columns of durations in
+hours and minutes. The durations are stored as an int64 array of signed minute
+counts, so arithmetic, comparisons, reductions, sorting and grouping are
+vectorized. pandas and NumPy are required by this module only. Importing it
+registers the dtype under the name "hm_duration".
+"""
+
+
+import numpy as np
+from pandas import NA, DataFrame, Index, Series, StringDtype, isna
+from pandas.api.extensions import ExtensionArray, ExtensionDtype,\
+	register_extension_dtype, take
+from pandas.api.indexers import check_array_indexer
+from pandas.api.types import is_integer_dtype, is_list_like, is_scalar,\
+	pandas_dtype
+from pandas.arrays import BooleanArray
+
+from .duration_array import _divisor_array, _multiply,\
+	_round_half_up as _round_half_up_array
+from .duration_string import InvalidPolicy, _minutes_to_str,\
+	minutes_from_str_many
+from .hm_duration import HM_Duration, _MINS_IN_HOUR, _round_half_up
+
+
+_MINUTE_DTYPE = np.dtype(np.int64)
+_NA_MINUTES = np.iinfo(np.int64).min
+"""
+The minute count that marks a missing duration, like NaT in timedelta64
+"""
+
+_GROUPBY_REDUCTIONS = frozenset(("max", "mean", "min", "sum"))
+
+
+@register_extension_dtype
+class HM_DurationDtype(ExtensionDtype):
+	"""
+	This class is the pandas dtype of the columns of durations in hours and
+	minutes. Its scalar type is HM_Duration, and its missing value is pandas.NA.
+	"""
+
+	name = "hm_duration"
+	type = HM_Duration
+	kind = "O"
+	na_value = NA
+
+	@classmethod
+	def construct_array_type(cls):
+		"""
+		Gets the array type associated with this dtype.
+
+		Returns:
+			type: HM_DurationExtensionArray
+		"""
+		return HM_DurationExtensionArray
+
+
+class HM_DurationExtensionArray(ExtensionArray):
+	"""
+	This class is the pandas extension array of the columns of durations. It
+	stores an int64 array of signed minute counts. Its arithmetic operations,
+	comparisons and reductions apply to the whole array and follow the
+	semantics of HM_Duration. Missing durations propagate through the
+	operations.
+	"""
+
+	def __init__(self, minutes, copy=False):
+		"""
+		The constructor wraps signed minute counts. Use pandas.array with dtype
+		"hm_duration" to convert HM_Duration instances or strings.
+
+		Args:
+			minutes: an array-like object of integral numbers of minutes
+			copy (bool): whether to copy minutes if it is already an int64
+				array. Defaults to False.
+		"""
+		self._mins = np.array(minutes, dtype=_MINUTE_DTYPE, copy=copy or None)
+
+	def __abs__(self):
+		return self._with_minutes(np.abs(self._mins))
+
+	def __add__(self, other):
+		"""
+		Creates an array that contains the element-wise sum of self and other.
+
+		Args:
+			other: an HM_Duration, an HM_DurationExtensionArray or a sequence
+				of durations of the same length
+
+		Returns:
+			HM_DurationExtensionArray: the sum of self and other
+		"""
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return self._with_minutes(self._mins + other_mins, other_mins)
+
+	def __array__(self, dtype=None, copy=None):
+		if copy is False:
+			raise ValueError("The durations cannot be converted to a NumPy "
+				+ "array without a copy.")
+
+		return np.array(self._to_object_array(), dtype=dtype)
+
+	def __eq__(self, other):
+		return self._compare(other, np.equal)
+
+	def __ge__(self, other):
+		return self._compare(other, np.greater_equal)
+
+	def __getitem__(self, item):
+		"""
+		Indexes this array.
+
+		Args:
+			item: an integer, a slice, an integer array or a boolean mask
+
+		Returns:
+			HM_Duration: the duration at the index if item is an integer, or
+				pandas.NA if the duration is missing
+			HM_DurationExtensionArray: the selected durations otherwise
+		"""
+		if is_scalar(item):
+			return _box(self._mins[item])
+
+		item = check_array_indexer(self, item)
+		return self._from_minute_array(self._mins[item])
+
+	def __gt__(self, other):
+		return self._compare(other, np.greater)
+
+	def __le__(self, other):
+		return self._compare(other, np.less_equal)
+
+	def __len__(self):
+		return len(self._mins)
+
+	def __lt__(self, other):
+		return self._compare(other, np.less)
+
+	def __mul__(self, number):
+		"""
+		Creates an array that contains the element-wise product of self by a
+		number or by an array of numbers. Like HM_Duration.__mul__, the
+		results are rounded half up to the nearest minute.
+
+		Args:
+			number: an integral or real number or an array of numbers
+
+		Returns:
+			HM_DurationExtensionArray: the product of self by number
+
+		Raises:
+			OverflowError: if the product of a present duration is infinite
+			ValueError: if the product of a present duration is NaN
+		"""
+		if _is_pandas_container(number):
+			return NotImplemented
+
+		return self._with_rounded_minutes(_multiply(self._mins, number))
+
+	def __ne__(self, other):
+		return self._compare(other, np.not_equal)
+
+	def __neg__(self):
+		return self._with_minutes(-self._mins)
+
+	def __radd__(self, other):
+		return self.__add__(other)
+
+	def __rmul__(self, number):
+		return self.__mul__(number)
+
+	def __rsub__(self, other):
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return self._with_minutes(other_mins - self._mins, other_mins)
+
+	def __setitem__(self, key, value):
+		"""
+		Replaces durations in this array.
+
+		Args:
+			key: an integer, a slice, an integer array or a boolean mask
+			value: a duration, its string representation, its number of
+				minutes, a missing value or a sequence of these
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		if is_list_like(value) and not isinstance(value, str):
+			value = self._from_sequence(value)._mins
+		else:
+			value = _scalar_minutes(value)
+
+		key = check_array_indexer(self, key)
+		self._mins[key] = value
+
+	def __sub__(self, other):
+		"""
+		Creates an array that contains the element-wise difference of self
+		and other.
+
+		Args:
+			other: an HM_Duration, an HM_DurationExtensionArray or a sequence
+				of durations of the same length
+
+		Returns:
+			HM_DurationExtensionArray: the difference of self and other
+		"""
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		return self._with_minutes(self._mins - other_mins, other_mins)
+
+	def __truediv__(self, number):
+		"""
+		Creates an array that contains the element-wise quotient of self by a
+		number or by an array of numbers. Like HM_Duration.__truediv__, the
+		results are rounded half up to the nearest minute.
+
+		Args:
+			number: an integral or real number or an array of numbers
+
+		Returns:
+			HM_DurationExtensionArray: the quotient of self by number
+
+		Raises:
+			ValueError: if a number that divides a present duration is NaN
+			ZeroDivisionError: if a number is null
+		"""
+		if _is_pandas_container(number):
+			return NotImplemented
+
+		return self._with_rounded_minutes(self._mins / _divisor_array(number))
+
+	def astype(self, dtype, copy=True):
+		"""
+		Converts this array to another dtype. Strings are identical to those
+		made by duration_to_str, and integers are numbers of minutes.
+
+		Args:
+			dtype: a NumPy or pandas dtype or its name
+			copy (bool): whether to copy the data if dtype is this array's.
+				Defaults to True.
+
+		Returns:
+			the converted array
+
+		Raises:
+			ValueError: if dtype is an integer dtype and a duration is missing
+		"""
+		dtype = pandas_dtype(dtype)
+
+		if isinstance(dtype, HM_DurationDtype):
+			return self.copy() if copy else self
+
+		if is_integer_dtype(dtype) and not isinstance(dtype, ExtensionDtype):
+			if self.isna().any():
+				raise ValueError(
+					"Missing durations cannot be converted to integers.")
+
+			return self._mins.astype(dtype)
+
+		if isinstance(dtype, StringDtype):
+			dur_strs = self._to_str_list()
+			dur_strs = [None if missing else dur_str
+				for dur_str, missing in zip(dur_strs, self.isna().tolist())]
+			return dtype.construct_array_type()._from_sequence(
+				dur_strs, dtype=dtype)
+
+		if dtype.kind == "U":
+			return np.array(self._to_str_list(), dtype=dtype)
+
+		return super().astype(dtype, copy)
+
+	def _compare(self, other, comparison):
+		"""
+		Compares this array with durations element-wise. Like the other
+		pandas arrays, it considers no duration equal to a scalar of another
+		type and yields missing results for pandas.NA.
+
+		Args:
+			other: an HM_Duration, an HM_DurationExtensionArray, a sequence
+				of durations of the same length or any scalar
+			comparison: a NumPy comparison ufunc
+
+		Returns:
+			pandas.arrays.BooleanArray: the results, missing where a duration
+				is missing
+
+		Raises:
+			TypeError: if comparison is an ordering and other is a scalar of
+				another type
+		"""
+		if is_scalar(other) and not isinstance(other, HM_Duration):
+			if other is NA:
+				return BooleanArray(np.zeros(len(self), dtype=bool),
+					np.ones(len(self), dtype=bool))
+
+			if comparison is np.equal or comparison is np.not_equal:
+				return BooleanArray(
+					np.full(len(self), comparison is np.not_equal), self.isna())
+
+		other_mins = _other_minutes(other)
+
+		if other_mins is NotImplemented:
+			return NotImplemented
+
+		mask = (self._mins == _NA_MINUTES) | (other_mins == _NA_MINUTES)
+		return BooleanArray(comparison(self._mins, other_mins), mask)
+
+	@classmethod
+	def _concat_same_type(cls, to_concat):
+		return cls._from_minute_array(
+			np.concatenate([array._mins for array in to_concat]))
+
+	def copy(self):
+		return self._from_minute_array(self._mins.copy())
+
+	@property
+	def dtype(self):
+		return _DTYPE
+
+	def _formatter(self, boxed=False):
+		# Durations are displayed like duration_to_str in all contexts.
+		return str
+
+	@classmethod
+	def _from_factorized(cls, values, original):
+		return cls._from_minute_array(np.asarray(values, dtype=_MINUTE_DTYPE))
+
+	@classmethod
+	def _from_minute_array(cls, minutes):
+		"""
+		Wraps an int64 array of minutes without copying or validating it.
+
+		Args:
+			minutes (numpy.ndarray): an int64 array of signed minute counts
+
+		Returns:
+			HM_DurationExtensionArray: an array that uses minutes as its
+				storage
+		"""
+		duration_array = object.__new__(cls)
+		duration_array._mins = minutes
+		return duration_array
+
+	@classmethod
+	def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+		"""
+		Creates an array from durations, their string representations, their
+		numbers of minutes or missing values.
+
+		Args:
+			scalars: a sequence of HM_Duration instances, duration strings,
+				integral numbers of minutes or missing values
+			dtype: ignored, since this method makes only one dtype
+			copy (bool): whether to copy scalars if it is an int64 array.
+				Defaults to False.
+
+		Returns:
+			HM_DurationExtensionArray: the durations
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		if isinstance(scalars, cls):
+			return scalars.copy() if copy else scalars
+
+		if isinstance(scalars, np.ndarray) and is_integer_dtype(scalars.dtype):
+			return cls(scalars, copy)
+
+		scalars = np.asarray(scalars, dtype=object)
+		minutes = np.full(len(scalars), _NA_MINUTES, dtype=_MINUTE_DTYPE)
+		present = ~isna(scalars)
+		values = scalars[present].tolist()
+
+		if all(isinstance(value, str) for value in values):
+			minutes[present] = minutes_from_str_many(values, InvalidPolicy.RAISE)
+		else:
+			minutes[present] = [_scalar_minutes(value) for value in values]
+
+		return cls._from_minute_array(minutes)
+
+	@classmethod
+	def _from_sequence_of_strings(cls, strings, *, dtype=None, copy=False):
+		"""
+		Parses strings that match DURATION_STR_PATTERN, for example when
+		pandas.read_csv reads a column with dtype "hm_duration".
+
+		Args:
+			strings: a sequence of duration strings or missing values
+			dtype: ignored, since this method makes only one dtype
+			copy (bool): ignored, since the strings are always converted
+
+		Returns:
+			HM_DurationExtensionArray: the durations
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		return cls._from_sequence(strings)
+
+	def _groupby_op(self, *, how, has_dropped_na, min_count, ngroups, ids,
+			**kwargs):
+		# Computes the sums, means, minimums and maximums per group on the
+		# minute counts. pandas falls back to method _reduce for the other
+		# operations.
+		if how not in _GROUPBY_REDUCTIONS:
+			return super()._groupby_op(how=how, has_dropped_na=has_dropped_na,
+				min_count=min_count, ngroups=ngroups, ids=ids, **kwargs)
+
+		present = (ids >= 0) & (self._mins != _NA_MINUTES)
+		group_ids = ids[present]
+		minutes = self._mins[present]
+		counts = np.bincount(group_ids, minlength=ngroups)
+		missing = counts < max(min_count, 0 if how == "sum" else 1)
+
+		if not kwargs.get("skipna", True):
+			missing |= np.bincount(ids[(ids >= 0) & ~present],
+				minlength=ngroups) > 0
+
+		if how == "min" or how == "max":
+			extreme = np.iinfo(np.int64).max if how == "min" else _NA_MINUTES
+			results = np.full(ngroups, extreme, dtype=_MINUTE_DTYPE)
+			ufunc = np.minimum if how == "min" else np.maximum
+			ufunc.at(results, group_ids, minutes)
+		else:
+			results = np.zeros(ngroups, dtype=_MINUTE_DTYPE)
+			np.add.at(results, group_ids, minutes)
+
+			if how == "mean":
+				results = _round_half_up_array(
+					results / np.maximum(counts, 1))
+
+		results[missing] = _NA_MINUTES
+		return self._from_minute_array(results)
+
+	def isna(self):
+		return self._mins == _NA_MINUTES
+
+	@property
+	def nbytes(self):
+		return self._mins.nbytes
+
+	def _reduce(self, name, *, skipna=True, keepdims=False, **kwargs):
+		"""
+		Computes a reduction of the durations.
+
+		Args:
+			name (str): "sum", "mean", "min" or "max"
+			skipna (bool): whether to ignore the missing durations. Defaults
+				to True.
+			keepdims (bool): whether to return an array of length 1. Defaults
+				to False.
+
+		Returns:
+			HM_Duration: the result, or pandas.NA if it is undefined
+
+		Raises:
+			TypeError: if name is another reduction
+		"""
+		if name not in _GROUPBY_REDUCTIONS:
+			return super()._reduce(
+				name, skipna=skipna, keepdims=keepdims, **kwargs)
+
+		mask = self.isna()
+		minutes = self._mins[~mask]
+		min_count = kwargs.get("min_count", 0) if name == "sum" else 1
+
+		if (not skipna and mask.any()) or len(minutes) < min_count:
+			result = _NA_MINUTES
+		elif name == "sum":
+			result = int(minutes.sum())
+		elif name == "mean":
+			result = int(_round_half_up(int(minutes.sum()) / len(minutes)))
+		else:
+			result = int(minutes.min() if name == "min" else minutes.max())
+
+		if keepdims:
+			return self._from_minute_array(
+				np.array([result], dtype=_MINUTE_DTYPE))
+
+		return _box(result)
+
+	def take(self, indices, *, allow_fill=False, fill_value=None):
+		if allow_fill:
+			fill_value = _NA_MINUTES if fill_value is None\
+				else _scalar_minutes(fill_value)
+
+		return self._from_minute_array(take(self._mins, indices,
+			allow_fill=allow_fill, fill_value=fill_value))
+
+	def _to_object_array(self):
+		"""
+		Converts this array to a NumPy array of HM_Duration instances and
+		pandas.NA.
+
+		Returns:
+			numpy.ndarray: an object array
+		"""
+		objects = np.empty(len(self._mins), dtype=object)
+		objects[:] = [_box(minutes) for minutes in self._mins.tolist()]
+		return objects
+
+	def _to_str_list(self):
+		"""
+		Formats the durations like duration_to_str. Missing durations become
+		"<NA>".
+
+		Returns:
+			list: the string representations
+		"""
+		return [str(NA) if minutes == _NA_MINUTES else _minutes_to_str(minutes)
+			for minutes in self._mins.tolist()]
+
+	def to_minutes(self):
+		"""
+		Converts the durations to numbers of minutes. They are floats, so
+		that the missing durations can be NaN.
+
+		Returns:
+			numpy.ndarray: a float64 array of numbers of minutes where the
+				missing durations are NaN
+		"""
+		minutes = self._mins.astype(np.float64)
+		minutes[self.isna()] = np.nan
+		return minutes
+
+	def to_hours(self):
+		"""
+		Converts the durations to real numbers of hours.
+
+		Returns:
+			numpy.ndarray: a float64 array of numbers of hours where the
+				missing durations are NaN
+		"""
+		total_minutes = self.to_minutes()
+		hours, minutes = np.divmod(np.abs(total_minutes), _MINS_IN_HOUR)
+		return np.sign(total_minutes) * (hours + minutes / _MINS_IN_HOUR)
+
+	def _values_for_argsort(self):
+		return self._mins
+
+	def _values_for_factorize(self):
+		return self._mins, _NA_MINUTES
+
+	def _with_rounded_minutes(self, minutes):
+		"""
+		Rounds the real minute counts resulting from a product or a quotient
+		of this array half up and wraps them. The results of the missing
+		durations are ignored, so they cannot make the rounding fail.
+
+		Args:
+			minutes (numpy.ndarray): the real results of the operation
+
+		Returns:
+			HM_DurationExtensionArray: the rounded results
+		"""
+		return self._with_minutes(
+			_round_half_up_array(np.where(self.isna(), 0, minutes)))
+
+	def _with_minutes(self, minutes, other_minutes=None):
+		"""
+		Wraps the minute counts resulting from an operation on this array and
+		marks the durations missing in an operand as missing in the result.
+
+		Args:
+			minutes (numpy.ndarray): the results of the operation
+			other_minutes: the minute counts of the other operand, if any
+
+		Returns:
+			HM_DurationExtensionArray: the results
+		"""
+		minutes = np.asarray(minutes, dtype=_MINUTE_DTYPE)
+		mask = self._mins == _NA_MINUTES
+
+		if other_minutes is not None:
+			mask = mask | (other_minutes == _NA_MINUTES)
+
+		minutes[mask] = _NA_MINUTES
+		return self._from_minute_array(minutes)
+
+
+_DTYPE = HM_DurationDtype()
+
+
+def _box(minutes):
+	"""
+	Converts a minute count of the storage to a scalar.
+
+	Args:
+		minutes (int): a signed minute count
+
+	Returns:
+		HM_Duration: the duration, or pandas.NA if minutes marks a missing
+			duration
+	"""
+	if minutes == _NA_MINUTES:
+		return NA
+
+	return HM_Duration._from_minutes(int(minutes))
+
+
+def _is_pandas_container(obj):
+	# pandas aligns Series, Index and DataFrame operands before it calls the
+	# operators of this array.
+	return isinstance(obj, (DataFrame, Index, Series))
+
+
+def _other_minutes(other):
+	"""
+	Gets the minute counts of the other operand of an arithmetic operation
+	or a comparison.
+
+	Args:
+		other: an HM_Duration, an HM_DurationExtensionArray or a sequence of
+			durations
+
+	Returns:
+		the minute counts of other, or NotImplemented if pandas must handle
+		other first
+	"""
+	if isinstance(other, HM_DurationExtensionArray):
+		return other._mins
+
+	if isinstance(other, HM_Duration):
+		return other.to_minutes()
+
+	if _is_pandas_container(other):
+		return NotImplemented
+
+	if is_list_like(other) and not isinstance(other, str):
+		return HM_DurationExtensionArray._from_sequence(other)._mins
+
+	raise TypeError("The given object is not of type "
+		+ HM_Duration.__name__ + " or a sequence of durations.")
+
+
+def _scalar_minutes(value):
+	"""
+	Converts a scalar to a minute count of the storage.
+
+	Args:
+		value: an HM_Duration, a duration string, an integral number of
+			minutes or a missing value
+
+	Returns:
+		int: the signed minute count
+
+	Raises:
+		TypeError: if value has another type
+		ValueError: if value is a string that does not represent a duration
+	"""
+	if isinstance(value, HM_Duration):
+		return value.to_minutes()
+
+	if isinstance(value, str):
+		return HM_Duration.from_str(value).to_minutes()
+
+	if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+		return int(value)
+
+	if is_scalar(value) and isna(value):
+		return _NA_MINUTES
+
+	raise TypeError("Value " + repr(value) + " is not a duration.")
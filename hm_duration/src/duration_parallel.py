@@ -0,0 +1,134 @@
+"""
+This module parses very large files of newline-delimited duration strings on
+several processes. The file is split into byte ranges on line boundaries, each
+worker process parses one range into a compact array of minutes, and the
+arrays are merged in the order of the file.
+"""
+
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from os.path import getsize
+
+from .duration_string import InvalidPolicy, _MINUTE_TYPECODE,\
+	_split_lines, minutes_from_str_many
+
+
+_DEFAULT_MIN_RANGE_SIZE = 1 << 20
+_RANGES_PER_JOB = 4
+
+
+def parse_file_parallel(path, jobs=None, on_invalid=InvalidPolicy.RAISE,
+		min_range_size=_DEFAULT_MIN_RANGE_SIZE):
+	"""
+	Parses a file of newline-delimited duration strings with a pool of
+	worker processes. Each line must match DURATION_STR_PATTERN, and empty
+	lines are ignored. The workers return arrays of minutes rather than
+	HM_Duration instances, which keeps the transfer between processes
+	compact.
+
+	Args:
+		path (str or os.PathLike): the path to the file, encoded in UTF-8
+		jobs (int): the number of worker processes. If it is None, the number
+			of CPUs is used. Defaults to None.
+		on_invalid (InvalidPolicy): what to do with the invalid lines.
+			InvalidPolicy.SENTINEL is not allowed. Defaults to
+			InvalidPolicy.RAISE.
+		min_range_size (int): the minimum number of bytes parsed by a worker.
+			A file smaller than twice this size is parsed in the calling
+			process. Defaults to 1 MiB.
+
+	Returns:
+		array.array: the signed numbers of minutes of the durations in the
+			order of the file, with typecode "q"
+
+	Raises:
+		ValueError: if a line is invalid and on_invalid is
+			InvalidPolicy.RAISE, or if on_invalid is InvalidPolicy.SENTINEL
+	"""
+	if on_invalid is InvalidPolicy.SENTINEL:
+		raise ValueError("A minute array cannot store sentinels.")
+
+	if jobs is None:
+		jobs = cpu_count() or 1
+
+	file_size = getsize(path)
+	range_count = min(jobs * _RANGES_PER_JOB, file_size // min_range_size)
+
+	if jobs <= 1 or range_count <= 1:
+		return _parse_range(path, 0, file_size, on_invalid)
+
+	bounds = _find_range_bounds(path, file_size, range_count)
+	range_count = len(bounds) - 1
+	minutes = array(_MINUTE_TYPECODE)
+
+	with ProcessPoolExecutor(jobs) as executor:
+		range_minutes = executor.map(_parse_range, [path] * range_count,
+			bounds[:-1], bounds[1:], [on_invalid] * range_count)
+
+		for some_minutes in range_minutes:
+			minutes.extend(some_minutes)
+
+	return minutes
+
+
+def _find_range_bounds(path, file_size, range_count):
+	"""
+	Splits a file into byte ranges of similar sizes that begin at the start
+	of a line.
+
+	Args:
+		path (str or os.PathLike): the path to the file
+		file_size (int): the file's size in bytes
+		range_count (int): the desired number of ranges
+
+	Returns:
+		list: the increasing byte offsets that bound the ranges, from 0 to
+			file_size
+	"""
+	bounds = [0]
+
+	with open(path, "rb") as file:
+		for i in range(1, range_count):
+			file.seek(max(file_size * i // range_count, bounds[-1]))
+			file.readline()
+			offset = file.tell()
+
+			if offset >= file_size:
+				break
+
+			if offset > bounds[-1]:
+				bounds.append(offset)
+
+	bounds.append(file_size)
+	return bounds
+
+
+def _parse_range(path, start, end, on_invalid):
+	"""
+	Parses the lines in a byte range of a file. The worker processes run this
+	function.
+
+	Args:
+		path (str or os.PathLike): the path to the file
+		start (int): the offset of the range's first byte
+		end (int): the offset that follows the range's last byte
+		on_invalid (InvalidPolicy): what to do with the invalid lines
+
+	Returns:
+		array.array: the numbers of minutes of the durations in the range
+
+	Raises:
+		ValueError: if a line is invalid and on_invalid is
+			InvalidPolicy.RAISE
+	"""
+	with open(path, "rb") as file:
+		file.seek(start)
+		data = file.read(end - start)
+
+	try:
+		return minutes_from_str_many(_split_lines(data), on_invalid)
+	except ValueError as error:
+		raise ValueError("Bytes " + str(start) + " to " + str(end)
+			+ ": " + str(error)) from error
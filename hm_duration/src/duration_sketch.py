@@ -0,0 +1,376 @@
+"""
+This module provides a streaming sketch of the distribution of durations. It
+counts the durations in buckets of minutes, so percentiles and histograms are
+computed without storing or sorting the durations.
+"""
+
+
+from math import ceil
+
+from .duration_aggregation import DurationAccumulator, _to_minutes
+from .hm_duration import HM_Duration
+
+
+class DurationSketch:
+	"""
+	This class counts durations in one bucket per minute from -exact_bound to
+	exact_bound. Only the non-empty buckets are stored, so a sketch takes
+	little memory when its durations are few or concentrated. Beyond these
+	bounds, a duration spills into a bucket whose
+	width is a power of two that keeps spill_precision significant bits of its
+	number of minutes, so the relative width of a spill bucket is at most
+	2 ** (1 - spill_precision). Percentiles and the histogram are computed by
+	sorting the non-empty buckets. They are exact unless they involve spill buckets. Sketches
+	that have the same parameters can be merged, for example to combine the
+	results of several workers.
+	"""
+
+	__slots__ = ("_exact_bound", "_spill_precision", "_exact", "_spill",
+		"_stats")
+
+	def __init__(self, durations=(), exact_bound=1440, spill_precision=7):
+		"""
+		The constructor can consume initial durations.
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or integral numbers of minutes. Defaults to an empty tuple.
+			exact_bound (int): the greatest absolute number of minutes counted
+				in a bucket of one minute. Defaults to 1440, one day.
+			spill_precision (int): the number of significant bits of the
+				numbers of minutes in the spill buckets. Defaults to 7.
+
+		Raises:
+			ValueError: if exact_bound is negative, if spill_precision is less
+				than 1 or if a string does not represent a duration
+		"""
+		if exact_bound < 0:
+			raise ValueError("Argument exact_bound must be positive or null.")
+
+		if spill_precision < 1:
+			raise ValueError("Argument spill_precision must be at least 1.")
+
+		self._exact_bound = exact_bound
+		self._spill_precision = spill_precision
+		self._exact = dict()
+		self._spill = dict()
+		# The count, the sum and the extremes are exact.
+		self._stats = DurationAccumulator()
+		self.update(durations)
+
+	def __len__(self):
+		return len(self._stats)
+
+	def add(self, duration):
+		"""
+		Consumes one duration.
+
+		Args:
+			duration (HM_Duration, str or int): a duration, its string
+				representation or its signed integral number of minutes
+
+		Raises:
+			ValueError: if duration is a string that does not represent a
+				duration
+		"""
+		self.add_minutes(_to_minutes(duration))
+
+	def add_minutes(self, minutes):
+		"""
+		Consumes one duration expressed as a number of minutes.
+
+		Args:
+			minutes (int): a signed integral number of minutes
+		"""
+		if -self._exact_bound <= minutes <= self._exact_bound:
+			self._exact[minutes] = self._exact.get(minutes, 0) + 1
+		else:
+			key = self._spill_key(minutes)
+			self._spill[key] = self._spill.get(key, 0) + 1
+
+		self._stats.add_minutes(minutes)
+
+	def _buckets(self):
+		"""
+		Iterates over the non-empty buckets in ascending order.
+
+		Yields:
+			tuple:
+				[0]: (int) the least number of minutes in the bucket
+				[1]: (int) the number of minutes that follows the bucket
+				[2]: (int) the number of durations in the bucket
+		"""
+		spill_keys = sorted(self._spill)
+		first_positive = 0
+
+		for key in spill_keys:
+			if key > 0:
+				break
+
+			lower, upper = self._spill_range(key)
+			yield lower, upper, self._spill[key]
+			first_positive += 1
+
+		for minutes in sorted(self._exact):
+			yield minutes, minutes + 1, self._exact[minutes]
+
+		for key in spill_keys[first_positive:]:
+			lower, upper = self._spill_range(key)
+			yield lower, upper, self._spill[key]
+
+	@property
+	def count(self):
+		"""
+		This read-only property returns the number of consumed durations.
+		"""
+		return self._stats.count
+
+	def _count_buckets(self, durations):
+		"""
+		Counts durations in their buckets.
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or integral numbers of minutes
+
+		Yields:
+			int: the number of minutes of each duration once it is counted
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		exact = self._exact
+		exact_bound = self._exact_bound
+		spill = self._spill
+
+		for duration in durations:
+			minutes = _to_minutes(duration)
+
+			if -exact_bound <= minutes <= exact_bound:
+				exact[minutes] = exact.get(minutes, 0) + 1
+			else:
+				key = self._spill_key(minutes)
+				spill[key] = spill.get(key, 0) + 1
+
+			yield minutes
+
+	@property
+	def exact_bound(self):
+		"""
+		This read-only property returns the greatest absolute number of minutes
+		counted in a bucket of one minute.
+		"""
+		return self._exact_bound
+
+	def histogram(self):
+		"""
+		Lists the non-empty buckets in ascending order.
+
+		Returns:
+			list: tuples (lower, upper, count) where lower is the least
+				duration in the bucket, upper is the duration that follows the
+				bucket (both HM_Duration) and count is the number of durations
+				in the bucket
+		"""
+		from_minutes = HM_Duration._from_minutes
+		return [(from_minutes(lower), from_minutes(upper), count)
+			for lower, upper, count in self._buckets()]
+
+	def max(self):
+		"""
+		Gets the greatest consumed duration. It is exact.
+
+		Returns:
+			HM_Duration: the maximum
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		return self._stats.max()
+
+	def mean(self):
+		"""
+		Computes the mean of the consumed durations. It is exact and, like
+		HM_Duration division, rounded half up to the nearest minute.
+
+		Returns:
+			HM_Duration: the mean
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		return self._stats.mean()
+
+	def merge(self, other):
+		"""
+		Adds the durations counted by another sketch to this one.
+
+		Args:
+			other (DurationSketch): a sketch with the same exact_bound and
+				spill_precision
+
+		Raises:
+			ValueError: if the sketches do not have the same parameters
+		"""
+		if other._exact_bound != self._exact_bound\
+				or other._spill_precision != self._spill_precision:
+			raise ValueError("Only sketches with the same exact_bound and "
+				+ "spill_precision can be merged.")
+
+		for minutes, count in other._exact.items():
+			self._exact[minutes] = self._exact.get(minutes, 0) + count
+
+		for key, count in other._spill.items():
+			self._spill[key] = self._spill.get(key, 0) + count
+
+		self._stats.merge(other._stats)
+
+	def min(self):
+		"""
+		Gets the least consumed duration. It is exact.
+
+		Returns:
+			HM_Duration: the minimum
+
+		Raises:
+			ValueError: if no duration was consumed
+		"""
+		return self._stats.min()
+
+	def percentile(self, percent):
+		"""
+		Computes a percentile of the consumed durations with the nearest-rank
+		method, like function percentile of module duration_order. If the
+		percentile falls in a spill bucket, the bucket's middle is returned,
+		bounded by the minimum and the maximum.
+
+		Args:
+			percent (int or float): a number from 0 to 100
+
+		Returns:
+			HM_Duration: the percentile
+
+		Raises:
+			ValueError: if no duration was consumed or percent is not in
+				[0, 100]
+		"""
+		return self.percentiles((percent,))[0]
+
+	def percentiles(self, percents):
+		"""
+		Computes several percentiles in a single pass over the buckets. See
+		method percentile.
+
+		Args:
+			percents: an iterable of numbers from 0 to 100
+
+		Returns:
+			list: the percentiles (HM_Duration) in the order of percents
+
+		Raises:
+			ValueError: if no duration was consumed or a percent is not in
+				[0, 100]
+		"""
+		percents = list(percents)
+
+		for percent in percents:
+			if not 0 <= percent <= 100:
+				raise ValueError("Argument percent must range from 0 to 100.")
+
+		self._stats._raise_except_if_empty()
+		count = self._stats._count
+		minimum = self._stats._min
+		maximum = self._stats._max
+		ranks = [max(ceil(percent / 100 * count), 1) for percent in percents]
+		order = sorted(range(len(ranks)), key=ranks.__getitem__)
+		results = [None] * len(ranks)
+		position = 0
+		cumulative = 0
+
+		for lower, upper, count in self._buckets():
+			cumulative += count
+
+			while position < len(order) and ranks[order[position]] <= cumulative:
+				middle = lower + (upper - lower - 1) // 2 if lower >= 0\
+					else upper - 1 - (upper - lower - 1) // 2
+				middle = min(max(middle, minimum), maximum)
+				results[order[position]] = HM_Duration._from_minutes(middle)
+				position += 1
+
+			if position == len(order):
+				break
+
+		return results
+
+	def _spill_key(self, minutes):
+		"""
+		Identifies the spill bucket of a number of minutes beyond the exact
+		bound. The key is the bucket's least absolute number of minutes, with
+		the sign of minutes.
+
+		Args:
+			minutes (int): a signed integral number of minutes
+
+		Returns:
+			int: the bucket's key
+		"""
+		magnitude = abs(minutes)
+		shift = max(magnitude.bit_length() - self._spill_precision, 0)
+		key = magnitude >> shift << shift
+		return key if minutes > 0 else -key
+
+	def _spill_range(self, key):
+		"""
+		Computes the range of minutes covered by a spill bucket.
+
+		Args:
+			key (int): the bucket's key
+
+		Returns:
+			tuple:
+				[0]: (int) the least number of minutes in the bucket
+				[1]: (int) the number of minutes that follows the bucket
+		"""
+		magnitude = abs(key)
+		end = magnitude + (
+			1 << max(magnitude.bit_length() - self._spill_precision, 0))
+		# The first spill bucket may start inside the exact range.
+		start = max(magnitude, self._exact_bound + 1)
+
+		if key > 0:
+			return start, end
+
+		return 1 - end, 1 - start
+
+	@property
+	def spill_precision(self):
+		"""
+		This read-only property returns the number of significant bits of the
+		numbers of minutes in the spill buckets.
+		"""
+		return self._spill_precision
+
+	def sum(self):
+		"""
+		Computes the sum of the consumed durations. It is exact. The sum of no
+		durations is null.
+
+		Returns:
+			HM_Duration: the sum
+		"""
+		return self._stats.sum()
+
+	def update(self, durations):
+		"""
+		Consumes durations from an iterable.
+
+		Args:
+			durations: an iterable of HM_Duration instances, duration strings
+				or integral numbers of minutes
+
+		Raises:
+			ValueError: if a string does not represent a duration
+		"""
+		# The accumulator keeps the durations consumed before an invalid
+		# string, and so do the buckets.
+		self._stats._update_minutes(self._count_buckets(durations))
@@ -3,15 +3,23 @@ This module deals with the string representation of durations in hours and
 minutes. Duration strings must conform to the pattern "xx:xx", where each x is
 a digit. However, the number of hours contains more than two digits if its
 absolute value is greater than or equal to 100. If a duration is negative,
-there is a minus sign at the beginning of its string representation.
+there is a minus sign at the beginning of its string representation. Function
+parse_duration also accepts other common formats.
 """
 
 
-from re import fullmatch
+from array import array
+from collections import namedtuple
+from enum import Enum, Flag
+from re import compile as _compile_regex
 
 
+_CARRIAGE_RETURN = "\r"
 _COLON = ":"
+_ENCODING = "utf-8"
 _HYPHEN = "-"
+_ISO_DESIGNATOR = "P"
+_NEWLINE_STR = "\n"
 _ZERO_STR = "0"
 
 DURATION_STR_PATTERN = "-?\d{1,}:\d{2}"
@@ -19,6 +27,77 @@ DURATION_STR_PATTERN = "-?\d{1,}:\d{2}"
 The string representation of durations must match this regular expression.
 """
 
+_DURATION_REGEX = _compile_regex("(-?)(\\d{1,}):(\\d{2})")
+"""
+The compiled equivalent of DURATION_STR_PATTERN. Its groups capture the sign,
+the hours and the minutes.
+"""
+
+_HOURS_IN_DAY = 24
+_MINS_IN_HOUR = 60
+_MINUTE_TYPECODE = "q"
+"""
+The typecode of the arrays of signed 64-bit minute counts of the package
+"""
+
+_HOUR_FIELDS = tuple(str(hours).zfill(2) for hours in range(100))
+"""
+The formatted hour fields from 00 to 99
+"""
+
+_MINUTE_FIELDS = tuple(
+	_COLON + str(minutes).zfill(2) for minutes in range(60))
+"""
+The formatted minute fields, preceded by the colon, from :00 to :59
+"""
+
+_WRITE_CHUNK_SIZE = 4096
+
+
+class DurationFormat(Flag):
+	"""
+	This enumeration lists the string formats accepted by function
+	parse_duration. Its members can be combined with operator | to restrict
+	the accepted formats.
+	"""
+	CLASSIC = 1
+	"""Hours and minutes separated by a colon, like "-1:30". See
+	DURATION_STR_PATTERN."""
+	UNITS = 2
+	"""Hours followed by h and minutes followed by m, like "1h30m", "2h" or
+	"90m". The unit letters can be uppercase."""
+	MINUTES = 4
+	"""A bare number of minutes, like "90" or "-15"."""
+	ISO_8601 = 8
+	"""An ISO 8601 duration in days, hours and minutes, like "PT1H30M" or
+	"P1DT2H". A day lasts 24 hours, and seconds are not accepted."""
+	ALL = CLASSIC | UNITS | MINUTES | ISO_8601
+	"""All the formats"""
+
+
+_ALL_FORMATS = DurationFormat.ALL
+
+
+class InvalidPolicy(Enum):
+	"""
+	This enumeration tells the bulk parsing functions what to do with items
+	that do not match DURATION_STR_PATTERN.
+	"""
+	RAISE = 0
+	"""Raise a ValueError."""
+	SKIP = 1
+	"""Leave the item out of the results."""
+	SENTINEL = 2
+	"""Yield an InvalidDuration in the item's place."""
+
+
+InvalidDuration = namedtuple("InvalidDuration", ("index", "dur_str"))
+"""
+The bulk parsing functions yield this named tuple in place of an invalid item
+if the policy is InvalidPolicy.SENTINEL. It stores the item's index in the
+iterable and the item itself.
+"""
+
 
 def duration_from_str(dur_str):
 	"""
@@ -35,36 +114,60 @@ def duration_from_str(dur_str):
 			[1]: (int) the number of minutes
 
 	Raises:
+		TypeError: if dur_str is not a string
 		ValueError: if str_repr_duration(dur_str) returns False
 	"""
-	if not str_repr_duration(dur_str):
+	duration = _scan_duration(dur_str)
+
+	if duration is None:
 		raise ValueError("Argument '" + dur_str\
 			+ "' does not match regex '" + DURATION_STR_PATTERN + "'.")
 
-	if dur_str[0] == _HYPHEN:
-		postive = False
-		hour_index = 1
-	else:
-		postive = True
-		hour_index = 0
+	return duration
 
-	colon_index = dur_str.index(_COLON)
 
-	hour_str = dur_str[hour_index: colon_index]
-	if len(hour_str) == 2 and hour_str[0] == _ZERO_STR:
-		hour_str = hour_str[1]
-	hours = int(hour_str)
+def duration_from_str_many(dur_strs, on_invalid=InvalidPolicy.RAISE, start=0):
+	"""
+	Extracts the number of hours and the number of minutes from each string
+	in an iterable. This generator validates and splits each string in one
+	match of a precompiled regular expression.
 
-	min_str = dur_str[colon_index+1:]
-	if min_str[0] == _ZERO_STR:
-		min_str = min_str[1]
-	minutes = int(min_str)
+	Args:
+		dur_strs: an iterable of duration string representations
+		on_invalid (InvalidPolicy): what to do with the strings that do not
+			match DURATION_STR_PATTERN. Defaults to InvalidPolicy.RAISE.
+		start (int): the index of the first string, used to report invalid
+			strings. Defaults to 0.
 
-	if not postive:
-		hours *= -1
-		minutes *= -1
+	Yields:
+		tuple:
+			[0]: (int) the number of hours
+			[1]: (int) the number of minutes
+		or InvalidDuration for the invalid strings if on_invalid is
+		InvalidPolicy.SENTINEL
 
-	return hours, minutes
+	Raises:
+		ValueError: if a string is invalid and on_invalid is
+			InvalidPolicy.RAISE
+	"""
+	match = _DURATION_REGEX.fullmatch
+
+	for index, dur_str in enumerate(dur_strs, start):
+		dur_match = match(dur_str)
+
+		if dur_match is None:
+			if on_invalid is InvalidPolicy.SENTINEL:
+				yield InvalidDuration(index, dur_str)
+			elif on_invalid is not InvalidPolicy.SKIP:
+				_raise_invalid_item(index, dur_str)
+			continue
+
+		sign, hour_str, min_str = dur_match.groups()
+
+		if sign:
+			yield -int(hour_str), -int(min_str)
+		else:
+			yield int(hour_str), int(min_str)
 
 
 def duration_to_str(hours, minutes):
@@ -89,6 +192,53 @@ def duration_to_str(hours, minutes):
 	return dur_str
 
 
+def duration_to_str_many(durations, stream=None, separator="\n"):
+	"""
+	Makes the formatted string representation of each duration in an
+	iterable. The strings are identical to those made by duration_to_str and
+	built from precomputed tables of hour and minute fields.
+
+	Args:
+		durations: an iterable of HM_Duration instances or of signed integral
+			numbers of minutes, or an array that has method tolist, such as
+			array.array or numpy.ndarray
+		stream: a text stream, such as a file or io.StringIO, where the
+			strings are written. If it is None, the strings are returned in a
+			list. Defaults to None.
+		separator (str): the string written after each duration's string
+			representation if stream is not None. Defaults to "\n".
+
+	Returns:
+		list: the string representations if stream is None
+		int: the number of durations written to stream otherwise
+	"""
+	if hasattr(durations, "tolist"):
+		durations = durations.tolist()
+
+	dur_strs = map(_minutes_to_str, map(_minutes_of, durations))
+
+	if stream is None:
+		return list(dur_strs)
+
+	count = 0
+	chunk = list()
+	write = stream.write
+
+	for dur_str in dur_strs:
+		chunk.append(dur_str)
+
+		if len(chunk) == _WRITE_CHUNK_SIZE:
+			write(separator.join(chunk) + separator)
+			count += len(chunk)
+			chunk.clear()
+
+	if len(chunk) > 0:
+		write(separator.join(chunk) + separator)
+		count += len(chunk)
+
+	return count
+
+
 def _int_to_formatted_str(an_int):
 	"""
 	Makes a formatted string representation of integers that is part of the
@@ -111,11 +261,330 @@ def _int_to_formatted_str(an_int):
 	return int_str
 
 
+def _minutes_to_str(minutes):
+	"""
+	Makes the formatted string representation of a duration that lasts a
+	signed total number of minutes by looking up its fields in the tables.
+
+	Args:
+		minutes (int): a signed total number of minutes
+
+	Returns:
+		str: the string representation of the duration
+	"""
+	if minutes < 0:
+		hours, minutes = divmod(-minutes, _MINS_IN_HOUR)
+		hour_field = _HOUR_FIELDS[hours] if hours < 100 else str(hours)
+		return _HYPHEN + hour_field + _MINUTE_FIELDS[minutes]
+
+	hours, minutes = divmod(minutes, _MINS_IN_HOUR)
+	hour_field = _HOUR_FIELDS[hours] if hours < 100 else str(hours)
+	return hour_field + _MINUTE_FIELDS[minutes]
+
+
+def minutes_from_str_many(dur_strs, on_invalid=InvalidPolicy.RAISE, start=0):
+	"""
+	Converts each string in an iterable to the signed total number of
+	minutes of the duration that it represents. The numbers are stored in a
+	compact array of signed 64-bit integers.
+
+	Args:
+		dur_strs: an iterable of duration string representations
+		on_invalid (InvalidPolicy): what to do with the strings that do not
+			match DURATION_STR_PATTERN. InvalidPolicy.SENTINEL is not
+			allowed. Defaults to InvalidPolicy.RAISE.
+		start (int): the index of the first string, used to report invalid
+			strings. Defaults to 0.
+
+	Returns:
+		array.array: the numbers of minutes, with typecode "q"
+
+	Raises:
+		ValueError: if a string is invalid and on_invalid is
+			InvalidPolicy.RAISE, or if on_invalid is InvalidPolicy.SENTINEL
+	"""
+	if on_invalid is InvalidPolicy.SENTINEL:
+		raise ValueError("A minute array cannot store sentinels.")
+
+	minutes = array(_MINUTE_TYPECODE)
+	append = minutes.append
+	match = _DURATION_REGEX.fullmatch
+
+	for index, dur_str in enumerate(dur_strs, start):
+		dur_match = match(dur_str)
+
+		if dur_match is None:
+			if on_invalid is not InvalidPolicy.SKIP:
+				_raise_invalid_item(index, dur_str)
+			continue
+
+		sign, hour_str, min_str = dur_match.groups()
+		num_of_minutes = int(hour_str) * _MINS_IN_HOUR + int(min_str)
+		append(-num_of_minutes if sign else num_of_minutes)
+
+	return minutes
+
+
+def parse_duration(dur_str, formats=DurationFormat.ALL):
+	"""
+	Extracts the number of hours and the number of minutes from a duration's
+	string representation in one of several formats. The format is detected
+	from the string's first characters, and the string is parsed in a single
+	pass. A minus sign can precede any format. Strings in the classic format
+	are parsed as fast as by function duration_from_str.
+
+	Args:
+		dur_str (str): a duration's string representation
+		formats (DurationFormat): the accepted formats. Defaults to
+			DurationFormat.ALL.
+
+	Returns:
+		tuple:
+			[0]: (int) the number of hours
+			[1]: (int) the number of minutes
+
+	Raises:
+		TypeError: if dur_str is not a string
+		ValueError: if dur_str does not represent a duration in one of the
+			accepted formats
+	"""
+	if not isinstance(dur_str, str):
+		raise TypeError("The given object is not of type str.")
+
+	hour_str, colon, min_str = dur_str.partition(_COLON)
+
+	if colon:
+		# The scan of _scan_duration is inlined to avoid a function call.
+		if len(min_str) == 2 and min_str.isdecimal() and (formats is\
+				_ALL_FORMATS or DurationFormat.CLASSIC in formats):
+			if hour_str[:1] == _HYPHEN:
+				hour_str = hour_str[1:]
+
+				if hour_str.isdecimal():
+					return -int(hour_str), -int(min_str)
+			elif hour_str.isdecimal():
+				return int(hour_str), int(min_str)
+
+		_raise_invalid_format(dur_str, formats)
+
+	body = dur_str[1:] if dur_str[:1] == _HYPHEN else dur_str
+
+	if body[:1] == _ISO_DESIGNATOR:
+		duration = _scan_iso_duration(body[1:])
+		dur_format = DurationFormat.ISO_8601
+	elif body.isdecimal():
+		duration = 0, int(body)
+		dur_format = DurationFormat.MINUTES
+	else:
+		duration = _scan_unit_duration(body.lower())
+		dur_format = DurationFormat.UNITS
+
+	if duration is None\
+			or (formats is not _ALL_FORMATS and dur_format not in formats):
+		_raise_invalid_format(dur_str, formats)
+
+	if len(body) < len(dur_str):
+		return -duration[0], -duration[1]
+
+	return duration
+
+
+def _raise_invalid_format(dur_str, formats):
+	"""
+	Raises a ValueError about a string that does not represent a duration in
+	the formats accepted by function parse_duration.
+
+	Args:
+		dur_str (str): the invalid string
+		formats (DurationFormat): the accepted formats
+
+	Raises:
+		ValueError: always
+	"""
+	if formats is _ALL_FORMATS:
+		raise ValueError("Argument '" + dur_str\
+			+ "' does not represent a duration.")
+
+	raise ValueError("Argument '" + dur_str\
+		+ "' does not represent a duration in format " + str(formats) + ".")
+
+
+def _raise_invalid_item(index, dur_str):
+	"""
+	Raises a ValueError about an item of an iterable that does not match
+	DURATION_STR_PATTERN.
+
+	Args:
+		index (int): the item's index in the iterable
+		dur_str (str): the invalid item
+
+	Raises:
+		ValueError: always
+	"""
+	raise ValueError("Item " + str(index) + " '" + dur_str\
+		+ "' does not match regex '" + DURATION_STR_PATTERN + "'.")
+
+
+def _scan_duration(dur_str):
+	"""
+	Validates a duration's string representation and extracts its number of
+	hours and its number of minutes in a single scan. The accepted strings
+	are exactly those that match DURATION_STR_PATTERN: the class \\d of
+	Python regular expressions and method str.isdecimal accept the same
+	characters, and int accepts all of them.
+
+	Args:
+		dur_str (str): a string that should represent a duration
+
+	Returns:
+		tuple:
+			[0]: (int) the number of hours
+			[1]: (int) the number of minutes
+		or None if dur_str does not represent a duration
+
+	Raises:
+		TypeError: if dur_str is not a string
+	"""
+	if not isinstance(dur_str, str):
+		raise TypeError("The given object is not of type str.")
+
+	hour_str, colon, min_str = dur_str.partition(_COLON)
+
+	if len(min_str) != 2 or not min_str.isdecimal():
+		return None
+
+	if hour_str[:1] == _HYPHEN:
+		hour_str = hour_str[1:]
+
+		if not hour_str.isdecimal():
+			return None
+
+		return -int(hour_str), -int(min_str)
+
+	if not hour_str.isdecimal():
+		return None
+
+	return int(hour_str), int(min_str)
+
+
+def _scan_iso_duration(body):
+	"""
+	Extracts the number of hours and the number of minutes from an ISO 8601
+	duration that contains days, hours or minutes.
+
+	Args:
+		body (str): the duration without its sign and its designator P
+
+	Returns:
+		tuple:
+			[0]: (int) the number of hours, including the days
+			[1]: (int) the number of minutes
+		or None if body is not a valid ISO 8601 duration
+	"""
+	date_part, time_designator, time_part = body.partition("T")
+	hours = 0
+	minutes = 0
+
+	if date_part:
+		day_str, day_designator, rest = date_part.partition("D")
+
+		if rest or not day_designator or not day_str.isdecimal():
+			return None
+
+		hours = int(day_str) * _HOURS_IN_DAY
+
+	if time_designator:
+		hour_str, hour_designator, min_part = time_part.partition("H")
+
+		if not hour_designator:
+			hour_str, min_part = "", time_part
+
+		if hour_designator:
+			if not hour_str.isdecimal():
+				return None
+
+			hours += int(hour_str)
+
+		if min_part:
+			if min_part[-1:] != "M" or not min_part[:-1].isdecimal():
+				return None
+
+			minutes = int(min_part[:-1])
+		elif not hour_designator:
+			return None
+	elif not date_part:
+		return None
+
+	return hours, minutes
+
+
+def _scan_unit_duration(body):
+	"""
+	Extracts the number of hours and the number of minutes from a duration
+	written with units h and m.
+
+	Args:
+		body (str): the lowercase duration without its sign
+
+	Returns:
+		tuple:
+			[0]: (int) the number of hours
+			[1]: (int) the number of minutes
+		or None if body is not a valid duration with units
+	"""
+	hour_str, hour_unit, min_part = body.partition("h")
+
+	if not hour_unit:
+		hour_str, min_part = "", body
+	elif not hour_str.isdecimal():
+		return None
+
+	hours = int(hour_str) if hour_unit else 0
+
+	if min_part:
+		if min_part[-1:] != "m" or not min_part[:-1].isdecimal():
+			return None
+
+		return hours, int(min_part[:-1])
+
+	if not hour_unit:
+		return None
+
+	return hours, 0
+
+
+def _split_lines(data):
+	"""
+	Decodes bytes and splits them into non-empty lines. A carriage return at
+	the end of a line is removed.
+
+	Args:
+		data (bytes): newline-delimited duration strings
+
+	Returns:
+		list: the non-empty lines
+
+	Raises:
+		ValueError: if data is not valid UTF-8
+	"""
+	lines = list()
+
+	for line in data.decode(_ENCODING).split(_NEWLINE_STR):
+		if line.endswith(_CARRIAGE_RETURN):
+			line = line[:-1]
+
+		if line:
+			lines.append(line)
+
+	return lines
+
+
 def str_repr_duration(a_str):
 	"""
 	Determines whether the given string represents a duration in hours and
 	minutes. It does if and only if it matches regular expression
-	DURATION_STR_PATTERN. The match is verified by re.fullmatch.
+	DURATION_STR_PATTERN. The match is verified by a precompiled regular
+	expression's method fullmatch.
 
 	Args:
 		a_str (str): a string that should represent a duration
@@ -123,4 +592,21 @@ def str_repr_duration(a_str):
 	Returns:
 		bool: True if a_str represents a duration, False otherwise
 	"""
-	return fullmatch(DURATION_STR_PATTERN, a_str) is not None
+	return _DURATION_REGEX.fullmatch(a_str) is not None
+
+
+def _minutes_of(duration):
+	"""
+	Gets the signed integral number of minutes of a duration. Unlike
+	duration_aggregation._to_minutes, it does not parse strings.
+
+	Args:
+		duration (HM_Duration or int): a duration or its number of minutes
+
+	Returns:
+		int: the duration's number of minutes
+	"""
+	if duration.__class__ is int:
+		return duration
+
+	return duration.to_minutes()
@@ -0,0 +1,123 @@
+"""
+This module converts durations in minutes to and from datetime.timedelta. The
+conversions use the exact integer arithmetic of timedelta, so no float is
+involved, and the sub-minute part of a timedelta is rounded as requested.
+"""
+
+
+from array import array
+from datetime import timedelta
+from enum import Enum
+
+from .duration_string import _MINUTE_TYPECODE
+
+
+_ONE_MINUTE = timedelta(minutes=1)
+_HALF_MINUTE = _ONE_MINUTE / 2
+
+
+class TimedeltaRounding(Enum):
+	"""
+	This enumeration tells the conversions from timedelta what to do with a
+	sub-minute part.
+	"""
+	HALF_UP = 0
+	"""Round to the nearest minute, half a minute upward, like HM_Duration
+	division."""
+	FLOOR = 1
+	"""Round downward."""
+	CEILING = 2
+	"""Round upward."""
+	TOWARD_ZERO = 3
+	"""Drop the sub-minute part."""
+	EXACT = 4
+	"""Raise a ValueError."""
+
+
+def minutes_from_timedelta(delta, rounding=TimedeltaRounding.HALF_UP):
+	"""
+	Converts a timedelta to a signed integral number of minutes.
+
+	Args:
+		delta (datetime.timedelta): a time interval
+		rounding (TimedeltaRounding): how to round a sub-minute part. Defaults
+			to TimedeltaRounding.HALF_UP.
+
+	Returns:
+		int: the number of minutes in delta
+
+	Raises:
+		ValueError: if delta has a sub-minute part and rounding is
+			TimedeltaRounding.EXACT
+	"""
+	minutes, remainder = divmod(delta, _ONE_MINUTE)
+
+	if not remainder:
+		return minutes
+
+	# The remainder is positive, since divmod rounds minutes downward.
+	if rounding is TimedeltaRounding.HALF_UP:
+		return minutes + (remainder >= _HALF_MINUTE)
+
+	if rounding is TimedeltaRounding.FLOOR:
+		return minutes
+
+	if rounding is TimedeltaRounding.CEILING:
+		return minutes + 1
+
+	if rounding is TimedeltaRounding.TOWARD_ZERO:
+		return minutes + (minutes < 0)
+
+	raise ValueError("Argument " + repr(delta)
+		+ " is not a whole number of minutes.")
+
+
+def minutes_from_timedeltas(deltas, rounding=TimedeltaRounding.HALF_UP):
+	"""
+	Converts each timedelta in an iterable to a signed integral number of
+	minutes. The numbers are stored in a compact array of signed 64-bit
+	integers.
+
+	Args:
+		deltas: an iterable of datetime.timedelta instances
+		rounding (TimedeltaRounding): how to round the sub-minute parts.
+			Defaults to TimedeltaRounding.HALF_UP.
+
+	Returns:
+		array.array: the numbers of minutes, with typecode "q"
+
+	Raises:
+		ValueError: if a timedelta has a sub-minute part and rounding is
+			TimedeltaRounding.EXACT
+	"""
+	minutes = array(_MINUTE_TYPECODE)
+	append = minutes.append
+
+	if rounding is TimedeltaRounding.FLOOR:
+		# Floor division needs no correction.
+		for delta in deltas:
+			append(delta // _ONE_MINUTE)
+	else:
+		for delta in deltas:
+			append(minutes_from_timedelta(delta, rounding))
+
+	return minutes
+
+
+def timedeltas_from_minutes(durations):
+	"""
+	Converts durations to timedelta instances.
+
+	Args:
+		durations: an iterable of HM_Duration instances or of signed integral
+			numbers of minutes, or an array that has method tolist, such as
+			array.array or numpy.ndarray
+
+	Returns:
+		list: the timedelta instances
+	"""
+	if hasattr(durations, "tolist"):
+		durations = durations.tolist()
+
+	return [_ONE_MINUTE * (duration if duration.__class__ is int
+		else duration.to_minutes()) for duration in durations]
@@ -1,25 +1,55 @@
-from .duration_string import duration_from_str, duration_to_str
+from .duration_string import DurationFormat, InvalidDuration,\
+	InvalidPolicy, _minutes_to_str, duration_from_str, duration_from_str_many,\
+	parse_duration
+from .duration_bytes import duration_from_bytes
+from .duration_cache import DurationCache, EvictionPolicy
+from .duration_timedelta import TimedeltaRounding, _ONE_MINUTE,\
+	minutes_from_timedelta
+from datetime import timedelta
 from math import floor
 
 
+_MINS_IN_DAY = 1440
+"""
+The number of minutes in one day
+"""
+
 _MINS_IN_HOUR = 60
 """
 The number of minutes in one hour
 """
 
+_SECS_IN_MIN = 60
+"""
+The number of seconds in one minute
+"""
+
+_cache = None
+"""
+The DurationCache from which HM_Duration gets shared instances if interning is
+enabled, None otherwise
+"""
+
 
 class HM_Duration:
 	"""
 	This class represents durations as a number of hours and a number of
 	minutes. Among other functionalities, it offers arithmetic operations,
 	string representation and instantiation from a string representation.
+
+	Instances are immutable and hashable. They store a single signed total
+	number of minutes in a slot and derive the hours, the minutes and the sign
+	from it. Equal durations have the same hash as the equal timedelta.
 	"""
 
-	def __init__(self, hours, minutes):
+	__slots__ = ("_mins",)
+
+	def __new__(cls, hours, minutes):
 		"""
 		The constructor needs the number of hours and the number of minutes
 		that make a duration. Give two negative arguments to make a negative
-		duration.
+		duration. If interning is enabled, the returned instance can be
+		shared.
 
 		Args:
 			hours (int): a number of hours
@@ -32,116 +62,170 @@ class HM_Duration:
 			raise ValueError(
 				"Arguments hours and minutes must have the same sign.")
 
-		if hours < 0 or minutes < 0:
-			self._sign = -1
-		elif hours == 0 and minutes == 0:
-			self._sign = 0
-		else:
-			self._sign = 1
-
-		self._hours = abs(hours)
-		self._minutes = abs(minutes)
-		self._regularize()
+		return cls._from_minutes(hours * _MINS_IN_HOUR + minutes)
 
 	def __abs__(self):
-		return HM_Duration(self._hours, self._minutes)
+		return HM_Duration._from_minutes(abs(self._mins))
 
 	def __add__(self, other):
 		"""
-		Creates an instance that represents the sum of self and other.
+		Creates an instance that represents the sum of self and other. The
+		sum of a duration and a timedelta is an exact timedelta.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			HM_Duration: the sum of self and other
+			datetime.timedelta: the sum if other is a timedelta
 		"""
-		sum_as_mins = self.to_minutes() + other.to_minutes()
-		return HM_Duration(0, sum_as_mins)
+		if isinstance(other, HM_Duration):
+			return HM_Duration._from_minutes(self._mins + other._mins)
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins + other
+
+		return NotImplemented
+
+	def __copy__(self):
+		# Immutable instances can be shared.
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+	def __delattr__(self, name):
+		raise AttributeError(
+			self.__class__.__name__ + " instances are immutable.")
 
 	def __eq__(self, other):
 		"""
-		Determines whether this duration is greater than or equal to another.
+		Determines whether this duration is equal to another. A timedelta is
+		compared exactly, so it is equal to a duration only if it is a whole
+		number of minutes.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
-			bool: True if this duration is greater than or equal to the other,
-				False otherwise or if other is not an instance of this class
+			bool: True if this duration is equal to the other, False otherwise
+			NotImplemented: if other is neither an instance of this class nor
+				a timedelta, so that the reflected comparison is tried
 		"""
-		if not isinstance(other, self.__class__):
-			return False
+		if isinstance(other, HM_Duration):
+			return self._mins == other._mins
 
-		return self.to_minutes() == other.to_minutes()
+		if isinstance(other, timedelta):
+			try:
+				return _ONE_MINUTE * self._mins == other
+			except OverflowError:
+				# No timedelta lasts that long.
+				return False
+
+		return NotImplemented
 
 	def __ge__(self, other):
 		"""
-		Determines whether this duration is greater than or equal to another.
+		Determines whether this duration is greater than or equal to another. A
+		timedelta is compared exactly.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			bool: True if this duration is greater than or equal to the other,
 				False otherwise
 
 		Raises:
-			TypeError: if other is not an instance of this class
+			TypeError: if other is neither an instance of this class nor a
+				timedelta and does not support the reflected comparison
 		"""
-		HM_Duration._raise_except_if_wrong_class(other)
-		return self.to_minutes() >= other.to_minutes()
+		if isinstance(other, HM_Duration):
+			return self._mins >= other._mins
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins >= other
+
+		return NotImplemented
 
 	def __gt__(self, other):
 		"""
-		Determines whether this duration is greater than another.
+		Determines whether this duration is greater than another. A
+		timedelta is compared exactly.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			bool: True if this duration is greater than the other,
 				False otherwise
 
 		Raises:
-			TypeError: if other is not an instance of this class
+			TypeError: if other is neither an instance of this class nor a
+				timedelta and does not support the reflected comparison
 		"""
-		HM_Duration._raise_except_if_wrong_class(other)
-		return self.to_minutes() > other.to_minutes()
+		if isinstance(other, HM_Duration):
+			return self._mins > other._mins
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins > other
+
+		return NotImplemented
+
+	def __hash__(self):
+		# An equal timedelta must have the same hash. It hashes like its state
+		# (days, seconds, microseconds), which is cheaper to build than the
+		# timedelta and exists even beyond timedelta's range.
+		days, mins = divmod(self._mins, _MINS_IN_DAY)
+		return hash((days, mins * _SECS_IN_MIN, 0))
 
 	def __le__(self, other):
 		"""
-		Determines whether this duration is lesser than or equal to another.
+		Determines whether this duration is lesser than or equal to another. A
+		timedelta is compared exactly.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			bool: True if this duration is lesser than or equal to the other,
 				False otherwise
 
 		Raises:
-			TypeError: if other is not an instance of this class
+			TypeError: if other is neither an instance of this class nor a
+				timedelta and does not support the reflected comparison
 		"""
-		HM_Duration._raise_except_if_wrong_class(other)
-		return self.to_minutes() <= other.to_minutes()
+		if isinstance(other, HM_Duration):
+			return self._mins <= other._mins
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins <= other
+
+		return NotImplemented
 
 	def __lt__(self, other):
 		"""
-		Determines whether this duration is lesser than another.
+		Determines whether this duration is lesser than another. A
+		timedelta is compared exactly.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			bool: True if this duration is lesser than the other,
 				False otherwise
 
 		Raises:
-			TypeError: if other is not an instance of this class
+			TypeError: if other is neither an instance of this class nor a
+				timedelta and does not support the reflected comparison
 		"""
-		HM_Duration._raise_except_if_wrong_class(other)
-		return self.to_minutes() < other.to_minutes()
+		if isinstance(other, HM_Duration):
+			return self._mins < other._mins
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins < other
+
+		return NotImplemented
 
 	def __mul__(self, number):
 		"""
@@ -155,35 +239,69 @@ class HM_Duration:
 			HM_Duration: the product of self by a number
 		"""
 		prod_as_mins = int(_round_half_up(self.to_minutes() * number))
-		return HM_Duration(0, prod_as_mins)
+		return HM_Duration._from_minutes(prod_as_mins)
 
 	def __neg__(self):
-		hours = -self.hours
-		minutes = -self.minutes
-		return HM_Duration(hours, minutes)
+		return HM_Duration._from_minutes(-self._mins)
 
-	def __rmul__(self, number):
-		return self.__mul__(number)
+	def __radd__(self, other):
+		# Lets built-in function sum start from 0.
+		if other.__class__ is int and other == 0:
+			return self
+
+		if isinstance(other, timedelta):
+			return other + _ONE_MINUTE * self._mins
+
+		return NotImplemented
+
+	def __reduce__(self):
+		# Only the number of minutes is serialized.
+		if self.__class__ is HM_Duration:
+			return _unpickle_duration, (self._mins,)
+
+		return self.__class__._from_minutes, (self._mins,)
 
 	def __repr__(self):
 		return self.__class__.__name__ +\
 			"(" + str(self.hours) + ", " + str(self.minutes) + ")"
 
+	def __rmul__(self, number):
+		return self.__mul__(number)
+
+	def __rsub__(self, other):
+		# Subtracts this duration from a timedelta.
+		if isinstance(other, timedelta):
+			return other - _ONE_MINUTE * self._mins
+
+		return NotImplemented
+
+	def __setattr__(self, name, value):
+		raise AttributeError(
+			self.__class__.__name__ + " instances are immutable.")
+
 	def __str__(self):
-		return duration_to_str(self.hours, self.minutes)
+		return _minutes_to_str(self._mins)
 
 	def __sub__(self, other):
 		"""
 		Creates an instance that represents the difference of self and other.
+		The difference between a duration and a timedelta is an exact
+		timedelta.
 
 		Args:
-			other (HM_Duration): another duration
+			other (HM_Duration or datetime.timedelta): another duration
 
 		Returns:
 			HM_Duration: the difference of self and other
+			datetime.timedelta: the difference if other is a timedelta
 		"""
-		diff_as_mins = self.to_minutes() - other.to_minutes()
-		return HM_Duration(0, diff_as_mins)
+		if isinstance(other, HM_Duration):
+			return HM_Duration._from_minutes(self._mins - other._mins)
+
+		if isinstance(other, timedelta):
+			return _ONE_MINUTE * self._mins - other
+
+		return NotImplemented
 
 	def __truediv__(self, number):
 		"""
@@ -197,7 +315,93 @@ class HM_Duration:
 			HM_Duration: the quotient of self by a number
 		"""
 		quo_as_mins = int(_round_half_up(self.to_minutes() / number))
-		return HM_Duration(0, quo_as_mins)
+		return HM_Duration._from_minutes(quo_as_mins)
+
+	@staticmethod
+	def from_bytes(buffer, start=0, end=None):
+		"""
+		Creates an instance from a duration's representation in a slice of a
+		bytes-like object, without decoding it.
+
+		Args:
+			buffer: a bytes, bytearray or memoryview object
+			start (int): the index of the slice's first byte. Defaults to 0.
+			end (int): the index that follows the slice's last byte. If it is
+				None or greater than the buffer's length, the slice ends with
+				the buffer. Defaults to None.
+
+		Returns:
+			HM_Duration: the duration represented by the slice
+
+		Raises:
+			ValueError: if bytes_repr_duration(buffer, start, end) returns
+				False
+		"""
+		hours, minutes = duration_from_bytes(buffer, start, end)
+		return HM_Duration._from_minutes(hours * _MINS_IN_HOUR + minutes)
+
+	@classmethod
+	def _from_minutes(cls, minutes):
+		"""
+		Creates an instance from a signed total number of minutes without any
+		validation. The arithmetic operators use this constructor because
+		their results are always valid. If interning is enabled, the returned
+		instance can be shared.
+
+		Args:
+			minutes (int): the signed total number of minutes
+
+		Returns:
+			HM_Duration: the duration that lasts the given number of minutes
+		"""
+		if _cache is None or cls is not HM_Duration:
+			duration = _new_object(cls)
+			_set_mins(duration, minutes)
+			return duration
+
+		return _cache.intern(minutes, _make_duration)
+
+	@staticmethod
+	def from_timedelta(delta, rounding=TimedeltaRounding.HALF_UP):
+		"""
+		Creates an instance from a timedelta.
+
+		Args:
+			delta (datetime.timedelta): a time interval
+			rounding (TimedeltaRounding): how to round the sub-minute part of
+				delta. Defaults to TimedeltaRounding.HALF_UP.
+
+		Returns:
+			HM_Duration: the duration of delta in minutes
+
+		Raises:
+			ValueError: if delta has a sub-minute part and rounding is
+				TimedeltaRounding.EXACT
+		"""
+		return HM_Duration._from_minutes(
+			minutes_from_timedelta(delta, rounding))
+
+	@staticmethod
+	def from_timedelta_many(deltas, rounding=TimedeltaRounding.HALF_UP):
+		"""
+		Creates an instance from each timedelta in an iterable.
+
+		Args:
+			deltas: an iterable of datetime.timedelta instances
+			rounding (TimedeltaRounding): how to round the sub-minute parts.
+				Defaults to TimedeltaRounding.HALF_UP.
+
+		Yields:
+			HM_Duration: the duration of each timedelta in minutes
+
+		Raises:
+			ValueError: if a timedelta has a sub-minute part and rounding is
+				TimedeltaRounding.EXACT
+		"""
+		from_minutes = HM_Duration._from_minutes
+
+		for delta in deltas:
+			yield from_minutes(minutes_from_timedelta(delta, rounding))
 
 	@staticmethod
 	def from_str(dur_str):
@@ -215,43 +419,81 @@ class HM_Duration:
 			ValueError: if str_repr_duration(dur_str) returns False
 		"""
 		hours, minutes = duration_from_str(dur_str)
-		return HM_Duration(hours, minutes)
+		return HM_Duration._from_minutes(hours * _MINS_IN_HOUR + minutes)
+
+	@staticmethod
+	def from_str_many(dur_strs, on_invalid=InvalidPolicy.RAISE, start=0):
+		"""
+		Creates an instance from each duration string representation in an
+		iterable.
+
+		Args:
+			dur_strs: an iterable of strings that represent durations in hours
+				and minutes
+			on_invalid (InvalidPolicy): what to do with the strings that do
+				not match DURATION_STR_PATTERN. Defaults to
+				InvalidPolicy.RAISE.
+			start (int): the index of the first string, used to report
+				invalid strings. Defaults to 0.
+
+		Yields:
+			HM_Duration: the duration represented by each string, or
+				InvalidDuration for the invalid strings if on_invalid is
+				InvalidPolicy.SENTINEL
+
+		Raises:
+			ValueError: if a string is invalid and on_invalid is
+				InvalidPolicy.RAISE
+		"""
+		from_minutes = HM_Duration._from_minutes
+
+		for parsed in duration_from_str_many(dur_strs, on_invalid, start):
+			if parsed.__class__ is InvalidDuration:
+				yield parsed
+			else:
+				yield from_minutes(parsed[0] * _MINS_IN_HOUR + parsed[1])
 
 	@property
 	def hours(self):
 		"""
 		This read-only property returns this duration's number of hours.
 		"""
-		return self._sign * self._hours
+		mins = self._mins
+		if mins < 0:
+			return -(-mins // _MINS_IN_HOUR)
+		return mins // _MINS_IN_HOUR
 
 	@property
 	def minutes(self):
 		"""
 		This read-only property returns this duration's number of minutes.
 		"""
-		return self._sign * self._minutes
+		mins = self._mins
+		if mins < 0:
+			return -(-mins % _MINS_IN_HOUR)
+		return mins % _MINS_IN_HOUR
 
-	@classmethod
-	def _raise_except_if_wrong_class(cls, value):
+	@staticmethod
+	def parse(dur_str, formats=DurationFormat.ALL):
 		"""
-		Raises a TypeError if the given value is not an instance of this class.
+		Creates an instance from a duration's string representation in one of
+		several formats, such as "1:30", "1h30m", "90" or "PT1H30M". See
+		function parse_duration.
 
 		Args:
-			value: any object
+			dur_str (str): a string that represents a duration
+			formats (DurationFormat): the accepted formats. Defaults to
+				DurationFormat.ALL.
 
-		Raises:
-			TypeError: if value is not an instance of this class
-		"""
-		if not isinstance(value, cls):
-			raise TypeError("The given object is not of type "
-				+ cls.__name__ + ".")
+		Returns:
+			HM_Duration: the duration represented by dur_str
 
-	def _regularize(self):
-		"""
-		Makes sure that the number of minutes ranges from 0 to 59.
+		Raises:
+			ValueError: if dur_str does not represent a duration in one of
+				the accepted formats
 		"""
-		self._hours += self._minutes // _MINS_IN_HOUR
-		self._minutes = self._minutes % _MINS_IN_HOUR
+		hours, minutes = parse_duration(dur_str, formats)
+		return HM_Duration._from_minutes(hours * _MINS_IN_HOUR + minutes)
 
 	@property
 	def sign(self):
@@ -259,7 +501,8 @@ class HM_Duration:
 		This read-only property returns an integral number that represents the
 		sign of this duration: -1 if negative, 0 if null or 1 if positive.
 		"""
-		return self._sign
+		mins = self._mins
+		return (mins > 0) - (mins < 0)
 
 	def to_hours(self):
 		"""
@@ -268,8 +511,12 @@ class HM_Duration:
 		Returns:
 			float: a real number of hours equal to this duration
 		"""
-		num_of_hours = self._hours + self._minutes / _MINS_IN_HOUR
-		return self._sign * num_of_hours
+		mins = self._mins
+		if mins < 0:
+			hours, minutes = divmod(-mins, _MINS_IN_HOUR)
+			return -(hours + minutes / _MINS_IN_HOUR)
+		hours, minutes = divmod(mins, _MINS_IN_HOUR)
+		return hours + minutes / _MINS_IN_HOUR
 
 	def to_minutes(self):
 		"""
@@ -278,11 +525,78 @@ class HM_Duration:
 		Returns:
 			int: an integral number of minutes equal to this duration
 		"""
-		num_of_minutes = self._hours * _MINS_IN_HOUR + self._minutes
-		return self._sign * num_of_minutes
+		return self._mins
+
+	def to_timedelta(self):
+		"""
+		Converts this duration to a timedelta.
+
+		Returns:
+			datetime.timedelta: a timedelta equal to this duration
+		"""
+		return _ONE_MINUTE * self._mins
+
+
+_new_object = object.__new__
+_set_mins = HM_Duration._mins.__set__
+
+
+def disable_interning():
+	"""
+	Stops sharing HM_Duration instances. The instances created while interning
+	was enabled remain valid.
+	"""
+	global _cache
+	_cache = None
+
+
+def enable_interning(max_size=1024, eviction=EvictionPolicy.LRU):
+	"""
+	Makes the HM_Duration constructor, HM_Duration.from_str and the
+	arithmetic operators return shared instances from a bounded cache keyed
+	by the total number of minutes. Since instances are immutable, sharing
+	them is safe. Enabling interning again replaces the cache.
+
+	Args:
+		max_size (int): the maximum number of cached instances. Defaults to
+			1024.
+		eviction (EvictionPolicy): which instance to discard when the cache is
+			full. Defaults to EvictionPolicy.LRU.
+
+	Returns:
+		DurationCache: the new cache, which provides hit and miss statistics
+	"""
+	global _cache
+	_cache = DurationCache(max_size, eviction)
+	return _cache
+
+
+def interning_cache():
+	"""
+	Gets the cache from which HM_Duration instances are shared.
+
+	Returns:
+		DurationCache: the cache if interning is enabled, None otherwise
+	"""
+	return _cache
+
+
+def _make_duration(minutes):
+	# The factory that the cache calls on a miss
+	duration = _new_object(HM_Duration)
+	_set_mins(duration, minutes)
+	return duration
 
 
 def _round_half_up(n, decimals=0):
 	# Source: https://realpython.com/python-rounding/#rounding-half-up
     multiplier = 10 ** decimals
     return floor(n*multiplier + 0.5) / multiplier
+
+
+def _unpickle_duration(minutes):
+	# Restores a pickled instance, possibly from the interning cache.
+	if _cache is None:
+		return _make_duration(minutes)
+
+	return _cache.intern(minutes, _make_duration)
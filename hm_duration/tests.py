@@ -1,6 +1,39 @@
+from asyncio import StreamReader, run
+from contextlib import redirect_stderr, redirect_stdout
+from copy import copy, deepcopy
+from datetime import timedelta
 from enum import Enum
+from fuzz import BACKENDS, fuzz_backends
+from io import StringIO
+from os import remove
+from pickle import dumps, loads
 from re import T
-from src import HM_Duration, duration_to_str, str_repr_duration
+from src import DurationAccumulator, DurationBuilder, DurationFormat,\
+	DurationSketch, EvictionPolicy, HM_Duration, IndexedDurations,\
+	InvalidDuration, InvalidPolicy, SortMethod, TimedeltaRounding,\
+	bytes_repr_duration, count_by_key, disable_instrumentation,\
+	disable_interning, duration_to_bytes, duration_to_str,\
+	duration_to_str_many, enable_instrumentation, enable_interning, median,\
+	minutes_from_str_many, minutes_from_timedeltas, parse_duration_stream,\
+	parse_file_parallel, percentile, read_durations, sorted_durations,\
+	str_repr_duration, sum_by_key, timedeltas_from_minutes, top_k,\
+	write_durations
+from src import duration_string
+from src.duration_cli import main
+from sys import byteorder, modules
+from tempfile import NamedTemporaryFile
+from types import ModuleType
+
+try:
+	from src import HM_DurationArray
+except ImportError: # NumPy is not installed.
+	HM_DurationArray = None
+
+try:
+	from pandas import NA, DataFrame, Series
+	from src import HM_DurationDtype
+except ImportError: # pandas is not installed.
+	HM_DurationDtype = None
 
 
 ACTUAL_STR = "Actual: "
@@ -35,6 +68,25 @@ def print_actual_and_expected_values(actual_value, expected_value):
 	print(EXPECTED_STR + str(expected_value))
 
 
+def run_command_line(lines, args):
+	with NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+		file.write("\n".join(lines) + "\n")
+
+	output = StringIO()
+	errors = StringIO()
+
+	try:
+		with redirect_stdout(output), redirect_stderr(errors):
+			status = main([file.name] + args)
+	except SystemExit as exit_error:
+		# The argument parser exits on invalid arguments.
+		status = exit_error.code
+	finally:
+		remove(file.name)
+
+	return status, output.getvalue().splitlines(), errors.getvalue()
+
+
 def test_absolute_value(hours, minutes, expected_abs_h, expected_abs_m):
 	duration = HM_Duration(hours, minutes)
 	dur_abs_val = abs(duration)
@@ -52,6 +104,20 @@ def test_absolute_value(hours, minutes, expected_abs_h, expected_abs_m):
 		print()
 
 
+def test_accumulator(durations, expected_results):
+	accumulator = DurationAccumulator(durations[:1])
+	accumulator.update(durations[1:])
+	actual_results = (accumulator.count, accumulator.sum(),
+		accumulator.min(), accumulator.max(), accumulator.mean())
+
+	try:
+		assert actual_results == expected_results
+	except AssertionError:
+		print("Accumulator test failed for " + str(durations) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
 def test_arithmetic(operand1, operator, operand2, expected_result):
 	if operator == ArithmOperator.ADD:
 		actual_result = operand1 + operand2
@@ -75,6 +141,197 @@ def test_arithmetic(operand1, operator, operand2, expected_result):
 		print()
 
 
+def test_array_arithmetic(durations, operator, operand):
+	duration_array = HM_DurationArray(durations)
+
+	if operator == ArithmOperator.ADD:
+		actual_result = (duration_array + operand).to_list()
+		expected_result = [duration + operand for duration in durations]
+	elif operator == ArithmOperator.SUB:
+		actual_result = (duration_array - operand).to_list()
+		expected_result = [duration - operand for duration in durations]
+	elif operator == ArithmOperator.MUL:
+		actual_result = (duration_array * operand).to_list()
+		expected_result = [duration * operand for duration in durations]
+	elif operator == ArithmOperator.DIV:
+		actual_result = (duration_array / operand).to_list()
+		expected_result = [duration / operand for duration in durations]
+
+	try:
+		assert actual_result == expected_result
+	except AssertionError:
+		print("Array arithmetic test failed for "
+			+ str(duration_array) + " and " + str(operand) + PERIOD)
+		print_actual_and_expected_values(actual_result, expected_result)
+		print()
+
+
+def test_array_arithmetic_error(durations, operator, operand, expected_error):
+	duration_array = HM_DurationArray(durations)
+	actual_errors = list()
+
+	# The array must reject the operand like the scalar path.
+	for duration in (duration_array, durations[0]):
+		try:
+			if operator == ArithmOperator.MUL:
+				duration * operand
+			elif operator == ArithmOperator.DIV:
+				duration / operand
+		except (ArithmeticError, ValueError) as error:
+			actual_errors.append(type(error))
+		else:
+			actual_errors.append(None)
+
+	try:
+		assert actual_errors == [expected_error, expected_error]
+	except AssertionError:
+		print("Array arithmetic error test failed for "
+			+ str(duration_array) + " and " + str(operand) + PERIOD)
+		print_actual_and_expected_values(actual_errors, expected_error)
+		print()
+
+
+def test_array_reflected(durations, duration):
+	duration_array = HM_DurationArray(durations)
+	actual_results = ((duration + duration_array).to_list(),
+		(duration - duration_array).to_list(),
+		(duration < duration_array).tolist(),
+		(duration >= duration_array).tolist(),
+		(duration == duration_array).tolist(),
+		(duration != duration_array).tolist(),
+		duration_array == None, duration_array != None)
+	expected_results = ([duration + other for other in durations],
+		[duration - other for other in durations],
+		[duration < other for other in durations],
+		[duration >= other for other in durations],
+		[duration == other for other in durations],
+		[duration != other for other in durations],
+		False, True)
+
+	try:
+		assert actual_results == expected_results
+	except AssertionError:
+		print("Array reflected operation test failed for "
+			+ str(duration) + " and " + str(duration_array) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
+def test_builder(initial, operations, expected_result):
+	builder = DurationBuilder(initial)
+	builder_id = id(builder)
+
+	for operator, operand in operations:
+		if operator == ArithmOperator.ADD:
+			builder += operand
+		elif operator == ArithmOperator.SUB:
+			builder -= operand
+		elif operator == ArithmOperator.MUL:
+			builder *= operand
+		elif operator == ArithmOperator.DIV:
+			builder /= operand
+
+	actual_result = builder.freeze()
+
+	try:
+		assert id(builder) == builder_id
+		assert actual_result == expected_result
+	except AssertionError:
+		print("Builder test failed for " + str(operations) + PERIOD)
+		print_actual_and_expected_values(actual_result, expected_result)
+		print()
+
+
+def test_bytes(dur_bytes, expected_h, expected_m):
+	buffer = memoryview(b"x" + dur_bytes + b"x")
+	end = len(buffer) - 1
+	expected_valid = expected_h is not None
+
+	try:
+		actual_valid = bytes_repr_duration(buffer, 1, end)
+		assert actual_valid == expected_valid
+
+		if expected_valid:
+			duration = HM_Duration.from_bytes(buffer, 1, end)
+			assert duration == HM_Duration(expected_h, expected_m)
+			# Out-of-range bounds are clamped to the buffer.
+			assert bytes_repr_duration(dur_bytes, -1, len(dur_bytes) + 9)
+			assert HM_Duration.from_bytes(dur_bytes, -1, len(dur_bytes) + 9)\
+				== duration
+			formatted = bytearray(b">")
+			duration_to_bytes(duration.hours, duration.minutes, formatted)
+			assert formatted == b">" + str(duration).encode()
+	except AssertionError:
+		print("Bytes test failed for " + str(dur_bytes) + PERIOD)
+		print()
+
+
+def test_binary_file(durations):
+	with NamedTemporaryFile(delete=False) as file:
+		pass
+
+	try:
+		actual_count = write_durations(file.name, durations)
+		with read_durations(file.name) as mapped_durations:
+			actual_durations = list(mapped_durations)
+			actual_minutes = list(mapped_durations.to_array())
+			minutes_view = mapped_durations.minutes()
+
+			# A live view of the map prevents closing without closing
+			# anything. Big-endian platforms view a copy instead.
+			try:
+				mapped_durations.close()
+			except BufferError:
+				close_refused = True
+				minutes_after_refusal = list(mapped_durations.to_array())
+			else:
+				close_refused = False
+
+			minutes_view.release()
+	finally:
+		remove(file.name)
+
+	expected_minutes = [duration.to_minutes() for duration in durations]
+
+	try:
+		assert actual_count == len(durations)
+		assert actual_durations == durations
+		assert actual_minutes == expected_minutes
+		assert close_refused == (byteorder == "little")
+		assert not close_refused or minutes_after_refusal == expected_minutes
+	except AssertionError:
+		print("Binary file test failed for " + str(durations) + PERIOD)
+		print_actual_and_expected_values(actual_durations, durations)
+		print()
+
+
+def test_command_line(lines, args, expected_lines):
+	# The files larger than 2 MiB are split among the worker processes.
+	for jobs_args in ([], ["--jobs", "2"]):
+		status, actual_lines, _ = run_command_line(lines, args + jobs_args)
+
+		try:
+			assert status == 0
+			assert actual_lines == expected_lines
+		except AssertionError:
+			print("Command-line test failed for " + str(args + jobs_args)
+				+ PERIOD)
+			print_actual_and_expected_values(actual_lines, expected_lines)
+			print()
+
+
+def test_command_line_error(lines, args, expected_status, expected_error):
+	actual_status, _, actual_errors = run_command_line(lines, args)
+
+	try:
+		assert actual_status == expected_status
+		assert expected_error in actual_errors
+	except AssertionError:
+		print("Command-line error test failed for " + str(args) + PERIOD)
+		print_actual_and_expected_values(actual_errors, expected_error)
+		print()
+
+
 def test_comparison(operand1, operator, operand2, expected_result):
 	if operator == CmpOperator.GT:
 		actual_result = operand1 > operand2
@@ -101,6 +358,21 @@ def test_comparison(operand1, operator, operand2, expected_result):
 		print()
 
 
+def test_differential_fuzzing(size, seed):
+	_, backend_results = fuzz_backends(size, seed, batch_size=size // 2)
+	actual_mismatches = {name: result.mismatches
+		for name, result in backend_results.items() if result.mismatch_count}
+
+	try:
+		assert len(backend_results) == len(BACKENDS)
+		assert all(result.checked > 0 for result in backend_results.values())
+		assert actual_mismatches == dict()
+	except AssertionError:
+		print("Differential fuzzing test failed for seed " + str(seed) + PERIOD)
+		print_actual_and_expected_values(actual_mismatches, dict())
+		print()
+
+
 def test_from_str(dur_str, expected_h, expected_m):
 	duration = HM_Duration.from_str(dur_str)
 	actual_h = duration.hours
@@ -116,6 +388,88 @@ def test_from_str(dur_str, expected_h, expected_m):
 		print()
 
 
+def test_from_str_many(dur_strs, on_invalid, expected_results):
+	actual_results = list(HM_Duration.from_str_many(dur_strs, on_invalid))
+	expected_minutes = [result.to_minutes() for result in expected_results
+		if isinstance(result, HM_Duration)]
+	actual_minutes = list(minutes_from_str_many(dur_strs, InvalidPolicy.SKIP))
+
+	try:
+		assert actual_results == expected_results
+		assert actual_minutes == expected_minutes
+	except AssertionError:
+		print("Bulk instantiation from strings failed for "
+			+ str(dur_strs) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
+def test_group_by_key(pairs, expected_sums, expected_counts):
+	actual_sums = sum_by_key(pairs)
+	actual_counts = count_by_key(pairs)
+
+	try:
+		assert actual_sums == expected_sums
+		assert actual_counts == expected_counts
+	except AssertionError:
+		print("Group-by test failed for " + str(pairs) + PERIOD)
+		print_actual_and_expected_values(actual_sums, expected_sums)
+		print_actual_and_expected_values(actual_counts, expected_counts)
+		print()
+
+
+def test_hash(hours1, minutes1, hours2, minutes2):
+	duration1 = HM_Duration(hours1, minutes1)
+	duration2 = HM_Duration(hours2, minutes2)
+	actual_equal_hashes = hash(duration1) == hash(duration2)
+	expected_equal_hashes = duration1 == duration2
+
+	try:
+		assert actual_equal_hashes or not expected_equal_hashes
+		assert hash(duration1) == hash(duration1.to_timedelta())
+		assert len({duration1, duration2}) == (1 if expected_equal_hashes else 2)
+	except AssertionError:
+		print("Hash test failed for " + str(duration1)
+			+ " and " + str(duration2) + PERIOD)
+		print_actual_and_expected_values(
+			actual_equal_hashes, expected_equal_hashes)
+		print()
+
+
+def test_indexed_durations(durations, updates, appended):
+	index = IndexedDurations(durations)
+	expected_minutes = [DurationBuilder(duration).to_minutes()
+		for duration in durations]
+
+	for position, duration in updates:
+		index[position] = duration
+		expected_minutes[position] = duration.to_minutes()
+
+	for duration in appended:
+		index.append(duration)
+		expected_minutes.append(duration.to_minutes())
+
+	length = len(expected_minutes)
+	actual_sums = [index.range_sum(start, stop)
+		for start in range(-length, length + 1)
+		for stop in range(-length, length + 1)]
+	expected_sums = [HM_Duration(0, sum(expected_minutes[start:stop]))
+		for start in range(-length, length + 1)
+		for stop in range(-length, length + 1)]
+
+	try:
+		assert len(index) == length
+		assert [duration.to_minutes() for duration in index] == expected_minutes
+		assert index.total() == HM_Duration(0, sum(expected_minutes))
+		assert index.prefix_sum(length - 1) == HM_Duration(
+			0, sum(expected_minutes[:-1]))
+		assert actual_sums == expected_sums
+	except AssertionError:
+		print("Indexed durations test failed for " + str(durations) + PERIOD)
+		print_actual_and_expected_values(actual_sums, expected_sums)
+		print()
+
+
 def test_instantiation(hours, minutes, expected_h, expected_m):
 	duration = HM_Duration(hours, minutes)
 	actual_h = duration.hours
@@ -131,6 +485,149 @@ def test_instantiation(hours, minutes, expected_h, expected_m):
 		print()
 
 
+def test_instrumentation(dur_strs, expected_counts):
+	hook_calls = list()
+	instrumentation = enable_instrumentation(
+		lambda operation, elapsed, rejected:
+			hook_calls.append((operation, rejected)))
+	# A module imported while instrumentation is enabled gets the wrappers.
+	client = ModuleType("instrumentation_client")
+	modules[client.__name__] = client
+	client.duration_from_str = duration_string.duration_from_str
+
+	try:
+		for dur_str in dur_strs:
+			try:
+				duration = HM_Duration.from_str(dur_str)
+				str(duration + HM_Duration(0, 1))
+			except ValueError:
+				pass
+	finally:
+		disable_instrumentation()
+		del modules[client.__name__]
+
+	actual_counts = {operation: (stats["count"], stats["errors"])
+		for operation, stats in instrumentation.snapshot().items()
+		if stats["count"] > 0}
+	expected_hook_calls = sum(count for count, _ in expected_counts.values())
+
+	try:
+		assert actual_counts == expected_counts
+		assert len(hook_calls) == expected_hook_calls
+		assert HM_Duration.from_str.__name__ == "from_str"
+		assert not hasattr(HM_Duration.from_str, "__wrapped__")
+		assert client.duration_from_str is duration_string.duration_from_str
+		assert not hasattr(client.duration_from_str, "__wrapped__")
+	except AssertionError:
+		print("Instrumentation test failed for " + str(dur_strs) + PERIOD)
+		print_actual_and_expected_values(actual_counts, expected_counts)
+		print()
+
+
+def test_interning(max_size, eviction, minute_seq, expected_stats):
+	cache = enable_interning(max_size, eviction)
+	durations = [HM_Duration(0, minutes) for minutes in minute_seq]
+	actual_stats = cache.stats()
+	del actual_stats["hit_ratio"]
+	disable_interning()
+
+	first_durations = dict()
+	for duration in durations:
+		first_durations.setdefault(duration.to_minutes(), duration)
+
+	try:
+		assert actual_stats == expected_stats
+		assert HM_Duration(0, minute_seq[-1]) is not durations[-1]
+		if eviction == EvictionPolicy.LRU and max_size >= len(first_durations):
+			assert all(duration is first_durations[duration.to_minutes()]
+				for duration in durations)
+	except AssertionError:
+		print("Interning test failed for " + str(minute_seq) + PERIOD)
+		print_actual_and_expected_values(actual_stats, expected_stats)
+		print()
+
+
+def test_parse_file(lines, jobs):
+	with NamedTemporaryFile("w", delete=False) as file:
+		file.write("\n".join(lines))
+
+	expected_minutes = [HM_Duration.from_str(line).to_minutes()
+		for line in lines if line]
+
+	try:
+		# Split even small files among the worker processes.
+		actual_minutes = list(
+			parse_file_parallel(file.name, jobs, min_range_size=1))
+		serial_minutes = list(parse_file_parallel(file.name, 1))
+	finally:
+		remove(file.name)
+
+	try:
+		assert actual_minutes == expected_minutes
+		assert serial_minutes == expected_minutes
+	except AssertionError:
+		print("File parsing test failed for " + str(jobs) + " jobs" + PERIOD)
+		print_actual_and_expected_values(actual_minutes, expected_minutes)
+		print()
+
+
+def test_parse_stream(chunks, batch_size, executor_threshold, on_invalid,
+		expected_results):
+	async def parse_chunks(use_reader):
+		if use_reader:
+			source = StreamReader()
+			for chunk in chunks:
+				source.feed_data(chunk)
+			source.feed_eof()
+		else:
+			async def generate_chunks():
+				for chunk in chunks:
+					yield chunk
+			source = generate_chunks()
+
+		batches = list()
+		async for batch in parse_duration_stream(source, batch_size,
+				on_invalid, executor_threshold=executor_threshold):
+			batches.append(batch)
+		return batches
+
+	for use_reader in (False, True):
+		batches = run(parse_chunks(use_reader))
+		actual_results = [result for batch in batches for result in batch]
+
+		try:
+			assert all(len(batch) <= batch_size for batch in batches)
+			assert actual_results == expected_results
+		except AssertionError:
+			print("Stream parsing test failed for " + str(chunks) + PERIOD)
+			print_actual_and_expected_values(actual_results, expected_results)
+			print()
+
+
+def test_parse_stream_error(batch_size, chunk_size):
+	async def parse_chunks():
+		source = StreamReader()
+		source.feed_data(b"7:19\n")
+		source.feed_eof()
+		return [batch async for batch in parse_duration_stream(
+			source, batch_size, chunk_size=chunk_size)]
+
+	try:
+		run(parse_chunks())
+	except ValueError:
+		error_raised = True
+	else:
+		error_raised = False
+
+	try:
+		assert error_raised
+	except AssertionError:
+		print("Stream parsing error test failed for batch_size "
+			+ str(batch_size) + " and chunk_size " + str(chunk_size) + PERIOD)
+		print_actual_and_expected_values(error_raised, True)
+		print()
+
+
 def test_opposite(hours, minutes, expected_minus_h, expected_minus_m):
 	duration = HM_Duration(hours, minutes)
 	opposite_dur = -duration
@@ -149,6 +646,87 @@ def test_opposite(hours, minutes, expected_minus_h, expected_minus_m):
 		print()
 
 
+def test_pandas_column(dur_strs, keys):
+	column = Series(dur_strs, dtype=HM_DurationDtype())
+	durations = [HM_Duration.from_str(dur_str)
+		for dur_str in dur_strs if dur_str is not None]
+	accumulator = DurationAccumulator(durations)
+	expected_sums = {key: HM_Duration(0, 0) for key in keys}
+	for key, dur_str in zip(keys, dur_strs):
+		if dur_str is not None:
+			expected_sums[key] += HM_Duration.from_str(dur_str)
+
+	actual_results = (column.sum(), column.mean(), column.min(), column.max())
+	expected_results = (accumulator.sum(), accumulator.mean(),
+		accumulator.min(), accumulator.max())
+	actual_strs = [dur_str for dur_str in column.astype(str)
+		if isinstance(dur_str, str)]
+	expected_strs = duration_to_str_many(durations)
+	doubled = column * 2 - column
+	less = column < HM_Duration(1, 0)
+	divided_by_inf = column / float("inf")
+	actual_sums = DataFrame({"k": keys, "d": column}).groupby("k")["d"].sum()
+	present = column.notna().tolist()
+
+	try:
+		column / 0
+	except ZeroDivisionError:
+		zero_division_raised = True
+	else:
+		zero_division_raised = False
+
+	try:
+		assert actual_results == expected_results
+		assert actual_strs == expected_strs
+		assert [duration for duration in doubled if duration is not NA]\
+			== durations
+		assert [bool(result) for result in less if result is not NA]\
+			== [duration < HM_Duration(1, 0) for duration in durations]
+		assert actual_sums.to_dict() == expected_sums
+		assert (column == "x").fillna(True).tolist()\
+			== [not is_present for is_present in present]
+		assert (column != 5).fillna(False).tolist() == present
+		assert zero_division_raised
+		assert divided_by_inf.notna().tolist() == present
+		assert [duration for duration in divided_by_inf
+			if duration is not NA] == [duration / float("inf")
+			for duration in durations]
+	except AssertionError:
+		print("pandas column test failed for " + str(dur_strs) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
+def test_parse(dur_str, formats, expected_result):
+	try:
+		actual_result = HM_Duration.parse(dur_str, formats)
+	except ValueError:
+		actual_result = None
+
+	try:
+		assert actual_result == expected_result
+	except AssertionError:
+		print("Multi-format parsing failed for '" + dur_str + S_QUOTE_PERIOD)
+		print_actual_and_expected_values(actual_result, expected_result)
+		print()
+
+
+def test_pickling(hours, minutes):
+	duration = HM_Duration(hours, minutes)
+	unpickled = loads(dumps(duration))
+
+	try:
+		assert unpickled == duration
+		assert unpickled.__class__ is HM_Duration
+		assert copy(duration) is duration
+		assert deepcopy([duration])[0] is duration
+	except AssertionError:
+		print("Pickling test failed for "
+			+ duration_to_str(hours, minutes) + PERIOD)
+		print_actual_and_expected_values(unpickled, duration)
+		print()
+
+
 def test_repr(hours, minutes, expected_repr):
 	duration = HM_Duration(hours, minutes)
 	actual_repr = repr(duration)
@@ -175,6 +753,70 @@ def test_sign(hours, minutes, expected_sign):
 		print()
 
 
+def test_order_statistics(minute_seq, expected_median, expected_p90,
+		expected_top2):
+	durations = [HM_Duration(0, minutes) for minutes in minute_seq]
+	actual_results = (median(durations).to_minutes(),
+		percentile(durations, 90).to_minutes(),
+		[duration.to_minutes() for duration in top_k(durations, 2)])
+	expected_results = (expected_median, expected_p90, expected_top2)
+
+	try:
+		assert actual_results == expected_results
+	except AssertionError:
+		print("Order statistics test failed for " + str(minute_seq) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
+def test_sketch(minute_seq, exact_bound, percents):
+	half = len(minute_seq) // 2
+	sketch = DurationSketch(
+		[str(HM_Duration(0, minutes)) for minutes in minute_seq[:half]],
+		exact_bound)
+	sketch.merge(DurationSketch(minute_seq[half:], exact_bound))
+	durations = [HM_Duration(0, minutes) for minutes in minute_seq]
+	actual_results = [duration.to_minutes()
+		for duration in sketch.percentiles(percents)]
+	expected_results = [percentile(durations, percent).to_minutes()
+		for percent in percents]
+	histogram = [(lower.to_minutes(), upper.to_minutes(), count)
+		for lower, upper, count in sketch.histogram()]
+
+	try:
+		assert len(sketch) == len(minute_seq)
+		assert sum(count for _, _, count in histogram) == len(minute_seq)
+		assert all(count == sum(lower <= minutes < upper
+			for minutes in minute_seq) for lower, upper, count in histogram)
+
+		for actual, expected in zip(actual_results, expected_results):
+			if abs(expected) <= exact_bound:
+				assert actual == expected
+			else:
+				assert abs(actual - expected) <= abs(expected) / 64
+	except AssertionError:
+		print("Sketch test failed for " + str(minute_seq) + PERIOD)
+		print_actual_and_expected_values(actual_results, expected_results)
+		print()
+
+
+def test_sorting(minute_seq, reverse):
+	durations = [HM_Duration(0, minutes) for minutes in minute_seq]
+	expected_ids = [id(duration) for duration in sorted(durations,
+		key=lambda duration: duration.to_minutes(), reverse=reverse)]
+
+	for method in SortMethod:
+		actual_ids = [id(duration) for duration
+			in sorted_durations(durations, reverse, method)]
+
+		try:
+			assert actual_ids == expected_ids
+		except AssertionError:
+			print("Sorting test failed for " + str(minute_seq)
+				+ " with " + str(method) + PERIOD)
+			print()
+
+
 def test_string_rep(hours, minutes, expected_str):
 	duration = HM_Duration(hours, minutes)
 	actual_str = str(duration)
@@ -187,6 +829,62 @@ def test_string_rep(hours, minutes, expected_str):
 		print()
 
 
+def test_to_str_many(minute_seq):
+	durations = [HM_Duration(0, minutes) for minutes in minute_seq]
+	expected_strs = [duration_to_str(duration.hours, duration.minutes)
+		for duration in durations]
+	actual_strs = duration_to_str_many(durations)
+	stream = StringIO()
+	duration_to_str_many(minute_seq, stream)
+
+	try:
+		assert actual_strs == expected_strs
+		assert stream.getvalue() == "".join(
+			dur_str + "\n" for dur_str in expected_strs)
+	except AssertionError:
+		print("Bulk string representation test failed for "
+			+ str(minute_seq) + PERIOD)
+		print_actual_and_expected_values(actual_strs, expected_strs)
+		print()
+
+
+def test_timedelta(delta, expected_minutes):
+	actual_minutes = dict()
+
+	for rounding in TimedeltaRounding:
+		try:
+			actual_minutes[rounding] = HM_Duration.from_timedelta(
+				delta, rounding).to_minutes()
+		except ValueError:
+			actual_minutes[rounding] = None
+
+	expected_results = dict(zip(TimedeltaRounding, expected_minutes))
+	duration = HM_Duration(0, expected_minutes[0])
+	floor_minutes = minutes_from_timedeltas([delta], TimedeltaRounding.FLOOR)
+
+	try:
+		assert actual_minutes == expected_results
+		assert list(floor_minutes) == [expected_minutes[1]]
+		assert duration.to_timedelta() == timedelta(minutes=duration.to_minutes())
+		assert timedeltas_from_minutes([duration]) == [duration.to_timedelta()]
+		assert duration + delta == delta + duration\
+			== duration.to_timedelta() + delta
+		assert duration - delta == -(delta - duration)\
+			== duration.to_timedelta() - delta
+		assert (duration < delta) == (duration.to_timedelta() < delta)
+		assert (duration >= delta) == (duration.to_timedelta() >= delta)
+		assert (delta > duration) == (delta > duration.to_timedelta())
+		assert (duration == delta) == (delta == duration)\
+			== (duration.to_timedelta() == delta)
+		assert (duration <= delta) == (duration < delta or duration == delta)
+		assert duration == duration.to_timedelta()
+		assert hash(duration) == hash(duration.to_timedelta())
+	except AssertionError:
+		print("timedelta test failed for " + repr(delta) + PERIOD)
+		print_actual_and_expected_values(actual_minutes, expected_results)
+		print()
+
+
 def test_to_hours(hour_arg, minute_arg, expected_h_num):
 	duration = HM_Duration(hour_arg, minute_arg)
 	actual_h_num = duration.to_hours()
@@ -240,6 +938,36 @@ test_instantiation(-7, -7, -7, -7) # -07:07
 test_instantiation(0, -77, -1, -17) # -00:77 -> -01:17
 test_instantiation(-7, -77, -8, -17) # -07:77 -> -08:17
 
+test_interning(4, EvictionPolicy.LRU, [0, 15, 0, 30, 15, 0],
+	{"hits": 3, "misses": 3, "evictions": 0, "size": 3, "max_size": 4})
+test_interning(2, EvictionPolicy.LRU, [0, 15, 0, 30, 15, 0],
+	{"hits": 1, "misses": 5, "evictions": 3, "size": 2, "max_size": 2})
+test_interning(2, EvictionPolicy.FIFO, [0, 15, 0, 30, 15, 0],
+	{"hits": 2, "misses": 4, "evictions": 2, "size": 2, "max_size": 2})
+
+test_hash(0, 77, 1, 17)
+test_hash(-7, -77, -8, -17)
+test_hash(1, 17, -1, -17)
+test_hash(0, 0, 0, 0)
+
+test_indexed_durations([HM_Duration(1, 30), "-0:45", 20, "7:07", HM_Duration(0, 1)],
+	[(1, HM_Duration(2, 0)), (-1, HM_Duration(-3, -3))],
+	[HM_Duration(0, minutes) for minutes in range(-50, 60, 11)])
+test_indexed_durations([], [], [HM_Duration(1, 0), HM_Duration(0, -1)])
+test_indexed_durations([], [], [])
+
+test_group_by_key(
+	[("a", HM_Duration(1, 30)), ("b", HM_Duration(0, 45)),
+		("a", HM_Duration(-2, -15)), ("a", HM_Duration(0, 50))],
+	{"a": HM_Duration(0, 5), "b": HM_Duration(0, 45)},
+	{"a": 3, "b": 1})
+test_group_by_key([], dict(), dict())
+
+test_instrumentation(["1:00", "x", "-2:30"], {
+	"HM_Duration.from_str": (3, 1), "duration_from_str": (3, 1),
+	"HM_Duration.__new__": (2, 0), "HM_Duration.__add__": (2, 0),
+	"HM_Duration.__str__": (2, 0)})
+
 test_opposite(0, 0, 0, 0)
 test_opposite(0, 13, 0, -13)
 test_opposite(0, -13, 0, 13)
@@ -279,6 +1007,9 @@ test_whether_str_repr_dur("x-07:19", False)
 test_whether_str_repr_dur("-7:19x", False)
 test_whether_str_repr_dur("-07:19x", False)
 
+test_differential_fuzzing(2000, 0)
+test_differential_fuzzing(2000, 1)
+
 test_from_str("0:00", 0, 0)
 test_from_str("00:00", 0, 0)
 test_from_str("0:07", 0, 7)
@@ -292,6 +1023,7 @@ test_from_str("07:67", 8, 7)
 test_from_str("19:23", 19, 23)
 test_from_str("99:00", 99, 0)
 test_from_str("100:00", 100, 0)
+test_from_str("٠٧:١٩", 7, 19) # Arabic-Indic digits match \d.
 
 test_from_str("-0:00", 0, 0)
 test_from_str("-00:00", 0, 0)
@@ -307,12 +1039,84 @@ test_from_str("-19:23", -19, -23)
 test_from_str("-99:00", -99, 0)
 test_from_str("-100:00", -100, 0)
 
+test_parse("07:67", DurationFormat.ALL, HM_Duration(8, 7))
+test_parse("-1:30", DurationFormat.CLASSIC, HM_Duration(-1, -30))
+test_parse("1h30m", DurationFormat.ALL, HM_Duration(1, 30))
+test_parse("-2H", DurationFormat.UNITS, HM_Duration(-2, 0))
+test_parse("90m", DurationFormat.ALL, HM_Duration(1, 30))
+test_parse("-90", DurationFormat.MINUTES, HM_Duration(-1, -30))
+test_parse("PT1H30M", DurationFormat.ALL, HM_Duration(1, 30))
+test_parse("-P1DT2H5M", DurationFormat.ISO_8601, HM_Duration(-26, -5))
+test_parse("PT90M", DurationFormat.ISO_8601 | DurationFormat.UNITS,
+	HM_Duration(1, 30))
+test_parse("1:30", DurationFormat.UNITS | DurationFormat.MINUTES, None)
+test_parse("90", DurationFormat.CLASSIC, None)
+test_parse("1h30", DurationFormat.ALL, None)
+test_parse("PT1H30M0S", DurationFormat.ALL, None)
+test_parse("PT", DurationFormat.ALL, None)
+test_parse("-", DurationFormat.ALL, None)
+test_parse("x7:19", DurationFormat.ALL, None)
+
+test_from_str_many(["0:00", "-07:67", "100:00"], InvalidPolicy.RAISE,
+	[HM_Duration(0, 0), HM_Duration(-8, -7), HM_Duration(100, 0)])
+test_from_str_many(["7:19", "x7:19", "-0:07"], InvalidPolicy.SKIP,
+	[HM_Duration(7, 19), HM_Duration(0, -7)])
+test_from_str_many(["7:19", "x7:19", "-0:07"], InvalidPolicy.SENTINEL,
+	[HM_Duration(7, 19), InvalidDuration(1, "x7:19"), HM_Duration(0, -7)])
+
+test_parse_stream([b"7:19\n-0:", b"07\r\n\n100:00\n1:", b"00"], 2, 65536,
+	InvalidPolicy.RAISE, [HM_Duration(7, 19), HM_Duration(0, -7),
+		HM_Duration(100, 0), HM_Duration(1, 0)])
+test_parse_stream([b"7:19\nx\n", b"8:00\n"], 1, 0, InvalidPolicy.SENTINEL,
+	[HM_Duration(7, 19), InvalidDuration(1, "x"), HM_Duration(8, 0)])
+test_parse_stream_error(0, 65536)
+test_parse_stream_error(-1, 65536)
+test_parse_stream_error(1024, 0)
+
+file_lines = [str(HM_Duration(0, minutes)) for minutes in range(-900, 900, 7)]
+test_parse_file(file_lines, 1)
+test_parse_file(file_lines, 2)
+test_parse_file(file_lines + [""], 4)
+test_parse_file(["1:00", "", "2:00"], 3)
+
+test_bytes(b"7:19", 7, 19)
+test_bytes(b"-07:67", -8, -7)
+test_bytes(b"-0:07", 0, -7)
+test_bytes(b"123:00", 123, 0)
+test_bytes(b"7:1", None, None)
+test_bytes(b"-:19", None, None)
+test_bytes(b"7:19x", None, None)
+test_bytes("٠٧:١٩".encode(), None, None) # \d matches only ASCII in bytes.
+
+test_binary_file([HM_Duration(1, 2), HM_Duration(0, -5), HM_Duration(-100, -1)])
+test_binary_file([HM_Duration(0, minutes) for minutes in range(-70000, 70000)])
+test_binary_file([])
+
+test_pickling(0, 0)
+test_pickling(7, 77)
+test_pickling(-7, -77)
+
 test_repr(0, 7, "HM_Duration(0, 7)")
 test_repr(10, 83, "HM_Duration(11, 23)")
 
 test_repr(0, -7, "HM_Duration(0, -7)")
 test_repr(-10, -83, "HM_Duration(-11, -23)")
 
+test_sorting([5, -3, 5, 0, 120, -3, 7], False)
+test_sorting([5, -3, 5, 0, 120, -3, 7], True)
+test_sorting([100000, -100000, 0, 0], False)
+test_sorting([100000, -100000, 0, 0], True)
+test_sorting([], False)
+
+test_order_statistics([5, -3, 5, 0, 120, -3, 7], 5, 120, [120, 7])
+test_order_statistics([1, 2, 3, 4], 3, 4, [4, 3])
+test_order_statistics([-1, -2], -1, -1, [-1, -2])
+
+test_sketch([5, -3, 5, 0, 120, -3, 7], 1440, [0, 10, 50, 90, 100])
+test_sketch(list(range(-5000, 5000, 13)), 60, [0, 1, 25, 50, 95, 99, 100])
+test_sketch([100000, -100000, 1441, -1441, 0], 1440, [0, 20, 40, 60, 80, 100])
+test_sketch([10 ** 8, -3, 10 ** 8, 7], 10 ** 9, [0, 50, 75, 100])
+
 test_string_rep(0, 0, "00:00")
 test_string_rep(1, 1, "01:01")
 test_string_rep(1, 59, "01:59")
@@ -330,6 +1134,22 @@ test_string_rep(-10, 0, "-10:00")
 test_string_rep(-99, 0, "-99:00")
 test_string_rep(-100, 0, "-100:00")
 
+test_to_str_many([0, 1, 59, 60, 540, 5999, 6000, 6001, 123456])
+test_to_str_many([-1, -59, -60, -540, -5999, -6000, -6001, -123456])
+test_to_str_many(range(-9000, 9000, 7))
+test_to_str_many([])
+
+# Expected minutes: HALF_UP, FLOOR, CEILING, TOWARD_ZERO and EXACT
+test_timedelta(timedelta(hours=2, minutes=5), [125, 125, 125, 125, 125])
+test_timedelta(timedelta(minutes=7, seconds=30), [8, 7, 8, 7, None])
+test_timedelta(timedelta(minutes=7, seconds=29, microseconds=999999),
+	[7, 7, 8, 7, None])
+test_timedelta(-timedelta(minutes=7, seconds=30), [-7, -8, -7, -7, None])
+test_timedelta(-timedelta(minutes=7, seconds=31), [-8, -8, -7, -7, None])
+test_timedelta(timedelta(days=-1, microseconds=1), [-1440, -1440, -1439,
+	-1439, None])
+test_timedelta(timedelta(0), [0, 0, 0, 0, 0])
+
 test_to_hours(0, 0, 0.0)
 test_to_hours(0, 15, 0.25)
 test_to_hours(0, 17, 0.28333333333333333333333333333333)
@@ -350,6 +1170,24 @@ test_to_minutes(0, -17, -17)
 test_to_minutes(-1, -17, -77)
 test_to_minutes(-2, -17, -137)
 
+test_accumulator([HM_Duration(1, 30), "-0:45", 20],
+	(3, HM_Duration(0, 65), HM_Duration(0, -45), HM_Duration(1, 30),
+		HM_Duration(0, 22)))
+test_accumulator(["7:07", "-7:07"],
+	(2, HM_Duration(0, 0), HM_Duration(-7, -7), HM_Duration(7, 7),
+		HM_Duration(0, 0)))
+test_accumulator([HM_Duration(0, 1), HM_Duration(0, 2)],
+	(2, sum([HM_Duration(0, 1), HM_Duration(0, 2)]), HM_Duration(0, 1),
+		HM_Duration(0, 2), HM_Duration(0, 2)))
+
+test_builder(0, [(ArithmOperator.ADD, HM_Duration(2, 2)),
+	(ArithmOperator.ADD, "-0:30"), (ArithmOperator.SUB, 2)],
+	HM_Duration(1, 30))
+test_builder("2:02", [(ArithmOperator.MUL, 2.7)], HM_Duration(2, 2) * 2.7)
+test_builder("-7:07", [(ArithmOperator.DIV, 2)], HM_Duration(-7, -7) / 2)
+test_builder(HM_Duration(11, 11), [(ArithmOperator.DIV, -5.7),
+	(ArithmOperator.SUB, DurationBuilder(5))], HM_Duration(-2, -3))
+
 test_arithmetic(HM_Duration(12, 17),
 	ArithmOperator.ADD, HM_Duration(0, 0), HM_Duration(12, 17))
 test_arithmetic(HM_Duration(12, 17),
@@ -406,6 +1244,38 @@ test_arithmetic(HM_Duration(-7, -7), ArithmOperator.DIV, -2, HM_Duration(3, 34))
 test_arithmetic(HM_Duration(-8, -8), ArithmOperator.DIV, -0.8, HM_Duration(10, 10))
 test_arithmetic(HM_Duration(-11, -11), ArithmOperator.DIV, -5.7, HM_Duration(1, 58))
 
+test_command_line(["name,time", "ann,1:30", "bob,45m", "ann,", "bob,PT2H",
+	"cy,-0:15"], ["-c", "time", "-p", "0,50,100"],
+	["count\ttotal\tmean\tmin\tmax\tp0\tp50\tp100",
+	"4\t04:00\t01:00\t-00:15\t02:00\t-00:15\t00:45\t02:00"])
+test_command_line(["name,time", "ann,1:30", "bob,45m", "ann,2:00", "bob,x"],
+	["-c", "2", "-g", "name", "--skip-invalid"],
+	["group\tcount\ttotal\tmean\tmin\tmax\tp50\tp90\tp99",
+	"ann\t2\t03:30\t01:45\t01:30\t02:00\t01:30\t02:00\t02:00",
+	"bob\t1\t00:45\t00:45\t00:45\t00:45\t00:45\t00:45\t00:45"])
+test_command_line(["who,time"] + ["u" + str(minutes % 3) + ","
+	+ str(HM_Duration(0, minutes)) for minutes in range(-900, 900, 7)],
+	["-c", "time"], ["count\ttotal\tmean\tmin\tmax\tp50\tp90\tp99",
+	"258\t-02:09\t00:00\t-15:00\t14:59\t-00:04\t12:04\t14:45"])
+test_command_line(["who,time"], ["-c", "time"],
+	["count\ttotal\tmean\tmin\tmax\tp50\tp90\tp99",
+	"0\t00:00\t\t\t\t\t\t"])
+
+large_csv_lines = ["name,time"]\
+	+ ["employee-a,01:30", "employee-b,00:45"] * 65000
+test_command_line(large_csv_lines, ["-c", "time", "-g", "name"],
+	["group\tcount\ttotal\tmean\tmin\tmax\tp50\tp90\tp99",
+	"employee-a\t65000\t97500:00\t01:30\t01:30\t01:30\t01:30\t01:30\t01:30",
+	"employee-b\t65000\t48750:00\t00:45\t00:45\t00:45\t00:45\t00:45\t00:45"])
+
+# Only the worker processes report the byte where their range starts.
+test_command_line_error(large_csv_lines + ["employee-b,x"],
+	["-c", "time", "--jobs", "2"], 1, "after byte")
+test_command_line_error(["name,time", "ann,x"], ["-c", "time"], 1,
+	"line 2: ")
+test_command_line_error(["name,time"], ["--jobs", "0"], 2,
+	"argument -j/--jobs: must be at least 1")
+
 test_comparison(HM_Duration(2, 2), CmpOperator.GT, HM_Duration(2, 2), False)
 test_comparison(HM_Duration(2, 2), CmpOperator.GT, HM_Duration(2, 1), True)
 test_comparison(HM_Duration(2, 2), CmpOperator.GT, HM_Duration(1, 2), True)
@@ -482,4 +1352,42 @@ test_comparison(HM_Duration(-2, -2), CmpOperator.LT, HM_Duration(-2, -1), True)
 test_comparison(HM_Duration(-2, -2), CmpOperator.LT, HM_Duration(-1, -2), True)
 test_comparison(HM_Duration(-2, -2), CmpOperator.LT, HM_Duration(0, 0), True)
 
+if HM_DurationArray is not None:
+	array_durations = [HM_Duration(2, 2), HM_Duration(-7, -7),
+		HM_Duration(0, 0), HM_Duration(11, 11), HM_Duration(-8, -8)]
+
+	test_array_arithmetic(
+		array_durations, ArithmOperator.ADD, HM_Duration(3, 55))
+	test_array_arithmetic(
+		array_durations, ArithmOperator.SUB, HM_Duration(-3, -55))
+
+	for number in (3, 2.5, 2.7, -2.7, 0.8, -5.7):
+		test_array_arithmetic(array_durations, ArithmOperator.MUL, number)
+		test_array_arithmetic(array_durations, ArithmOperator.DIV, number)
+
+	test_array_reflected(array_durations, HM_Duration(0, 0))
+	test_array_reflected(array_durations, HM_Duration(2, 2))
+
+	for number in (float("inf"), float("-inf")):
+		test_array_arithmetic(array_durations, ArithmOperator.DIV, number)
+		test_array_arithmetic_error(
+			array_durations, ArithmOperator.MUL, number, OverflowError)
+		test_array_arithmetic_error(
+			array_durations[2:], ArithmOperator.MUL, number, ValueError)
+
+	test_array_arithmetic_error(
+		array_durations, ArithmOperator.MUL, float("nan"), ValueError)
+	test_array_arithmetic_error(
+		array_durations, ArithmOperator.DIV, float("nan"), ValueError)
+
+	test_array_arithmetic_error(
+		array_durations, ArithmOperator.DIV, 0, ZeroDivisionError)
+	test_array_arithmetic_error(
+		array_durations, ArithmOperator.DIV, 0.0, ZeroDivisionError)
+
+if HM_DurationDtype is not None:
+	test_pandas_column(["7:19", "-0:07", None, "100:00", "0:30"],
+		["a", "b", "a", "b", "a"])
+	test_pandas_column(["٠٧:١٩", "-07:67", "1:00"], [1, 1, 2])
+
 print("HM_Duration tests done")